@@ -0,0 +1,502 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from gaze_mapping import ThinPlateSplineMap
+from output import NullCursor, CursorInterpolator, ScrollEngine, WHEEL_DELTA
+from replay import open_replay_source, run_replay
+
+# Head scrolling lives in ../head-control; appended so this directory's main.py still wins
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "head-control"))
+from head_scroll import create_controller, replay_head
+
+
+class SyntheticLandmarkStream:
+    """Deterministic face mesh landmark frames for a gaze target on screen.
+
+    Only the landmarks the gaze pipeline reads are placed geometrically (eye
+    corners, iris rings, eyelids, nose tip, face center); the rest are a
+    fixed random cloud. Frames are (478, 2) float32 normalized coordinates,
+    the same layout the replay sources deliver. As the lids close, the iris
+    ring slides collapse_px towards the lower lid, as face mesh iris
+    landmarks do during real blinks.
+    """
+
+    def __init__(self, frame_size=(1280, 720), screen_size=(1920, 1080), seed=0, noise_px=0.4, collapse_px=3.0):
+        self.frame_w, self.frame_h = frame_size
+        self.screen_w, self.screen_h = screen_size
+        self.noise = noise_px
+        self.collapse = collapse_px
+        self.rng = np.random.default_rng(seed)
+        self.base = (0.5 + self.rng.normal(0.0, 0.05, (478, 2))).astype(np.float32)
+
+    def frame(self, target_x, target_y, eye_open=1.0, head=(0.0, 0.0)):
+        """Landmarks for a user looking at (target_x, target_y); eye_open < 0.5 reads as a blink"""
+        lm = self.base.copy()
+        hx, hy = head
+        gx = (target_x / self.screen_w - 0.5) * 30.0
+        gy = (target_y / self.screen_h - 0.5) * 14.0 + self.collapse * max(0.0, 1.0 - eye_open)
+        lid = 9.0 * eye_open
+
+        def put(index, x, y):
+            lm[index, 0] = (x + hx) / self.frame_w
+            lm[index, 1] = (y + hy) / self.frame_h
+
+        for outer, inner, cx in ((33, 133, 570.0), (263, 362, 710.0)):
+            put(outer, cx - 30.0 if outer == 33 else cx + 30.0, 330.0)
+            put(inner, cx + 30.0 if outer == 33 else cx - 30.0, 330.0)
+        for first, cx in ((468, 570.0), (473, 710.0)):
+            for k, (dx, dy) in enumerate(((5.0, 0.0), (0.0, -5.0), (-5.0, 0.0), (0.0, 5.0))):
+                put(first + k, cx + gx + dx, 330.0 + gy + dy)
+        for (u1, l1, u2, l2), cx in (((159, 145, 158, 144), 570.0), ((386, 374, 387, 373), 710.0)):
+            put(u1, cx - 8.0, 330.0 - lid)
+            put(l1, cx - 8.0, 330.0 + lid)
+            put(u2, cx + 8.0, 330.0 - lid)
+            put(l2, cx + 8.0, 330.0 + lid)
+        put(1, 640.0, 420.0)
+        put(9, 640.0, 300.0)
+
+        if self.noise:
+            jitter = self.rng.normal(0.0, self.noise, (478, 2))
+            lm += (jitter / (self.frame_w, self.frame_h)).astype(np.float32)
+        return lm
+
+    def session(self, frames, fixation_frames=20, blink_every=90):
+        """Fixations at random screen targets with periodic three-frame blinks"""
+        stream = []
+        targets = np.zeros((frames, 2))
+        target = (self.screen_w / 2.0, self.screen_h / 2.0)
+        for i in range(frames):
+            if i % fixation_frames == 0:
+                target = (self.rng.uniform(0.05, 0.95) * self.screen_w,
+                          self.rng.uniform(0.05, 0.95) * self.screen_h)
+            eye_open = 0.2 if blink_every and i % blink_every in (30, 31, 32) else 1.0
+            head = tuple(self.rng.normal(0.0, 1.5, 2))
+            stream.append(self.frame(target[0], target[1], eye_open, head))
+            targets[i] = target
+        return stream, targets
+
+    def blink_click_session(self, clicks, fixation_frames=24, after_frames=6, hop_px=160.0,
+                            closure=(0.75, 0.4, 0.15, 0.15, 0.15, 0.4, 0.75)):
+        """Typing-like trace: hop up to hop_px to the next key in the lower screen half,
+        fixate, blink-click it. Targets are the key being looked at."""
+        stream = []
+        targets = []
+        low = np.array([0.1 * self.screen_w, 0.55 * self.screen_h])
+        high = np.array([0.9 * self.screen_w, 0.9 * self.screen_h])
+        key = self.rng.uniform(low, high)
+        for _ in range(clicks):
+            key = np.clip(key + self.rng.uniform(-hop_px, hop_px, 2), low, high)
+            target = (float(key[0]), float(key[1]))
+            for eye_open in [1.0] * fixation_frames + list(closure) + [1.0] * after_frames:
+                head = tuple(self.rng.normal(0.0, 1.5, 2))
+                stream.append(self.frame(target[0], target[1], eye_open, head))
+                targets.append(target)
+        return stream, np.array(targets)
+
+    def head_session(self, frames, amplitude_px=40.0, still_frames=30, fps=30.0):
+        """Head held still for still_frames, then slow nods and turns of up to
+        amplitude_px at the nose (eyes on the screen centre throughout)"""
+        stream = []
+        for i in range(frames):
+            t = max(0, i - still_frames) / fps
+            head = (amplitude_px * np.sin(2.0 * np.pi * t / 9.0), amplitude_px * np.sin(2.0 * np.pi * t / 6.0))
+            stream.append(self.frame(self.screen_w / 2.0, self.screen_h / 2.0, head=head))
+        return stream, np.full((frames, 2), np.nan)
+
+    def calibration_session(self, points, frames_per_point=100):
+        """Still fixations on each calibration target, for replays started with --calibrate"""
+        stream = [self.frame(x, y) for x, y in points for _ in range(frames_per_point)]
+        return stream, np.full((len(stream), 2), np.nan)
+
+
+def write_trace(path, stream, targets, frame_size, fps=30.0):
+    """Save synthetic frames as a landmark .npz the replay mode can read"""
+    np.savez(path, landmarks=np.asarray(stream, dtype=np.float32), frame_size=np.array(frame_size),
+             timestamps=np.arange(len(stream)) / fps, targets=np.asarray(targets, dtype=np.float64))
+
+
+def calibrate_synthetic(tracker, stream, samples=30):
+    """Fill the tracker's calibration from synthetic fixations on its grid (averages and raw samples)"""
+    tracker.reset_calibration()
+    w, h = stream.frame_w, stream.frame_h
+    for point in tracker.calib_points:
+        features = []
+        for _ in range(samples):
+            gaze_x, gaze_y, _, _ = tracker.extract_precision_gaze_features(stream.frame(*point), w, h)
+            features.append((gaze_x, gaze_y))
+        tracker.calibration_data.append(tuple(np.mean(features, axis=0)))
+        tracker.calibration_samples.append(np.array(features))
+        tracker.screen_points.append(point)
+    if not tracker.fit_precision_mapping():
+        raise RuntimeError("Synthetic calibration failed to fit a mapping")
+    tracker.build_keyboard_precision_index()
+
+
+def latency_stats(samples_ns):
+    """p50/p95/p99/mean/max in milliseconds and calls per second"""
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    mean = float(ms.mean())
+    return {
+        'calls': int(len(ms)),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': mean,
+        'max_ms': float(ms.max()),
+        'per_second': 1000.0 / mean if mean > 0 else 0.0,
+    }
+
+
+def time_calls(call, inputs, warmup=50):
+    """Per-call wall time in ns for call(item) over inputs, after a warmup pass"""
+    for item in inputs[:warmup]:
+        call(item)
+    samples = np.zeros(len(inputs), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i, item in enumerate(inputs):
+        start = clock()
+        call(item)
+        samples[i] = clock() - start
+    return samples
+
+
+def benchmark_grids(tracker, stream, grids, frames=500, warmup=50, fits=20):
+    """Mapping fit time and per-query mapping time for each N x N calibration grid"""
+    original = tracker.CALIB_GRID_SIZE
+    w, h = stream.frame_w, stream.frame_h
+    landmarks, _ = stream.session(frames)
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):  # Fits log every run
+        for size in list(grids) + [original]:
+            tracker.CALIB_GRID_SIZE = size
+            tracker.setup_screen((tracker.SCREEN_W, tracker.SCREEN_H))
+            tracker.reset_calibration()
+            calibrate_synthetic(tracker, stream)
+            if size == original and size not in grids:
+                break  # Only restoring the tracker's own grid
+            gaze = [tracker.extract_precision_gaze_features(lm, w, h)[:2] for lm in landmarks]
+            results[f'fit_{size}x{size}'] = time_calls(lambda _: tracker.fit_precision_mapping(), list(range(fits)), 2)
+            tracker.build_keyboard_precision_index()
+            results[f'mapping_{size}x{size}'] = time_calls(lambda g: tracker.map_gaze_to_screen_precise(*g),
+                                                           gaze, warmup)
+    return results
+
+
+def benchmark_blink_clicks(tracker, stream, clicks=40):
+    """Replay a blink-click trace with and without the blink freeze.
+
+    Both modes click at the pre-blink anchor, so click error and click shift
+    are reported for the freeze (the default) only. The freeze shows in the
+    cursor movement during blinks, which is reported per mode.
+    """
+    landmarks, targets = stream.blink_click_session(clicks)
+    fd, path = tempfile.mkstemp(suffix=".npz")
+    os.close(fd)
+    freeze = tracker.BLINK_FREEZE
+    results = {'blink_jump_px': {}}
+    try:
+        write_trace(path, landmarks, targets, (stream.frame_w, stream.frame_h))
+        for enabled in (True, False):
+            tracker.BLINK_FREEZE = enabled
+            tracker.cursor = NullCursor(screen=(tracker.SCREEN_W, tracker.SCREEN_H))
+            with contextlib.redirect_stdout(io.StringIO()):
+                calibrate_synthetic(tracker, stream)
+                tracker.setup_advanced_filters()
+                tracker.blink_detector.reset()
+                report = run_replay(tracker, open_replay_source(path))
+            if enabled:
+                results.update({key: report.get(key) for key in ('click_accuracy_px', 'click_shift_px')})
+            results['blink_jump_px']['freeze' if enabled else 'no_freeze'] = report.get('blink_jump_px')
+    finally:
+        tracker.BLINK_FREEZE = freeze
+        os.remove(path)
+    return results
+
+
+def check_fast_rbf(grids=(3, 5, 7), trials=5, queries=200, smoothing=0.1, tolerance=1e-6, seed=0,
+                   screen_size=(1920, 1080)):
+    """Max |ThinPlateSplineMap - SciPy RBFInterpolator| (px) for single and batched evaluation.
+
+    Each trial jitters an N x N gaze grid (the spread real calibrations
+    have) mapped to an N x N screen grid and queries random gaze points
+    inside and slightly outside it. Returns {grid size: (single, batch)} worst
+    deviations and whether all of them are within tolerance.
+    """
+    from scipy.interpolate import RBFInterpolator
+    rng = np.random.default_rng(seed)
+    worst = {}
+    for size in grids:
+        axis = np.linspace(0.1, 0.9, size)
+        screen = np.array([(x * screen_size[0], y * screen_size[1]) for y in axis for x in axis])
+        single = batch = 0.0
+        for _ in range(trials):
+            gaze = (screen / screen_size - 0.5) * (0.12, 0.08) + rng.normal(0.0, 0.004, screen.shape)
+            fast_map = ThinPlateSplineMap(gaze, screen, smoothing=smoothing)
+            reference_x = RBFInterpolator(gaze, screen[:, 0], smoothing=smoothing, kernel='thin_plate_spline')
+            reference_y = RBFInterpolator(gaze, screen[:, 1], smoothing=smoothing, kernel='thin_plate_spline')
+            low, high = gaze.min(axis=0), gaze.max(axis=0)
+            span = high - low
+            points = rng.uniform(low - 0.1 * span, high + 0.1 * span, (queries, 2))
+            reference = np.column_stack([reference_x(points), reference_y(points)])
+            batch = max(batch, float(np.max(np.abs(fast_map.evaluate_batch(points) - reference))))
+            evaluated = np.array([fast_map.evaluate(x, y) for x, y in points])
+            single = max(single, float(np.max(np.abs(evaluated - reference))))
+        worst[size] = (single, batch)
+    return worst, all(max(errors) <= tolerance for errors in worst.values())
+
+
+def benchmark_head_scroll(stream, frames=2000, fps=30.0):
+    """Head scroll controller alone, over a synthetic head-motion trace at full speed"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "head.npz")
+        write_trace(path, *stream.head_session(frames), (stream.frame_w, stream.frame_h), fps)
+        output = NullCursor()
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = replay_head(create_controller(output), open_replay_source(path))
+    return {'update_ms': report['update_ms'], 'fps': report['fps'], 'scroll_events': report['scroll_events'],
+            'scroll_events_per_second': report['scroll_events_per_second'],
+            'scroll_notches': report['scroll_units'] / WHEEL_DELTA}
+
+
+def benchmark_tracker(tracker, stream, frames=2000, warmup=50, grids=()):
+    """Time every stage of the eye pipeline separately, then the whole per-frame path"""
+    w, h = stream.frame_w, stream.frame_h
+    landmarks, targets = stream.session(frames)
+    calibrate_synthetic(tracker, stream)
+
+    gaze = [tracker.extract_precision_gaze_features(lm, w, h)[:2] for lm in landmarks]
+    raw = [tracker.map_gaze_to_screen_precise(gx, gy) for gx, gy in gaze]
+    keyboard = [(sx, sy, gx, gy) for (sx, sy), (gx, gy) in zip(raw, gaze) if tracker.is_in_keyboard_area(sx, sy)]
+    results = {}
+
+    results['features'] = time_calls(lambda lm: tracker.extract_precision_gaze_features(lm, w, h), landmarks, warmup)
+    ears = [tracker.calculate_both_ears(lm, w, h) + (i / 30.0,) for i, lm in enumerate(landmarks)]
+    tracker.blink_detector.reset()
+    results['blink_detector'] = time_calls(lambda e: tracker.blink_detector.update(*e), ears, warmup)
+    tracker.blink_detector.reset()
+    results['mapping_rbf'] = time_calls(lambda g: tracker.map_gaze_to_screen_precise(*g), gaze, warmup)
+
+    fast_map = tracker.fast_rbf_map
+    tracker.fast_rbf_map = None
+    results['mapping_rbf_scipy'] = time_calls(lambda g: tracker.map_gaze_to_screen_precise(*g), gaze, warmup)
+    tracker.fast_rbf_map = fast_map
+
+    rbf_x, rbf_y = tracker.rbf_interpolator_x, tracker.rbf_interpolator_y
+    if tracker.fit_polynomial_mapping():
+        tracker.rbf_interpolator_x = tracker.rbf_interpolator_y = None
+        results['mapping_poly'] = time_calls(lambda g: tracker.map_gaze_to_screen_precise(*g), gaze, warmup)
+    tracker.rbf_interpolator_x, tracker.rbf_interpolator_y = rbf_x, rbf_y
+
+    if keyboard:
+        results['keyboard_boost'] = time_calls(lambda k: tracker.apply_keyboard_precision_boost(*k), keyboard, warmup)
+
+    tracker.setup_advanced_filters()
+    results['smoothing'] = time_calls(lambda p: tracker.apply_precision_smoothing(*p), raw, warmup)
+    for name, gaze_filter in tracker.gaze_filters.items():
+        if name == "precision":
+            continue
+        gaze_filter.reset()
+        timed = [(sx, sy, i / 30.0) for i, (sx, sy) in enumerate(raw)]
+        results[f'filter_{name}'] = time_calls(lambda p: gaze_filter.update(*p), timed, warmup)
+
+    # One display-rate interpolation step (timer thread work between frames)
+    interpolator = CursorInterpolator(NullCursor(screen=(tracker.SCREEN_W, tracker.SCREEN_H)))
+    interpolator.update(tracker.SCREEN_W / 2.0, tracker.SCREEN_H / 2.0, (600.0, 300.0), now=0.0)
+    ticks = [(i % 4) / 120.0 for i in range(frames)]  # Four ticks per 30 FPS frame, each one a move
+    results['interpolate_tick'] = time_calls(interpolator.tick, ticks, warmup)
+
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    eye_info = tracker.extract_precision_gaze_features(landmarks[0], w, h)[2]
+
+    def draw(pos):
+        tracker.draw_precision_overlay(frame, eye_info)
+        tracker.draw_tracking_status(frame, pos[0], pos[1])
+    results['overlay'] = time_calls(draw, raw, warmup)
+
+    # Whole per-frame path (features -> mapping -> filter -> cursor -> blink click), no preview
+    tracker.setup_advanced_filters()
+    tracker.timings.reset()
+    clock = time.perf_counter
+    pipeline = np.zeros(frames, dtype=np.int64)
+    errors = []
+    started = clock()
+    with contextlib.redirect_stdout(io.StringIO()):  # Blink-click log lines would dominate the tail
+        for i, lm in enumerate(landmarks):
+            start = time.perf_counter_ns()
+            cursor = tracker.process_landmarks(None, lm, w, h, clock(), i / 30.0)
+            pipeline[i] = time.perf_counter_ns() - start
+            if cursor is not None:
+                errors.append(np.hypot(cursor[0] - targets[i, 0], cursor[1] - targets[i, 1]))
+    elapsed = clock() - started
+    results['pipeline'] = pipeline
+    results.update(benchmark_grids(tracker, stream, grids, warmup=warmup))
+    blink_clicks = benchmark_blink_clicks(tracker, stream)
+
+    # Head scroll controller on nose-tip landmarks (after the eye stages, so their synthetic frames don't change)
+    head = create_controller(NullCursor())
+    head_frames, _ = stream.head_session(frames)
+    with contextlib.redirect_stdout(io.StringIO()):
+        head.update(head_frames[0], w, h, 0.0)
+        head.calibrate()
+        results['head_scroll'] = time_calls(lambda item: head.update(item[1], w, h, item[0] / 30.0),
+                                            list(enumerate(head_frames)), warmup)
+
+    # One scroll engine tick at a steady diagonal speed (timer thread work)
+    engine = ScrollEngine(NullCursor(), stale_after=float('inf'))
+    engine.set_velocity(4.0 * WHEEL_DELTA, 12.0 * WHEEL_DELTA, now=0.0)
+    results['scroll_tick'] = time_calls(engine.tick, [i / engine.rate for i in range(frames)], warmup)
+
+    stages = {stage: latency_stats(samples) for stage, samples in results.items()}
+    return {
+        'frames': frames,
+        'frame_size': [w, h],
+        'screen_size': [tracker.SCREEN_W, tracker.SCREEN_H],
+        'calibration_points': len(tracker.calibration_data),
+        'fast_rbf': fast_map is not None,
+        'pipeline_fps': frames / elapsed if elapsed > 0 else 0.0,
+        'pipeline_error_px_p50': float(np.percentile(errors, 50)) if errors else None,
+        'blink_clicks': blink_clicks,
+        'head_scroll': benchmark_head_scroll(stream, frames),
+        'stages': stages,
+    }
+
+
+def environment():
+    """Interpreter and library versions recorded with every run"""
+    try:
+        import scipy
+        scipy_version = scipy.__version__
+    except Exception:
+        scipy_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'scipy': scipy_version,
+        'opencv': cv2.__version__,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare_results(current, baseline, tolerance=0.15):
+    """Stages whose p50 or p95 grew more than tolerance over the baseline run"""
+    regressions = []
+    for stage, stats in current['stages'].items():
+        old = baseline.get('stages', {}).get(stage)
+        if old is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if old[key] > 0 and stats[key] > old[key] * (1.0 + tolerance):
+                regressions.append((stage, key, old[key], stats[key]))
+    return regressions
+
+
+def print_report(report):
+    print(f"[BENCH] {report['frames']} synthetic frames, {report['calibration_points']}-point calibration, "
+          f"fast RBF {'on' if report['fast_rbf'] else 'off'}")
+    print(f"  {'stage':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'calls/s':>10}")
+    for stage, stats in report['stages'].items():
+        print(f"  {stage:<18} {stats['p50_ms']:9.4f} {stats['p95_ms']:9.4f} {stats['p99_ms']:9.4f} "
+              f"{stats['max_ms']:9.3f} {stats['per_second']:10.0f}")
+    print(f"[BENCH] Pipeline throughput: {report['pipeline_fps']:.0f} FPS (excluding camera and face mesh inference)")
+    blink_clicks = report.get('blink_clicks')
+    if blink_clicks:
+        clicks, shift = blink_clicks['click_accuracy_px'], blink_clicks['click_shift_px']
+        if clicks is None:
+            print("[BENCH] Blink clicks: no clicks")
+        else:
+            print(f"[BENCH] Blink clicks: {clicks['clicks']} clicks, error p50 {clicks['p50']:.1f}px "
+                  f"p95 {clicks['p95']:.1f}px, shift from pre-blink cursor max {shift['max'] if shift else 0.0:.1f}px")
+        movement = ", ".join(f"{mode.replace('_', ' ')} max {jump['max'] if jump else 0.0:.1f}px"
+                             for mode, jump in blink_clicks['blink_jump_px'].items())
+        print(f"[BENCH] Cursor movement during blinks: {movement}")
+    head = report.get('head_scroll')
+    if head:
+        print(f"[BENCH] Head scroll replay: {head['fps']:.0f} FPS, update p50 {head['update_ms']['p50']:.4f} ms, "
+              f"{head['scroll_events']} scroll events ({head['scroll_events_per_second']:.1f}/s of scrolling), "
+              f"{head['scroll_notches']:.0f} notches")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmark for the eye tracking pipeline")
+    parser.add_argument("--frames", type=int, default=2000, help="Synthetic frames per stage (default 2000)")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed calls before each stage")
+    parser.add_argument("--screen", default="1920x1080", help="Screen size for the calibration grid")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic stream seed")
+    parser.add_argument("--grids", default="3,5,7",
+                        help="Calibration grid sizes to time mapping fit/evaluation for (default 3,5,7)")
+    parser.add_argument("--blink-trace", metavar="NPZ",
+                        help="Write a synthetic calibration + blink-click trace for main.py --replay --calibrate, and exit")
+    parser.add_argument("--check", action="store_true",
+                        help="Check the fast TPS evaluator against SciPy's RBFInterpolator (1e-6 px) and exit")
+    parser.add_argument("--head-trace", metavar="NPZ",
+                        help="Write a synthetic head-motion trace for head-control/main.py --replay, and exit")
+    parser.add_argument("--output", metavar="JSON", help="Write results (with environment info) to this file")
+    parser.add_argument("--compare", metavar="JSON", help="Baseline results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed p50/p95 slowdown versus the baseline (default 0.15 = 15%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    grids = [int(size) for size in args.grids.split(",") if size.strip()]
+    if args.check:
+        worst, ok = check_fast_rbf(grids, seed=args.seed)
+        for size, (single, batch) in worst.items():
+            print(f"[CHECK] {size}x{size} grid: max deviation from SciPy {single:.2e}px single, {batch:.2e}px batched")
+        print(f"[CHECK] Fast TPS evaluator {'matches' if ok else 'DOES NOT match'} SciPy within 1e-6 px")
+        return 0 if ok else 1
+    from main import PrecisionEyeTracker
+
+    screen_w, screen_h = (int(v) for v in args.screen.lower().split("x"))
+    tracker = PrecisionEyeTracker(camera=False, headless=True, screen_size=(screen_w, screen_h),
+                                  cursor=NullCursor())
+    stream = SyntheticLandmarkStream(screen_size=(screen_w, screen_h), seed=args.seed)
+    if args.blink_trace:
+        calibration, calibration_targets = stream.calibration_session(tracker.calib_points,
+                                                                      tracker.CALIB_HOLD_FRAMES)
+        clicks, click_targets = stream.blink_click_session(60)
+        write_trace(args.blink_trace, calibration + clicks, np.vstack([calibration_targets, click_targets]),
+                    (stream.frame_w, stream.frame_h))
+        print(f"[BENCH] Blink-click trace written to {args.blink_trace}")
+        return 0
+    if args.head_trace:
+        write_trace(args.head_trace, *stream.head_session(args.frames), (stream.frame_w, stream.frame_h))
+        print(f"[BENCH] Head-motion trace written to {args.head_trace}")
+        return 0
+
+    report = benchmark_tracker(tracker, stream, frames=args.frames, warmup=args.warmup, grids=grids)
+    report['environment'] = environment()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        for stage, key, old, new in regressions:
+            print(f"[REGRESSION] {stage} {key}: {old:.4f} -> {new:.4f} ms ({(new / old - 1.0) * 100.0:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"[BENCH] No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import math
+from collections import deque
+
+OPEN, CLOSING, CLOSED = "open", "closing", "closed"
+
+
+class BlinkEvent:
+    """A completed closure: kind is "blink" (both eyes), "wink_left" or "wink_right"."""
+
+    def __init__(self, kind, onset, closed_at, reopened_at, min_ear):
+        self.kind = kind
+        self.onset = onset              # First frame the closure was seen coming (trend or onset level)
+        self.closed_at = closed_at      # First frame below the closed threshold
+        self.reopened_at = reopened_at  # Frame the event fired on
+        self.min_ear = min_ear          # Per eye (left, right)
+
+    @property
+    def duration(self):
+        return self.reopened_at - self.closed_at
+
+    def __repr__(self):
+        return f"BlinkEvent({self.kind}, {self.duration * 1000:.0f} ms)"
+
+
+class EyeLevels:
+    """Adaptive open/closed EAR levels for one eye and the thresholds between them.
+
+    The open level follows open-eye frames slowly. The closed level follows
+    the deepest EAR of each accepted closure. Thresholds sit at fixed
+    fractions of the gap, so they move with the user, the camera angle and
+    the lighting. A fast EAR drop only counts as a closure starting below
+    slope_ratio of the open level, so noise on a fully open eye can't start one.
+    """
+
+    def __init__(self, open_ear=0.33, closed_ratio=0.4, close_fraction=0.55, reopen_fraction=0.65,
+                 onset_fraction=0.8, slope_ratio=0.93, open_rate=0.01, closed_rate=0.2):
+        self.close_fraction = close_fraction    # Closed below closed + fraction * gap
+        self.reopen_fraction = reopen_fraction  # Open again above this (hysteresis)
+        self.onset_fraction = onset_fraction    # Closure starting below this
+        self.slope_ratio = slope_ratio          # Fast drop starts a closure below this fraction of open
+        self.closed_ratio = closed_ratio        # Initial closed level as a fraction of open
+        self.open_rate = open_rate
+        self.closed_rate = closed_rate
+        self.seed(open_ear)
+
+    def seed(self, open_ear):
+        """Restart from a measured open EAR (calibration or profile)"""
+        self.open = float(open_ear)
+        self.closed = self.open * self.closed_ratio
+        self.update_thresholds()
+
+    def update_thresholds(self):
+        gap = self.open - self.closed
+        self.close = self.closed + self.close_fraction * gap
+        self.reopen = self.closed + self.reopen_fraction * gap
+        self.onset = self.closed + self.onset_fraction * gap
+        self.slope_onset = self.open * self.slope_ratio
+
+    def observe_open(self, ear):
+        if ear > self.reopen:
+            self.open += self.open_rate * (ear - self.open)
+            self.update_thresholds()
+
+    def observe_closure(self, min_ear):
+        if min_ear < self.close:
+            self.closed += self.closed_rate * (min_ear - self.closed)
+            self.update_thresholds()
+
+
+class BlinkDetector:
+    """Streaming blink/wink classifier over per-eye EAR.
+
+    Runs an open -> closing -> closed -> open state machine. The closing
+    state starts when either eye drops below its onset level, or its EAR
+    falls faster than onset_speed (EAR/s) and is already somewhat below the
+    open level. The closed state starts below
+    the closed threshold. The closure ends on the first frame where every
+    closed eye is back above its reopen threshold. That frame's update()
+    returns the event, so a click adds no frames after the reopen. A closure
+    counts only when it lasted between min_closed and max_closed seconds.
+    Shorter ones are single-frame noise and longer ones are resting eyes; they
+    are counted in rejected_short / rejected_long. A wink is one eye closed
+    while the other stayed above its onset level throughout.
+    """
+
+    def __init__(self, open_ear=0.33, min_closed=0.07, max_closed=0.8, onset_speed=1.5, max_onset=0.3,
+                 refractory=0.15, history=5):
+        self.eyes = (EyeLevels(open_ear), EyeLevels(open_ear))  # (left, right)
+        self.min_closed = min_closed    # s; shorter closures are noise
+        self.max_closed = max_closed    # s; longer closures are not a click
+        self.onset_speed = onset_speed  # EAR/s drop that starts a closure before any threshold
+        self.max_onset = max_onset      # s a closing state may last without closing
+        self.refractory = refractory    # s after an event before the next closure can start
+        self.history = deque(maxlen=history)  # (timestamp, left EAR, right EAR)
+
+        # Counters
+        self.events = 0
+        self.rejected_short = 0
+        self.rejected_long = 0
+        self.aborted = 0
+        self.reset()
+
+    def reset(self):
+        """Back to open, e.g. after the face was lost"""
+        self.state = OPEN
+        self.onset = None
+        self.closed_at = None
+        self.closed_eyes = [False, False]
+        self.other_open = [True, True]  # Per eye: stayed above onset level through the closure
+        self.min_ear = [math.inf, math.inf]
+        self.last_event_at = -math.inf
+        self.history.clear()
+
+    def seed(self, open_ear):
+        for eye in self.eyes:
+            eye.seed(open_ear)
+
+    @property
+    def closing(self):
+        """True from the first sign of a closure until the eyes reopen"""
+        return self.state != OPEN
+
+    def trend(self):
+        """Per-eye EAR slope (EAR/s) over the recent history, least squares"""
+        if len(self.history) < 3:
+            return 0.0, 0.0
+        t0 = self.history[0][0]
+        ts = [entry[0] - t0 for entry in self.history]
+        mean_t = sum(ts) / len(ts)
+        var_t = sum((t - mean_t) ** 2 for t in ts)
+        if var_t <= 0.0:
+            return 0.0, 0.0
+        slopes = []
+        for k in (1, 2):
+            values = [entry[k] for entry in self.history]
+            mean_v = sum(values) / len(values)
+            slopes.append(sum((t - mean_t) * (v - mean_v) for t, v in zip(ts, values)) / var_t)
+        return slopes[0], slopes[1]
+
+    def starting(self, ears, slopes):
+        """True while either eye looks like a closure starting (onset level or a fast drop)"""
+        return any(ear < eye.onset or (slope < -self.onset_speed and ear < eye.slope_onset)
+                   for eye, ear, slope in zip(self.eyes, ears, slopes))
+
+    def update(self, left_ear, right_ear, timestamp):
+        """Feed one frame; returns a BlinkEvent on the frame a valid closure reopens, else None"""
+        if self.history and timestamp - self.history[-1][0] > self.max_closed:
+            self.reset()  # Gap in frames (face lost): don't stitch closures across it
+        self.history.append((timestamp, left_ear, right_ear))
+        ears = (left_ear, right_ear)
+
+        if self.state == OPEN:
+            for eye, ear in zip(self.eyes, ears):
+                eye.observe_open(ear)
+            if timestamp - self.last_event_at < self.refractory:
+                return None
+            if self.starting(ears, self.trend()):
+                self.state = CLOSING
+                self.onset = timestamp
+                self.closed_eyes = [False, False]
+                self.other_open = [True, True]
+                self.min_ear = [math.inf, math.inf]
+
+        if self.state == OPEN:
+            return None
+
+        for i, (eye, ear) in enumerate(zip(self.eyes, ears)):
+            self.min_ear[i] = min(self.min_ear[i], ear)
+            if ear < eye.close:
+                self.closed_eyes[i] = True
+            if ear < eye.onset:
+                self.other_open[1 - i] = False  # The other eye's closure is no longer a clean wink
+
+        if self.state == CLOSING:
+            if any(self.closed_eyes):
+                self.state = CLOSED
+                self.closed_at = timestamp
+            elif timestamp - self.onset > self.max_onset or not self.starting(ears, self.trend()):
+                self.aborted += 1  # Eyes opened again without closing (squint, look down)
+                self.state = OPEN
+            return None
+
+        # CLOSED: wait until every eye that closed is open again
+        if not all(ears[i] > self.eyes[i].reopen for i in range(2) if self.closed_eyes[i]):
+            return None
+        self.state = OPEN
+        duration = timestamp - self.closed_at
+        if duration < self.min_closed:
+            self.rejected_short += 1
+            return None
+        if duration > self.max_closed:
+            self.rejected_long += 1
+            return None
+
+        for i in range(2):
+            if self.closed_eyes[i]:
+                self.eyes[i].observe_closure(self.min_ear[i])
+        if all(self.closed_eyes):
+            kind = "blink"
+        elif self.closed_eyes[0]:
+            kind = "wink_left" if self.other_open[0] else "blink"
+        else:
+            kind = "wink_right" if self.other_open[1] else "blink"
+        self.last_event_at = timestamp
+        self.events += 1
+        return BlinkEvent(kind, self.onset, self.closed_at, timestamp, tuple(self.min_ear))
+
+
+class DwellClicker:
+    """Click by holding the cursor still, for users who can't blink reliably.
+
+    A click fires once the cursor has stayed within radius_px of where it
+    settled for dwell_time seconds. It lands on the mean position over the
+    dwell. The cursor must then leave the radius before the next dwell click.
+    """
+
+    def __init__(self, dwell_time=1.0, radius_px=35.0):
+        self.dwell_time = dwell_time
+        self.radius_px = radius_px
+        self.reset()
+
+    def reset(self):
+        self.anchor = None
+        self.started = None
+        self.sum_x = self.sum_y = 0.0
+        self.count = 0
+        self.fired = False
+
+    def update(self, x, y, timestamp):
+        """Feed one cursor position; returns the (x, y) to click or None"""
+        if self.anchor is None or math.hypot(x - self.anchor[0], y - self.anchor[1]) > self.radius_px:
+            self.anchor = (x, y)
+            self.started = timestamp
+            self.sum_x = self.sum_y = 0.0
+            self.count = 0
+            self.fired = False
+        self.sum_x += x
+        self.sum_y += y
+        self.count += 1
+        if not self.fired and timestamp - self.started >= self.dwell_time:
+            self.fired = True
+            return self.sum_x / self.count, self.sum_y / self.count
+        return None
+
+    def progress(self, timestamp):
+        """0..1 towards the next dwell click (0 once it has fired)"""
+        if self.anchor is None or self.fired:
+            return 0.0
+        return min(1.0, (timestamp - self.started) / self.dwell_time)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class LatestFrameGrabber:
+    """Background camera reader that always hands out the newest frame.
+
+    Three preallocated slots are rotated between the capture thread, the
+    consumer and a single "ready" slot. Publishing a new frame overwrites
+    whatever was waiting in the ready slot, so the consumer never blocks on
+    camera I/O and never processes a frame that is already stale.
+    """
+
+    def __init__(self, cap, frame_shape, mirror=True, timings=None):
+        self.cap = cap
+        self.mirror = mirror
+        self.timings = timings
+
+        # Slot ownership: one for the writer, one for the reader, one spare/ready
+        self.slots = [np.zeros(frame_shape, dtype=np.uint8) for _ in range(3)]
+        self.slot_times = [0.0, 0.0, 0.0]
+        self.slot_seqs = [0, 0, 0]
+        self.scratch = np.zeros(frame_shape, dtype=np.uint8)
+        self.write_idx, self.ready_idx, self.read_idx = 0, 1, 2
+        self.has_fresh = False
+        self.pending_resolution = None
+
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, name="frame-grabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the capture thread and wake any waiting consumer"""
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _capture_loop(self):
+        """Read frames into the write slot and publish them as the newest frame"""
+        while self.running:
+            if self.pending_resolution is not None:
+                self._apply_resolution()
+            read_start = time.perf_counter()
+            slot = self.slots[self.write_idx]
+            target = self.scratch if self.mirror else slot
+            try:
+                ret, frame = self.cap.read(target)
+            except Exception as e:
+                print(f"[CAMERA] Capture error: {e}")
+                ret, frame = False, None
+
+            if not ret or frame is None:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+
+            if frame.shape != slot.shape:
+                # Driver ignored the output buffer (resolution change) - reallocate
+                self._resize_slots(frame.shape)
+                slot = self.slots[self.write_idx]
+            if self.mirror:
+                cv2.flip(frame, 1, dst=slot)
+            elif frame is not slot:
+                np.copyto(slot, frame)
+
+            captured_at = time.perf_counter()
+            if self.timings is not None:
+                self.timings.add("capture", captured_at - read_start)
+
+            with self.cond:
+                self.frames_captured += 1
+                self.slot_times[self.write_idx] = captured_at
+                self.slot_seqs[self.write_idx] = self.frames_captured
+                if self.has_fresh:
+                    self.frames_dropped += 1  # Consumer never saw the previous frame
+                self.write_idx, self.ready_idx = self.ready_idx, self.write_idx
+                self.has_fresh = True
+                self.cond.notify()
+
+    def request_resolution(self, width, height):
+        """Ask the capture thread to switch camera resolution before its next read"""
+        self.pending_resolution = (int(width), int(height))
+
+    def _apply_resolution(self):
+        width, height = self.pending_resolution
+        self.pending_resolution = None
+        try:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            actual = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            print(f"[CAMERA] Resolution {width}x{height} requested, camera delivers {actual[0]}x{actual[1]}")
+        except Exception as e:
+            print(f"[CAMERA] Resolution change failed: {e}")
+
+    def _resize_slots(self, frame_shape):
+        """Reallocate writer-owned buffers after a resolution change"""
+        self.scratch = np.zeros(frame_shape, dtype=np.uint8)
+        self.slots[self.write_idx] = np.zeros(frame_shape, dtype=np.uint8)
+
+    def read_latest(self, timeout=0.5):
+        """Return (frame, capture_timestamp, sequence) for the newest frame.
+
+        The returned array stays owned by the caller until the next call, so
+        it can be drawn on freely. Returns (None, None, None) on timeout.
+        """
+        with self.cond:
+            if not self.has_fresh:
+                self.cond.wait_for(lambda: self.has_fresh or not self.running, timeout)
+            if not self.has_fresh:
+                return None, None, None
+            self.read_idx, self.ready_idx = self.ready_idx, self.read_idx
+            self.has_fresh = False
+            idx = self.read_idx
+            return self.slots[idx], self.slot_times[idx], self.slot_seqs[idx]
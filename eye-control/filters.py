@@ -0,0 +1,259 @@
+import math
+
+import numpy as np
+
+
+class PositionRing:
+    """Fixed-capacity 2D position history with allocation-free window statistics.
+
+    Every sample is written twice (at i and i + capacity) so the newest k
+    samples are always one contiguous, chronological view of the backing
+    array. The statistics below write into caller-provided buffers and use
+    the same NumPy reductions as the deque-based filter they replace, so the
+    results are bit-for-bit identical.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, 2))
+        self.head = 0
+        self.size = 0
+        self._scratch = np.zeros((capacity, 2))
+        self._pair = np.zeros(2)
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """Forget all samples (storage is kept)"""
+        self.head = 0
+        self.size = 0
+
+    def append(self, pos):
+        """Add a sample, evicting the oldest one when full"""
+        self.data[self.head] = pos
+        self.data[self.head + self.capacity] = pos
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def last(self, k=None):
+        """Chronological view of the newest k samples (all samples by default)"""
+        k = self.size if k is None else min(k, self.size)
+        end = self.head + self.capacity
+        return self.data[end - k:end]
+
+    def median3(self, out):
+        """Per-axis median of the newest three samples"""
+        a, b, c = self.last(3)
+        np.minimum(a, b, out=out)
+        np.maximum(a, b, out=self._pair)
+        np.minimum(self._pair, c, out=self._pair)
+        np.maximum(out, self._pair, out=out)
+        return out
+
+    def window_std(self, k, out):
+        """Per-axis population standard deviation of the newest k samples"""
+        window = self.last(k)
+        mean = self._pair
+        np.sum(window, axis=0, out=mean)
+        np.true_divide(mean, k, out=mean)
+        deviations = self._scratch[:k]
+        np.subtract(window, mean, out=deviations)
+        np.multiply(deviations, deviations, out=deviations)
+        np.sum(deviations, axis=0, out=out)
+        np.true_divide(out, k, out=out)
+        np.sqrt(out, out=out)
+        return out
+
+    def weighted_mean(self, weights, weight_sum, out):
+        """Weighted mean of all samples; weights[i] applies to the i-th oldest sample"""
+        window = self.last()
+        weighted = self._scratch[:len(window)]
+        np.multiply(window, weights[:len(window), None], out=weighted)
+        np.sum(weighted, axis=0, out=out)
+        np.true_divide(out, weight_sum, out=out)
+        return out
+
+
+class FilterLatencyMeter:
+    """Running estimate of how many frames a filter's output trails its input.
+
+    While the raw signal is moving, the lag along the direction of motion is
+    (raw - output) . v / |v|^2 frames, with v the raw per-frame displacement.
+    Samples are averaged with an exponential moving average.
+    """
+
+    def __init__(self, min_speed=2.0, decay=0.05):
+        self.min_speed = min_speed  # px/frame below which the lag is undefined
+        self.decay = decay
+        self.reset()
+
+    def reset(self):
+        self.frames = 0.0
+        self.samples = 0
+        self.prev_raw = None
+
+    def update(self, raw_x, raw_y, out_x, out_y):
+        if self.prev_raw is not None:
+            vx = raw_x - self.prev_raw[0]
+            vy = raw_y - self.prev_raw[1]
+            speed_sq = vx * vx + vy * vy
+            if speed_sq >= self.min_speed * self.min_speed:
+                lag = ((raw_x - out_x) * vx + (raw_y - out_y) * vy) / speed_sq
+                if self.samples == 0:
+                    self.frames = lag
+                else:
+                    self.frames += self.decay * (lag - self.frames)
+                self.samples += 1
+        self.prev_raw = (raw_x, raw_y)
+
+
+class GazeFilter:
+    """Interface for cursor filters: update() takes a raw screen position and a
+    timestamp in seconds and returns the filtered position. velocity holds
+    the filter's current estimate in px/s."""
+
+    name = "base"
+
+    def __init__(self):
+        self.latency = FilterLatencyMeter()
+        self.velocity = (0.0, 0.0)
+
+    def reset(self):
+        """Forget all filter state"""
+        self.latency.reset()
+        self.velocity = (0.0, 0.0)
+
+    def update(self, x, y, timestamp):
+        raise NotImplementedError
+
+
+class PrecisionChainFilter(GazeFilter):
+    """The tracker's own four-stage chain (outlier clamp, weighted average,
+    adaptive alpha, deadzone) behind the filter interface"""
+
+    name = "precision"
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.last_out = None
+        self.last_time = None
+
+    def update(self, x, y, timestamp):
+        out_x, out_y = self.tracker.apply_precision_smoothing(x, y)
+        if out_x is None:
+            return None, None
+        if self.last_out is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+            self.velocity = ((out_x - self.last_out[0]) / dt, (out_y - self.last_out[1]) / dt)
+        self.last_out = (out_x, out_y)
+        self.last_time = timestamp
+        return out_x, out_y
+
+
+class OneEuroFilter(GazeFilter):
+    """One Euro filter (Casiez et al. 2012): the cutoff frequency rises with
+    speed, so fixations are smoothed hard while saccades pass with little lag"""
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0, default_rate=30.0):
+        self.min_cutoff = min_cutoff  # Hz at rest
+        self.beta = beta              # Cutoff increase per px/s of speed
+        self.d_cutoff = d_cutoff      # Hz for the derivative estimate
+        self.default_dt = 1.0 / default_rate
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.prev = None
+        self.last_time = None
+
+    @staticmethod
+    def smoothing_factor(dt, cutoff):
+        r = 2.0 * math.pi * cutoff * dt
+        return r / (r + 1.0)
+
+    def update(self, x, y, timestamp):
+        if self.prev is None:
+            self.prev = (x, y)
+            self.last_time = timestamp
+            return x, y
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            dt = self.default_dt
+        self.last_time = timestamp
+
+        # Smoothed derivative drives the adaptive cutoff
+        a_d = self.smoothing_factor(dt, self.d_cutoff)
+        vx = a_d * (x - self.prev[0]) / dt + (1.0 - a_d) * self.velocity[0]
+        vy = a_d * (y - self.prev[1]) / dt + (1.0 - a_d) * self.velocity[1]
+        self.velocity = (vx, vy)
+
+        cutoff = self.min_cutoff + self.beta * math.hypot(vx, vy)
+        a = self.smoothing_factor(dt, cutoff)
+        fx = a * x + (1.0 - a) * self.prev[0]
+        fy = a * y + (1.0 - a) * self.prev[1]
+        self.prev = (fx, fy)
+        return fx, fy
+
+
+class ConstantVelocityKalmanFilter(GazeFilter):
+    """Per-axis constant-velocity Kalman filter with white-noise acceleration"""
+
+    name = "kalman"
+
+    def __init__(self, acceleration_noise=3000.0, measurement_noise=12.0, default_rate=30.0):
+        self.q = acceleration_noise ** 2   # (px/s^2)^2
+        self.r = measurement_noise ** 2    # px^2
+        self.default_dt = 1.0 / default_rate
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.state = None  # Per axis: [position, velocity, P00, P01, P11]
+        self.last_time = None
+
+    def _step(self, axis, z, dt):
+        p, v, p00, p01, p11 = axis
+
+        # Predict
+        p += v * dt
+        dt2 = dt * dt
+        p00 += dt * (2.0 * p01 + dt * p11) + self.q * dt2 * dt2 / 4.0
+        p01 += dt * p11 + self.q * dt2 * dt / 2.0
+        p11 += self.q * dt2
+
+        # Update with the position measurement
+        s = p00 + self.r
+        k0 = p00 / s
+        k1 = p01 / s
+        residual = z - p
+        p += k0 * residual
+        v += k1 * residual
+        p11 -= k1 * p01
+        p01 -= k0 * p01
+        p00 -= k0 * p00
+        return [p, v, p00, p01, p11]
+
+    def update(self, x, y, timestamp):
+        if self.state is None:
+            self.state = [[x, 0.0, self.r, 0.0, 1e6], [y, 0.0, self.r, 0.0, 1e6]]
+            self.last_time = timestamp
+            return x, y
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            dt = self.default_dt
+        self.last_time = timestamp
+
+        self.state[0] = self._step(self.state[0], x, dt)
+        self.state[1] = self._step(self.state[1], y, dt)
+        self.velocity = (self.state[0][1], self.state[1][1])
+        return self.state[0][0], self.state[1][0]
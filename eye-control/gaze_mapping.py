@@ -0,0 +1,225 @@
+import math
+from collections import deque
+
+import numpy as np
+
+TINY = np.finfo(np.float64).tiny
+
+
+class ThinPlateSplineMap:
+    """Combined x/y thin-plate-spline evaluator for the calibrated gaze mapping.
+
+    Solves the same system as scipy's RBFInterpolator(kernel='thin_plate_spline')
+    with a degree-1 polynomial tail, but evaluates both screen axes in one pass
+    over preallocated buffers, so a single-point query costs a handful of
+    small NumPy ops instead of two full RBFInterpolator calls.
+
+    With samples given, values belong to the samples rather than the centers
+    and the spline is a penalized least-squares fit over all of them (a
+    regression spline with knots at the centers). The normal equations are
+    k x k for k centers, so the fit is linear in the number of samples and
+    evaluation cost still depends on k only. With one sample per center it
+    reproduces the interpolating solution.
+    """
+
+    def __init__(self, centers, values, smoothing=0.0, samples=None):
+        centers = np.asarray(centers, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        n = len(centers)
+
+        # Polynomial tail is built on the centers' bounding box scaled to [-1, 1]
+        mins = centers.min(axis=0)
+        maxs = centers.max(axis=0)
+        self.shift = (maxs + mins) / 2.0
+        self.scale = (maxs - mins) / 2.0
+        self.scale[self.scale == 0.0] = 1.0
+
+        kernel_matrix = self.kernel(self._squared_distances(centers, centers))
+        poly = self._polynomial(centers)
+        self.centers = centers
+        if samples is None:
+            lhs = np.zeros((n + 3, n + 3))
+            lhs[:n, :n] = kernel_matrix
+            lhs[:n, :n] += np.eye(n) * smoothing
+            lhs[:n, n:] = poly
+            lhs[n:, :n] = poly.T
+
+            rhs = np.zeros((n + 3, values.shape[1]))
+            rhs[:n] = values
+            self.coeffs = np.linalg.solve(lhs, rhs)
+        else:
+            self.coeffs = self._fit_regression(np.asarray(samples, dtype=np.float64).reshape(-1, 2),
+                                               values, kernel_matrix, poly, smoothing)
+        self.kernel_coeffs = self.coeffs[:n]
+        self.poly_coeffs = self.coeffs[n:]
+
+        # Single-query path evaluates r^2 log(r^2), so fold the 1/2 into the weights
+        self._eval_coeffs = self.coeffs.copy()
+        self._eval_coeffs[:n] *= 0.5
+
+        # Preallocated single-query buffers
+        self._query = np.zeros(2)
+        self._diff = np.zeros((n, 2))
+        self._r2 = np.zeros(n)
+        self._log = np.zeros(n)
+        self._vec = np.zeros(n + 3)
+        self._vec[n] = 1.0
+        self._out = np.zeros(values.shape[1])
+        self._n = n
+
+    def _fit_regression(self, samples, values, kernel_matrix, poly, smoothing):
+        """min |A c - values|^2 + penalty * w' K w subject to P' w = 0, via its KKT system.
+
+        The penalty is scaled by samples per center so smoothing means the
+        same as for the interpolating fit on per-center averages.
+        """
+        n = len(self.centers)
+        design = np.hstack([self.kernel(self._squared_distances(samples, self.centers)),
+                            self._polynomial(samples)])
+        penalty = smoothing * len(samples) / n
+
+        lhs = np.zeros((n + 6, n + 6))
+        lhs[:n + 3, :n + 3] = design.T @ design
+        lhs[:n, :n] += penalty * kernel_matrix
+        lhs[:n, n + 3:] = poly
+        lhs[n + 3:, :n] = poly.T
+
+        rhs = np.zeros((n + 6, values.shape[1]))
+        rhs[:n + 3] = design.T @ values
+        try:
+            solution = np.linalg.solve(lhs, rhs)
+        except np.linalg.LinAlgError:
+            solution = np.linalg.lstsq(lhs, rhs, rcond=None)[0]
+        return solution[:n + 3]
+
+    @staticmethod
+    def kernel(r2):
+        """Thin-plate spline r^2 log(r), written in terms of r^2 (0 at r = 0)"""
+        return 0.5 * r2 * np.log(np.maximum(r2, TINY))
+
+    @staticmethod
+    def _squared_distances(a, b):
+        diff = a[:, None, :] - b[None, :, :]
+        return np.einsum('ijk,ijk->ij', diff, diff)
+
+    def _polynomial(self, points):
+        scaled = (points - self.shift) / self.scale
+        return np.column_stack([np.ones(len(points)), scaled])
+
+    def evaluate(self, gaze_x, gaze_y):
+        """Map a single gaze point; returns (screen_x, screen_y)"""
+        n = self._n
+        self._query[0] = gaze_x
+        self._query[1] = gaze_y
+
+        np.subtract(self.centers, self._query, out=self._diff)
+        np.multiply(self._diff, self._diff, out=self._diff)
+        np.add(self._diff[:, 0], self._diff[:, 1], out=self._r2)
+        np.maximum(self._r2, TINY, out=self._log)
+        np.log(self._log, out=self._log)
+        np.multiply(self._r2, self._log, out=self._vec[:n])
+
+        self._vec[n + 1] = (gaze_x - self.shift[0]) / self.scale[0]
+        self._vec[n + 2] = (gaze_y - self.shift[1]) / self.scale[1]
+        np.dot(self._vec, self._eval_coeffs, out=self._out)
+        return float(self._out[0]), float(self._out[1])
+
+    def evaluate_batch(self, points):
+        """Map many gaze points at once; points is (m, 2), returns (m, 2)"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        phi = self.kernel(self._squared_distances(points, self.centers))
+        return phi @ self.kernel_coeffs + self._polynomial(points) @ self.poly_coeffs
+
+
+def leave_one_out_errors(centers, values, smoothing=0.0):
+    """Screen error (px) at each calibration point when the spline is fitted without it"""
+    centers = np.asarray(centers, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    errors = np.zeros(len(centers))
+    for i in range(len(centers)):
+        keep = np.arange(len(centers)) != i
+        predicted = ThinPlateSplineMap(centers[keep], values[keep], smoothing).evaluate_batch(centers[i:i + 1])[0]
+        errors[i] = np.hypot(*(predicted - values[i]))
+    return errors
+
+
+class OnlineResidualCorrector:
+    """Affine screen-space correction learned online on top of a fixed gaze mapping.
+
+    The correction is [1, gx, gy] @ weights, with gaze scaled to [-1, 1] over
+    the calibration's bounding box. It is ridge regression over the newest
+    `capacity` (gaze, residual) pairs, kept exact without refitting: each new
+    pair is a Sherman-Morrison rank-1 update of the inverse Gram matrix, and
+    once the reservoir is full the oldest pair is removed with a rank-1
+    downdate. The ridge prior holds the correction at zero until clicks
+    agree on one, and the fit is recomputed from the reservoir every
+    `refresh_every` updates to shed rounding error.
+    """
+
+    def __init__(self, shift, scale, capacity=60, ridge=2.0, max_residual=150.0, refresh_every=200):
+        self.shift = np.asarray(shift, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64).copy()
+        self.scale[self.scale == 0.0] = 1.0
+        self.capacity = capacity
+        self.ridge = ridge
+        self.max_residual = max_residual  # px; larger residuals are not fixations on the click target
+        self.refresh_every = refresh_every
+        self._phi = np.ones(3)
+        self._out = np.zeros(2)
+        self.reset()
+
+    def reset(self):
+        self.inverse = np.eye(3) / self.ridge  # (ridge I + sum phi phi^T)^-1
+        self.weights = np.zeros((3, 2))
+        self.samples = deque()                  # (phi, residual) in arrival order
+        self.updates = 0
+        self.rejected = 0
+
+    def features(self, gaze_x, gaze_y):
+        self._phi[1] = (gaze_x - self.shift[0]) / self.scale[0]
+        self._phi[2] = (gaze_y - self.shift[1]) / self.scale[1]
+        return self._phi
+
+    def correct(self, gaze_x, gaze_y):
+        """Screen offset (dx, dy) to add to the base mapping at this gaze"""
+        np.dot(self.features(gaze_x, gaze_y), self.weights, out=self._out)
+        return float(self._out[0]), float(self._out[1])
+
+    def observe(self, gaze_x, gaze_y, residual_x, residual_y):
+        """Learn that the base mapping at this gaze is off by (residual_x, residual_y) px.
+
+        Returns False if the pair was rejected as an outlier.
+        """
+        if math.hypot(residual_x, residual_y) > self.max_residual:
+            self.rejected += 1
+            return False
+        phi = self.features(gaze_x, gaze_y).copy()
+        residual = np.array([residual_x, residual_y])
+        if len(self.samples) >= self.capacity:
+            self._rank_one(*self.samples.popleft(), sign=-1.0)
+        self._rank_one(phi, residual, sign=1.0)
+        self.samples.append((phi, residual))
+        self.updates += 1
+        if self.updates % self.refresh_every == 0:
+            self.refit()
+        return True
+
+    def _rank_one(self, phi, residual, sign):
+        """Add (sign=1) or remove (sign=-1) one pair from the running ridge solution"""
+        p_phi = self.inverse @ phi
+        gain = p_phi / (1.0 + sign * (phi @ p_phi))
+        error = residual - phi @ self.weights
+        self.weights += sign * np.outer(gain, error)
+        self.inverse -= sign * np.outer(gain, p_phi)
+
+    def refit(self):
+        """Exact solve over the reservoir"""
+        gram = np.eye(3) * self.ridge
+        rhs = np.zeros((3, 2))
+        for phi, residual in self.samples:
+            gram += np.outer(phi, phi)
+            rhs += np.outer(phi, residual)
+        self.inverse = np.linalg.inv(gram)
+        self.weights = self.inverse @ rhs
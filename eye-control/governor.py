@@ -0,0 +1,142 @@
+import time
+from collections import deque
+
+
+class GovernorLevel:
+    """One rung of the quality ladder"""
+
+    def __init__(self, width, height, inference_every, preview_every):
+        self.width = width                      # Capture resolution
+        self.height = height
+        self.inference_every = inference_every  # Run face mesh on every Nth frame, reuse landmarks otherwise
+        self.preview_every = preview_every      # Render the preview/calibration windows every Nth frame
+
+    def describe(self):
+        return (f"{self.width}x{self.height}, inference every {self.inference_every}, "
+                f"preview every {self.preview_every}")
+
+
+def build_levels(width, height):
+    """Default ladder for a camera opened at width x height: cheaper rendering first,
+    then inference skipping, then lower capture resolution"""
+    return [
+        GovernorLevel(width, height, 1, 1),
+        GovernorLevel(width, height, 1, 2),
+        GovernorLevel(width, height, 2, 3),
+        GovernorLevel(width * 3 // 4, height * 3 // 4, 2, 4),
+        GovernorLevel(width // 2, height // 2, 3, 6),
+    ]
+
+
+class PerformanceGovernor:
+    """Holds a per-frame latency budget by walking a quality ladder.
+
+    An exponential moving average of the measured per-frame processing time
+    is compared against the budget: staying above it degrades one level,
+    staying well below it (headroom) for longer restores one level, with a
+    settle time after every change. While gaze has been still for
+    idle_after seconds the governor sits at idle_level or lower, and it
+    returns to the load-driven level as soon as gaze moves. Every change is
+    printed and kept in decisions with its reason.
+    """
+
+    def __init__(self, levels, budget_ms=33.0, headroom=0.6, degrade_after=0.5, restore_after=3.0,
+                 settle=1.0, idle_after=5.0, idle_radius=25.0, idle_level=None, decay=0.1):
+        self.levels = levels
+        self.budget = budget_ms / 1000.0
+        self.headroom = headroom            # Restore only below budget * headroom
+        self.degrade_after = degrade_after  # Seconds over budget before degrading
+        self.restore_after = restore_after  # Seconds under headroom before restoring
+        self.settle = settle                # Seconds to ignore after a change
+        self.idle_after = idle_after        # Seconds of still gaze before low-power mode
+        self.idle_radius = idle_radius      # px the cursor may wander and still count as still
+        self.idle_level = self.deepest_full_resolution_level() if idle_level is None else idle_level
+        self.decay = decay
+        self.decisions = deque(maxlen=50)
+        self.reset()
+
+    def reset(self):
+        self.load_level = 0        # Level chosen from processing time alone
+        self.level = 0             # Level in effect (load level, or idle level when still)
+        self.ema = None
+        self.over_since = None
+        self.under_since = None
+        self.changed_at = float('-inf')
+        self.idle = False
+        self.anchor = None         # Cursor position the stillness is measured from
+        self.still_since = None
+
+    def deepest_full_resolution_level(self):
+        """Cheapest level that keeps the top capture resolution, so going idle and
+        back never reconfigures the camera (only preview and inference are skipped)"""
+        top = (self.levels[0].width, self.levels[0].height)
+        return max(i for i, level in enumerate(self.levels) if (level.width, level.height) == top)
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def observe(self, processing, now=None, cursor=None, hold=False):
+        """Feed one frame's processing time (s) and cursor position; returns the settings to use.
+
+        hold=True (e.g. during calibration) keeps the current level.
+        """
+        now = time.perf_counter() if now is None else now
+        self.ema = processing if self.ema is None else self.ema + self.decay * (processing - self.ema)
+        if hold:
+            self.over_since = self.under_since = None
+            self.anchor = self.still_since = None
+            self.idle = False
+            return self.apply(self.load_level, False, now, "calibration in progress")
+
+        self.update_idle(cursor, now)
+        reason = None
+        if now - self.changed_at >= self.settle:
+            if self.ema > self.budget:
+                self.under_since = None
+                self.over_since = now if self.over_since is None else self.over_since
+                if now - self.over_since >= self.degrade_after and self.load_level < len(self.levels) - 1:
+                    self.load_level += 1
+                    self.over_since = None
+                    reason = f"processing {self.ema * 1000:.1f} ms > {self.budget * 1000:.1f} ms budget"
+            elif self.ema < self.budget * self.headroom:
+                self.over_since = None
+                self.under_since = now if self.under_since is None else self.under_since
+                if now - self.under_since >= self.restore_after and self.load_level > 0:
+                    self.load_level -= 1
+                    self.under_since = None
+                    reason = f"processing {self.ema * 1000:.1f} ms, headroom under {self.budget * 1000:.1f} ms budget"
+            else:
+                self.over_since = self.under_since = None
+        return self.apply(self.load_level, self.idle, now, reason)
+
+    def update_idle(self, cursor, now):
+        """Track how long the cursor has stayed within idle_radius of an anchor"""
+        if cursor is None:
+            return
+        if self.anchor is None or abs(cursor[0] - self.anchor[0]) > self.idle_radius \
+                or abs(cursor[1] - self.anchor[1]) > self.idle_radius:
+            self.anchor = cursor
+            self.still_since = now
+            self.idle = False
+        elif now - self.still_since >= self.idle_after:
+            self.idle = True
+
+    def apply(self, load_level, idle, now, reason):
+        """Switch to the effective level, logging why when it changes"""
+        level = max(load_level, self.idle_level) if idle else load_level
+        if level != self.level:
+            if reason is None:
+                reason = (f"gaze still for {self.idle_after:.0f}s - low-power mode" if idle
+                          else "gaze moved - leaving low-power mode")
+            self.log(self.level, level, reason, now)
+            self.level = level
+            self.changed_at = now
+        return self.levels[self.level]
+
+    def log(self, old, new, reason, now):
+        direction = "degrading" if new > old else "restoring"
+        message = (f"[GOVERNOR] Level {old} -> {new} ({direction}): {reason}. "
+                   f"Now {self.levels[new].describe()}")
+        self.decisions.append((now, old, new, reason))
+        print(message)
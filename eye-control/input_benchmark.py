@@ -0,0 +1,82 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from benchmark import latency_stats, time_calls, environment
+from output import create_cursor
+
+NATIVE_BACKENDS = ["xtest", "uinput", "pyautogui"]
+
+
+def motion_path(screen_size, events, radius=40):
+    """Small circle around the screen centre, so the real cursor stays put"""
+    angles = np.linspace(0.0, 2.0 * np.pi * events / 60.0, events)
+    cx, cy = screen_size[0] / 2.0, screen_size[1] / 2.0
+    return [(int(cx + radius * np.cos(a)), int(cy + radius * np.sin(a))) for a in angles]
+
+
+def benchmark_backend(cursor, events=2000, warmup=50, scroll=False):
+    """Per-event latency for cursor moves (and, opt-in, wheel clicks) on one backend.
+
+    Clicks are never timed: they would land on whatever is under the cursor.
+    Scrolls alternate up/down so the page ends where it started.
+    """
+    report = {'move': latency_stats(time_calls(lambda p: cursor.move_to(*p),
+                                               motion_path(cursor.screen_size(), events), warmup))}
+    if scroll:
+        directions = [1 if i % 2 == 0 else -1 for i in range(events)]
+        report['scroll'] = latency_stats(time_calls(cursor.scroll, directions, warmup))
+    return report
+
+
+def print_report(report):
+    print(f"{'backend':<12}{'event':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'events/s':>12}")
+    for backend, stages in report['backends'].items():
+        if 'error' in stages:
+            print(f"{backend:<12}unavailable: {stages['error']}")
+            continue
+        for event, stats in stages.items():
+            print(f"{backend:<12}{event:<10}{stats['p50_ms']:>10.4f}{stats['p95_ms']:>10.4f}"
+                  f"{stats['p99_ms']:>10.4f}{stats['per_second']:>12.0f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cursor output backend micro-benchmark (moves the real cursor)")
+    parser.add_argument("--backends", default=",".join(NATIVE_BACKENDS),
+                        help="Comma-separated backends to compare (default xtest,uinput,pyautogui)")
+    parser.add_argument("--events", type=int, default=2000, help="Timed events per backend (default 2000)")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed events before each run")
+    parser.add_argument("--scroll", action="store_true",
+                        help="Also time wheel events (scrolls the focused window up and down)")
+    parser.add_argument("--output", metavar="JSON", help="Write results (with environment info) to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = {'backends': {}}
+    for name in [backend.strip() for backend in args.backends.split(",") if backend.strip()]:
+        try:
+            cursor = create_cursor(name)
+        except Exception as e:
+            report['backends'][name] = {'error': str(e)}
+            continue
+        try:
+            report['backends'][name] = benchmark_backend(cursor, events=args.events, warmup=args.warmup,
+                                                         scroll=args.scroll)
+        finally:
+            cursor.close()
+    report['environment'] = environment()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+    return 0 if any('error' not in stages for stages in report['backends'].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
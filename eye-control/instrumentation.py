@@ -0,0 +1,297 @@
+import os
+import socket
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class StageTimings:
+    """Per-stage latency counters (count / total / last / max in seconds)"""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all counters"""
+        with self.lock:
+            self.count = {stage: 0 for stage in self.stages}
+            self.total = {stage: 0.0 for stage in self.stages}
+            self.last = {stage: 0.0 for stage in self.stages}
+            self.max = {stage: 0.0 for stage in self.stages}
+
+    def add(self, stage, seconds):
+        """Record one duration for a stage (called from the capture, output, scroll and main threads)"""
+        with self.lock:
+            if stage not in self.count:
+                self.count[stage] = 0
+                self.total[stage] = 0.0
+                self.last[stage] = 0.0
+                self.max[stage] = 0.0
+                self.stages.append(stage)  # Last, so readers of a stage list copy find its counters
+            self.count[stage] += 1
+            self.total[stage] += seconds
+            self.last[stage] = seconds
+            if seconds > self.max[stage]:
+                self.max[stage] = seconds
+
+    def mean_ms(self, stage):
+        """Average duration of a stage in milliseconds"""
+        count = self.count.get(stage, 0)
+        return (self.total[stage] / count) * 1000.0 if count else 0.0
+
+    def summary(self):
+        """Human readable one-line-per-stage summary"""
+        lines = []
+        for stage in list(self.stages):
+            if not self.count[stage]:
+                continue
+            lines.append(f"  {stage:<14} n={self.count[stage]:<6} mean={self.mean_ms(stage):7.2f} ms  "
+                         f"last={self.last[stage] * 1000.0:7.2f} ms  max={self.max[stage] * 1000.0:7.2f} ms")
+        return "\n".join(lines)
+
+
+class TraceRing:
+    """Preallocated ring of per-frame monotonic timestamps, one column per stage.
+
+    begin() starts a row at the frame's capture time (column 0) and mark()
+    stamps later stages; stages a frame never reaches stay NaN. Nothing is
+    allocated per frame, and summaries are computed from a copy so an
+    exporter thread can read while the pipeline writes.
+    """
+
+    enabled = True
+
+    def __init__(self, stages, capacity=512):
+        self.stages = list(stages)
+        self.column = {stage: i for i, stage in enumerate(self.stages)}
+        self.capacity = capacity
+        self.marks = np.full((capacity, len(self.stages)), np.nan)
+        self.frames = 0
+        self.current = self.marks[0]
+
+    def begin(self, captured_at=None):
+        """Start a new frame row; repeated calls with the same capture time are ignored"""
+        if captured_at is None:
+            captured_at = time.perf_counter()
+        elif self.frames and self.current[0] == captured_at:
+            return
+        row = self.marks[self.frames % self.capacity]
+        row.fill(np.nan)
+        row[0] = captured_at
+        self.current = row
+        self.frames += 1
+
+    def mark(self, stage, at=None):
+        """Stamp a stage of the current frame (now by default)"""
+        self.current[self.column[stage]] = time.perf_counter() if at is None else at
+
+    def completed_rows(self, window=None):
+        """Copy of the newest finished rows in chronological order (the in-progress row is excluded)"""
+        done = min(self.frames - 1, self.capacity - 1)
+        if window is not None:
+            done = min(done, window)
+        if done <= 0:
+            return np.empty((0, len(self.stages)))
+        end = (self.frames - 1) % self.capacity
+        idx = np.arange(end - done, end) % self.capacity
+        return self.marks[idx]
+
+    def summary(self, window=None):
+        """Rolling FPS plus per-stage and end-to-end latency percentiles (ms)"""
+        rows = self.completed_rows(window)
+        result = {'frames': self.frames, 'fps': 0.0, 'stages': {}, 'end_to_end': None}
+        if len(rows) < 2:
+            return result
+        span = rows[-1, 0] - rows[0, 0]
+        result['fps'] = (len(rows) - 1) / span if span > 0 else 0.0
+
+        # Each stage is timed from the latest earlier mark of the same frame
+        reached = np.fmax.accumulate(rows, axis=1)
+        for k, stage in enumerate(self.stages[1:], start=1):
+            delta = (rows[:, k] - reached[:, k - 1]) * 1000.0
+            delta = delta[~np.isnan(delta)]
+            if len(delta):
+                result['stages'][stage] = self._percentiles(delta)
+        end_to_end = (reached[:, -1] - rows[:, 0]) * 1000.0
+        dispatched = ~np.isnan(rows[:, -1])
+        if dispatched.any():
+            result['end_to_end'] = self._percentiles(end_to_end[dispatched])
+        return result
+
+    @staticmethod
+    def _percentiles(values):
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {'count': int(len(values)), 'mean': float(values.mean()),
+                'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+class NullTrace:
+    """Stand-in used when instrumentation is off: every call is a no-op"""
+
+    enabled = False
+    frames = 0
+
+    def begin(self, captured_at=None):
+        pass
+
+    def mark(self, stage, at=None):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class LatencyHud:
+    """Rolling FPS / latency text drawn onto a preview frame (stats refreshed twice a second)"""
+
+    def __init__(self, trace, window=120, refresh=0.5):
+        self.trace = trace
+        self.window = window
+        self.refresh = refresh
+        self.lines = []
+        self.updated_at = float('-inf')
+
+    def update(self):
+        now = time.perf_counter()
+        if now - self.updated_at < self.refresh:
+            return
+        self.updated_at = now
+        stats = self.trace.summary(self.window)
+        lines = [f"FPS {stats['fps']:.1f}"]
+        if stats['end_to_end']:
+            e2e = stats['end_to_end']
+            lines[0] += f" | e2e p50 {e2e['p50']:.1f} p95 {e2e['p95']:.1f} ms"
+        for stage, s in stats['stages'].items():
+            lines.append(f"{stage:<10} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f} ms")
+        self.lines = lines
+
+    def draw(self, frame, width=330):
+        """Bottom-right corner, clear of the status text on the left and top"""
+        self.update()
+        x = max(10, frame.shape[1] - width)
+        y = frame.shape[0] - 20 * len(self.lines) - 40
+        for i, line in enumerate(self.lines):
+            cv2.putText(frame, line, (x, y + 20 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+
+
+def format_prometheus(app, stats, timings=None):
+    """Prometheus text exposition of a trace summary (and optional StageTimings totals)"""
+    label = f'app="{app}"'
+    lines = [
+        "# HELP blinkos_frames_total Frames seen by the pipeline.",
+        "# TYPE blinkos_frames_total counter",
+        f"blinkos_frames_total{{{label}}} {stats['frames']}",
+        "# HELP blinkos_fps Rolling frames per second.",
+        "# TYPE blinkos_fps gauge",
+        f"blinkos_fps{{{label}}} {stats['fps']:.3f}",
+        "# HELP blinkos_stage_latency_seconds Per-stage latency over the rolling window.",
+        "# TYPE blinkos_stage_latency_seconds summary",
+    ]
+    series = list(stats['stages'].items())
+    if stats['end_to_end']:
+        series.append(("end_to_end", stats['end_to_end']))
+    for stage, s in series:
+        stage_label = f'{label},stage="{stage}"'
+        for q in ("p50", "p95", "p99"):
+            quantile = f"0.{q[1:]}"
+            lines.append(f'blinkos_stage_latency_seconds{{{stage_label},quantile="{quantile}"}} {s[q] / 1000.0:.6f}')
+        lines.append(f"blinkos_stage_latency_seconds_sum{{{stage_label}}} {s['mean'] * s['count'] / 1000.0:.6f}")
+        lines.append(f"blinkos_stage_latency_seconds_count{{{stage_label}}} {s['count']}")
+    if timings is not None:
+        lines.append("# HELP blinkos_stage_seconds_total Cumulative time spent per stage since start.")
+        lines.append("# TYPE blinkos_stage_seconds_total counter")
+        for stage in list(timings.stages):
+            if timings.count[stage]:
+                lines.append(f'blinkos_stage_seconds_total{{{label},stage="{stage}"}} {timings.total[stage]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Publishes the trace in Prometheus text format from a background thread.
+
+    target "unix:/path" serves one snapshot per connection on a Unix socket
+    (e.g. `curl --unix-socket /path http://x/` or `socat - UNIX-CONNECT:/path`);
+    any other target is a file rewritten atomically every interval, suitable
+    for node_exporter's textfile collector.
+    """
+
+    def __init__(self, trace, target, app, interval=1.0, timings=None, window=300):
+        self.trace = trace
+        self.app = app
+        self.interval = interval
+        self.timings = timings
+        self.window = window
+        self.socket_path = target[len("unix:"):] if target.startswith("unix:") else None
+        self.file_path = None if self.socket_path else target
+        self.server = None
+        self.running = False
+        self.thread = None
+
+    def render(self):
+        return format_prometheus(self.app, self.trace.summary(self.window), self.timings)
+
+    def start(self):
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(self.socket_path)
+            self.server.listen(4)
+            self.server.settimeout(self.interval)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self.thread.start()
+        print(f"[METRICS] Exporting {self.app} metrics to {self.socket_path or self.file_path}")
+
+    def _run(self):
+        while self.running:
+            try:
+                if self.server is not None:
+                    self._serve_once()
+                else:
+                    self._write_file()
+                    time.sleep(self.interval)
+            except Exception as e:
+                print(f"[WARN] Metrics export failed: {e}")
+                time.sleep(self.interval)
+
+    def _serve_once(self):
+        try:
+            conn, _ = self.server.accept()
+        except socket.timeout:
+            return
+        with conn:
+            conn.settimeout(0.2)
+            try:
+                request = conn.recv(1024)  # HTTP clients send a request line first; raw readers send nothing
+            except socket.timeout:
+                request = b""
+            body = self.render().encode()
+            if request.startswith(b"GET"):
+                conn.sendall(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n")
+            conn.sendall(body)
+
+    def _write_file(self):
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.file_path)
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1.0)
+        if self.server is not None:
+            self.server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        elif self.file_path:
+            try:
+                self._write_file()  # Final snapshot
+            except Exception:
+                pass
@@ -2,30 +2,58 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
 import math
 from collections import deque
+import os
 import sys
-from scipy.spatial.distance import cdist
+import argparse
+from scipy.spatial import cKDTree
 from scipy.interpolate import RBFInterpolator
 
-# Disable pyautogui failsafe
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0
+from capture import LatestFrameGrabber
+from filters import (PositionRing, PrecisionChainFilter, OneEuroFilter,
+                     ConstantVelocityKalmanFilter)
+from gaze_mapping import ThinPlateSplineMap, OnlineResidualCorrector, leave_one_out_errors
+from instrumentation import StageTimings, TraceRing, NULL_TRACE, LatencyHud, MetricsExporter
+from output import NullCursor, OutputDispatcher, CursorInterpolator, OUTPUT_BACKENDS, create_cursor
+from recording import LandmarkRecorder
+from roi import FaceRoiTracker
+from governor import PerformanceGovernor, build_levels
+from render import CalibrationCanvas
+from blink import BlinkDetector, DwellClicker
+from profiles import CalibrationProfile, DriftCheck, default_user, profile_path
+from replay import open_replay_source, run_replay
 
 class PrecisionEyeTracker:
-    def __init__(self):
+    def __init__(self, camera=True, headless=False, screen_size=None, cursor=None, roi=True, preview=True,
+                 grid_size=3, output_backend="auto", cursor_hz=120, click_mode="blink", gaze=True):
+        """camera=False builds the pipeline without opening a webcam (replay);
+        headless skips all OpenCV windows; preview=False keeps only the
+        calibration window (no camera preview or overlays); cursor defaults
+        to output_backend (XTest/uinput on Linux when available, else
+        pyautogui; dispatched from a worker thread when ASYNC_OUTPUT is
+        set); roi=False runs face mesh on every full frame;
+        grid_size sets the calibration grid (3 = 3x3 up to 7 = 7x7);
+        cursor_hz is the live cursor update rate between frames (0 = once
+        per frame); click_mode is "blink", "wink" or "dwell"; gaze=False
+        runs only capture, inference and the landmark consumers (no
+        calibration window, cursor or clicks)."""
         # HIGH ACCURACY CONFIGURATION
         self.CAM_TRY_INDICES = [0, 1, 2, 3]
         self.CAM_W, self.CAM_H = 1280, 720  # Higher resolution for better accuracy
         
-        # 9-POINT CALIBRATION GRID (3x3)
+        # CALIBRATION GRID (3x3 = 9 points by default)
         self.CALIB_MARGIN = 0.08  # Smaller margin for more screen coverage
-        self.CALIB_GRID_SIZE = 3  # 3x3 = 9 points
+        self.CALIB_GRID_SIZE = grid_size  # N x N points
+        self.CALIB_ADAPTIVE_POINTS = 0  # Extra points placed where the grid's leave-one-out error is highest
         self.CALIB_HOLD_FRAMES = 100  # More samples for precision
         self.CALIB_MIN_STABLE_FRAMES = 60  # Very strict stability
         self.CALIB_STABLE_TOLERANCE = 1.5  # Extremely tight tolerance
+        self.CALIB_STABLE_WINDOW = 15  # Samples in the rolling stability window
+        self.CALIB_KEEP_FRACTION = 0.6  # Samples nearest the median kept per point
+        self.CALIB_POINT_PAUSE = 0.4  # Seconds to let the eyes settle on a new target (frames keep flowing)
+        self.CALIB_DONE_PAUSE = 0.5  # Seconds before tracking starts after calibration
         
         # PRECISION SMOOTHING - Balanced for accuracy
         self.SMOOTHING_BUFFER_SIZE = 8  # Smaller buffer for responsiveness
@@ -34,49 +62,150 @@ class PrecisionEyeTracker:
         self.MIN_MOVEMENT_THRESHOLD = 1.5  # Detect smaller movements
         self.OUTLIER_THRESHOLD = 25  # Tighter outlier detection
         
+        # CURSOR FILTER (F cycles live): precision chain, One Euro, constant-velocity Kalman
+        self.FILTER_ORDER = ["precision", "one_euro", "kalman"]
+        self.active_filter = "precision"
+        
+        # REGION-OF-INTEREST INFERENCE (crop around the last face instead of the full frame)
+        self.USE_ROI_INFERENCE = roi
+        self.ROI_PADDING = 0.6       # Crop side = face extent * (1 + 2 * padding)
+        self.ROI_INPUT_SIZE = 256    # Crops are resized to this square before face mesh
+        
+        # PERFORMANCE GOVERNOR (trades preview rate, inference rate, then resolution to hold the budget)
+        self.USE_GOVERNOR = True
+        self.LATENCY_BUDGET_MS = 33.0   # Per-frame processing budget (one 30 FPS frame)
+        self.IDLE_AFTER_SECONDS = 5.0   # Still gaze this long drops to low-power settings
+        
         # ADVANCED MAPPING
         self.USE_RBF_INTERPOLATION = True  # Radial Basis Function for local accuracy
         self.USE_LOCAL_WEIGHTING = True    # Weight nearby calibration points more
         self.RBF_SMOOTHING = 0.1          # RBF smoothing parameter
+        self.FIT_ALL_SAMPLES = True       # Regression spline over every retained sample, not per-point averages
+        self.SAMPLE_FIT_MAX_DEVIATION_PX = 25  # Sanity bound versus the per-point average fit
         
         # BLINK CLICKING FOR TYPING
-        self.BLINK_THRESHOLD = 0.25  # Initial EAR threshold, will be calibrated
-        self.BLINK_DEBOUNCE = 0.5  # Seconds between clicks to prevent rapid firing
-        self.last_blink_time = 0
+        self.BLINK_THRESHOLD = 0.25  # Initial EAR threshold, will be calibrated (75% of open EAR)
+        self.CLICK_MODE = click_mode  # "blink" (blinks and winks), "wink" (winks only), "dwell" (hold still)
+        self.BLINK_MIN_CLOSED = 0.07  # Seconds; shorter closures are EAR noise
+        self.BLINK_MAX_CLOSED = 0.8   # Seconds; longer closures are resting eyes, not clicks
+        self.DWELL_TIME = 1.0         # Seconds the cursor must hold still for a dwell click
+        self.DWELL_RADIUS_PX = 35     # How far it may wander meanwhile
+        self.blink_detector = BlinkDetector(self.BLINK_THRESHOLD / 0.75, min_closed=self.BLINK_MIN_CLOSED,
+                                            max_closed=self.BLINK_MAX_CLOSED)
+        self.dwell_clicker = DwellClicker(self.DWELL_TIME, self.DWELL_RADIUS_PX)
+        self.BLINK_FREEZE = True      # Hold the cursor from closure onset until the gaze has settled again
+        self.BLINK_SETTLE = 0.07      # Seconds after reopening before the iris is trusted again
+        self.BLINK_LOOKBACK = 0.03    # The held position is the cursor at least this long before onset
         self.was_blink = False
         
+        # ONLINE RECALIBRATION (learned from blink-clicks)
+        self.USE_ONLINE_CORRECTION = True
+        self.ONLINE_SAMPLES = 60            # Newest clicks kept in the correction fit
+        self.ONLINE_MAX_RESIDUAL_PX = 150   # Landing fixations further than this from the click are ignored
+        self.SACCADE_PX = 120               # Frame-to-frame cursor jump that ends a fixation
+        self.LANDING_WINDOW = 0.25          # Seconds after a saccade taken as the first look at the target
+        
+        # CALIBRATION PROFILES
+        self.DRIFT_CHECK_POINTS = 2     # Points re-measured by the drift check
+        self.DRIFT_MAX_ERROR_PX = 60    # Error above this prompts for the drift check and applies its correction
+        self.DRIFT_CLICKS = 8           # Newest clicks in the passive drift estimate
+        self.DRIFT_MIN_CLICKS = 5       # Clicks needed before the estimate can prompt a drift check
+        
         # KEYBOARD OPTIMIZATION
         self.KEYBOARD_MODE = True  # Special mode for typing
         self.TYPING_PRECISION_BOOST = True  # Extra precision near keyboard area
+        self.KEYBOARD_BOOST_NEIGHBORS = 8  # Nearest keyboard-area calibration points used for local correction
+        
+        # OUTPUT
+        self.ASYNC_OUTPUT = True  # Cursor moves/clicks on a worker thread; OS stalls don't delay frames
+        self.CURSOR_HZ = cursor_hz  # Live cursor updates per second, extrapolated between frames (0 = off)
+        self.INTERPOLATION_MAX_AHEAD = 0.05  # s the cursor may run ahead of the last frame
+        self.INTERPOLATION_MAX_STEP_PX = 60  # px it may run ahead
         
         # UI
         self.PREVIEW_WINDOW = "Precision Eye Tracker - Typing Ready"
-        self.CALIB_WINDOW = "9-Point Calibration - Maximum Accuracy"
+        self.CALIB_WINDOW = f"{self.CALIB_GRID_SIZE ** 2}-Point Calibration - Maximum Accuracy"
         self.FONT = cv2.FONT_HERSHEY_SIMPLEX
+        self.PREVIEW_MAX_FPS = 30  # Render stage rate cap (tracking runs at camera rate)
+        
+        # PIPELINE TIMING (seconds per stage, printed with T and on exit)
+        self.timings = StageTimings(["capture", "wait", "frame_age", "convert", "inference", "features",
+                                     "mapping", "smoothing", "cursor", "preview", "glass_to_cursor"])
+        self.frame_captured_at = None  # perf_counter() when the current frame left the camera
+        self.frame_timestamp = None    # Pipeline clock of the current frame (capture or replay time)
+        self.recorder = None
+        self.recording_started = None
+        self.frame_target = None       # Ground-truth screen point of the current frame (replay), if known
+        
+        # HOT-PATH TRACE (off unless enable_instrumentation is called: no-op stand-in)
+        self.TRACE_STAGES = ["capture", "inference", "mapping", "smoothing", "dispatch"]
+        self.trace = NULL_TRACE
+        self.hud = None
+        self.metrics_exporter = None
+        
+        # RUN MODE
+        self.headless = headless
+        self.show_preview = preview and not headless  # Camera preview window and overlay drawing
+        self.gaze_enabled = gaze       # Gaze cursor path; off when only landmark consumers run
+        self.landmark_consumers = []   # f(landmarks or None, overlay, frame_width, frame_height, timestamp) per frame
+        self.key_handlers = []         # f(key) -> True if handled, asked before the tracker's own keys
+        self.calibration_canvas = None
+        self.calib_progress = 0.0
+        self.last_render_at = float('-inf')
+        self.realtime = camera  # Replays run as fast as possible, without UI pauses
+        self.camera_id = "replay"
+        self.profile = None            # CalibrationProfile in use, if any
+        self.profile_path = None       # Where finished calibrations are saved
+        self.drift_check = None        # DriftCheck in progress, if any
+        self.cursor = cursor
+        if self.cursor is None:
+            self.cursor = create_cursor(output_backend, screen_size)
+            if self.ASYNC_OUTPUT:
+                self.cursor = OutputDispatcher(self.cursor, timings=self.timings).start()
+        self.interpolator = None
+        if camera and self.CURSOR_HZ and self.gaze_enabled:
+            self.interpolator = CursorInterpolator(self.cursor, rate=self.CURSOR_HZ,
+                                                   max_ahead=self.INTERPOLATION_MAX_AHEAD,
+                                                   max_step_px=self.INTERPOLATION_MAX_STEP_PX,
+                                                   timings=self.timings).start()
         
         # Initialize
-        self.setup_camera()
+        self.rgb_frame = None
+        self.governor = None
+        self.last_landmarks = None
+        if camera:
+            self.setup_camera()
+            if self.USE_GOVERNOR:
+                self.governor = PerformanceGovernor(build_levels(self.CAM_W, self.CAM_H),
+                                                    budget_ms=self.LATENCY_BUDGET_MS,
+                                                    idle_after=self.IDLE_AFTER_SECONDS)
+        else:
+            self.cap = None
+            self.grabber = None
         self.setup_mediapipe()
-        self.setup_screen()
+        self.setup_screen(screen_size)
         self.setup_advanced_filters()
         self.reset_calibration()
         
         # Windows
-        cv2.namedWindow(self.PREVIEW_WINDOW, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(self.PREVIEW_WINDOW, 1000, 700)
-        cv2.namedWindow(self.CALIB_WINDOW, cv2.WINDOW_NORMAL)
-        cv2.setWindowProperty(self.CALIB_WINDOW, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        if self.show_preview:
+            cv2.namedWindow(self.PREVIEW_WINDOW, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(self.PREVIEW_WINDOW, 1000, 700)
+        if not self.headless and self.gaze_enabled:
+            cv2.namedWindow(self.CALIB_WINDOW, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(self.CALIB_WINDOW, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
         
         print("🎯 PRECISION EYE TRACKER INITIALIZED!")
         print("📝 Optimized for on-screen keyboard typing")
         print(f"🎯 {len(self.calib_points)} calibration points for maximum accuracy")
         print("👁️ Blink-click enabled: Look at target and blink to click")
-        print("Controls: C=calibrate | SPACE=accept | N=skip | ESC=quit")
+        print("Controls: C=calibrate | D=drift check | SPACE=accept | N=skip | F=filter | T=timings | ESC=quit")
 
     def setup_camera(self):
         """Enhanced camera setup for precision"""
         self.cap = None
         self.cam_index = None
+        self.grabber = None
         
         for idx in self.CAM_TRY_INDICES:
             print(f"[CAMERA] Trying camera {idx}...")
@@ -96,7 +225,12 @@ class PrecisionEyeTracker:
                         self.cam_index = idx
                         actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                         actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                        self.camera_id = f"cam{idx}-{actual_w}x{actual_h}"
                         print(f"[CAMERA] Opened camera {idx} at {actual_w}x{actual_h}")
+                        
+                        # Capture runs on its own thread; inference always gets the newest frame
+                        self.grabber = LatestFrameGrabber(cap, frame.shape, mirror=True, timings=self.timings)
+                        self.rgb_frame = np.empty_like(frame)
                         return
                 cap.release()
             except Exception as e:
@@ -108,12 +242,6 @@ class PrecisionEyeTracker:
     def setup_mediapipe(self):
         """Ultra-precise MediaPipe setup"""
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            refine_landmarks=True,
-            max_num_faces=1,
-            min_detection_confidence=0.8,  # Higher confidence
-            min_tracking_confidence=0.8
-        )
         
         # Enhanced landmark sets
         self.LEFT_IRIS = [468, 469, 470, 471]
@@ -128,14 +256,64 @@ class PrecisionEyeTracker:
         # Blink detection points - matching the patented formula with two vertical measurements
         self.LEFT_EYE_INDICES = [33, 133, 159, 145, 158, 144]  # h_left, h_right, upper1, lower1, upper2, lower2
         self.RIGHT_EYE_INDICES = [263, 362, 386, 374, 387, 373]
+        
+        # Fixed index arrays for batched landmark math (same points as above)
+        self.IRIS_WEIGHTS = np.array([1.2, 1.0, 1.2, 1.0])
+        self.IRIS_WEIGHT_TOTAL = float(self.IRIS_WEIGHTS.sum())
+        self.GAZE_NORM_MIN = np.array([-0.6, -0.4])
+        self.GAZE_NORM_MAX = np.array([0.6, 0.4])
+        
+        # Packed gather layout: iris (2x4), eye corners (2x2), EAR points (2x6), nose tip + face center
+        packed = (self.LEFT_IRIS + self.RIGHT_IRIS + self.LEFT_EYE_CORNERS + self.RIGHT_EYE_CORNERS +
+                  self.LEFT_EYE_INDICES + self.RIGHT_EYE_INDICES + [self.NOSE_TIP, self.FACE_CENTER])
+        self.PACKED_GAZE_IDX = np.array(packed)
+        self.PACKED_IRIS = slice(0, 8)
+        self.PACKED_CORNERS = slice(8, 12)
+        self.PACKED_EAR = slice(12, 24)
+        self.PACKED_HEAD = slice(24, 26)
+        self.packed_normalized = np.zeros((len(packed), 2), dtype=np.float32)
+        self.packed_points = np.zeros((len(packed), 2), dtype=np.float64)
+        self.pixel_scale = np.zeros(2, dtype=np.float64)
+        
+        self.GAZE_LANDMARK_LIST = sorted(set(packed))
+        self.GAZE_LANDMARK_IDX = np.array(self.GAZE_LANDMARK_LIST)
+        
+        # Reusable normalized landmark buffer (refine_landmarks=True gives 478 points)
+        self.NUM_LANDMARKS = 478
+        self.landmark_buffer = np.zeros((self.NUM_LANDMARKS, 2), dtype=np.float32)
+        self.landmark_source = None
+        self.landmark_source_full = False
+        
+        # ROI inference: streaming model on face crops, single-image model to (re)acquire on the full frame
+        self.roi = None
+        if self.USE_ROI_INFERENCE:
+            self.roi = FaceRoiTracker(
+                self.mp_face_mesh.FaceMesh(refine_landmarks=True, max_num_faces=1,
+                                           min_detection_confidence=0.8, min_tracking_confidence=0.8),
+                self.mp_face_mesh.FaceMesh(static_image_mode=True, refine_landmarks=True, max_num_faces=1,
+                                           min_detection_confidence=0.8),
+                self.GAZE_LANDMARK_LIST, padding=self.ROI_PADDING, input_size=self.ROI_INPUT_SIZE,
+                num_landmarks=self.NUM_LANDMARKS, timings=self.timings)
+        
+        # Full-frame streaming model, only without ROI inference (the ROI tracker has its own pair)
+        self.face_mesh = None
+        if self.roi is None:
+            self.face_mesh = self.mp_face_mesh.FaceMesh(
+                refine_landmarks=True,
+                max_num_faces=1,
+                min_detection_confidence=0.8,  # Higher confidence
+                min_tracking_confidence=0.8
+            )
 
-    def setup_screen(self):
-        """Create 9-point calibration grid"""
+    def setup_screen(self, screen_size=None):
+        """Create the N x N calibration grid"""
         try:
-            self.SCREEN_W, self.SCREEN_H = pyautogui.size()
+            if screen_size is None:
+                screen_size = self.cursor.screen_size()
+            self.SCREEN_W, self.SCREEN_H = int(screen_size[0]), int(screen_size[1])
             print(f"[SCREEN] Resolution: {self.SCREEN_W}x{self.SCREEN_H}")
             
-            # Create 3x3 calibration grid for essential accuracy
+            # Create N x N calibration grid
             margin_x = int(self.SCREEN_W * self.CALIB_MARGIN)
             margin_y = int(self.SCREEN_H * self.CALIB_MARGIN)
             
@@ -143,12 +321,14 @@ class PrecisionEyeTracker:
             x_points = np.linspace(margin_x, self.SCREEN_W - margin_x, self.CALIB_GRID_SIZE)
             y_points = np.linspace(margin_y, self.SCREEN_H - margin_y, self.CALIB_GRID_SIZE)
             
-            self.calib_points = []
+            self.grid_points = []
             for y in y_points:
                 for x in x_points:
-                    self.calib_points.append((int(x), int(y)))
+                    self.grid_points.append((int(x), int(y)))
+            self.calib_points = list(self.grid_points)  # Grid plus any adaptive points
             
             print(f"[CALIBRATION] Created {len(self.calib_points)}-point precision grid")
+            self.calibration_canvas = None
             
             # Define keyboard area for precision boosting
             self.keyboard_area = {
@@ -164,7 +344,7 @@ class PrecisionEyeTracker:
 
     def setup_advanced_filters(self):
         """Initialize advanced filtering systems"""
-        self.position_buffer = deque(maxlen=self.SMOOTHING_BUFFER_SIZE)
+        self.position_buffer = PositionRing(self.SMOOTHING_BUFFER_SIZE)
         self.velocity_buffer = deque(maxlen=4)
         self.acceleration_buffer = deque(maxlen=3)
         
@@ -173,136 +353,174 @@ class PrecisionEyeTracker:
         self.last_smooth_pos = None
         self.last_output_pos = None
         self.consecutive_stable_frames = 0
+        self.gaze_history = deque(maxlen=90)  # (time, gaze_x, gaze_y, screen_x, screen_y) of open-eye frames
+        self.recent_cursor = deque(maxlen=10)  # (time, x, y) of open-eye cursor outputs
+        self.blink_anchor = None       # Pre-blink cursor position, held (and clicked) during a closure
+        self.blink_anchor_since = None
+        self.freeze_until = float('-inf')
+        self.filter_time_offset = 0.0  # Frozen time hidden from the filters so they don't extrapolate across it
         
         # Advanced smoothing weights (recent samples more important)
         self.weights = np.exp(np.linspace(-1, 0, self.SMOOTHING_BUFFER_SIZE))
         self.weights /= self.weights.sum()
+        # Normalizer per fill level, reduced exactly like np.average(weights=self.weights[:k])
+        self.weight_sums = [None] + [self.weights[:k].reshape(-1, 1).sum(axis=0)
+                                     for k in range(1, self.SMOOTHING_BUFFER_SIZE + 1)]
+        
+        # Preallocated smoothing scratch (no per-frame array allocation)
+        self.smooth_current = np.zeros(2)
+        self.smooth_median = np.zeros(2)
+        self.smooth_delta = np.zeros(2)
+        self.smooth_std = np.zeros(2)
+        self.smooth_weighted = np.zeros(2)
+        self.smooth_pos = np.zeros(2)
+        self.smooth_blend = np.zeros(2)
+        self.smooth_state = np.zeros((2, 2))  # Storage for last_smooth_pos / last_output_pos
+        
+        # Pluggable cursor filters share the reset with the precision chain
+        if not hasattr(self, 'gaze_filters'):
+            self.gaze_filters = {
+                "precision": PrecisionChainFilter(self),
+                "one_euro": OneEuroFilter(),
+                "kalman": ConstantVelocityKalmanFilter(),
+            }
+        for gaze_filter in self.gaze_filters.values():
+            gaze_filter.reset()
 
     def reset_calibration(self):
         """Reset calibration state"""
+        self.drift_check = None
+        self.reset_drift_estimate()
+        if self.calib_points != self.grid_points:
+            self.calib_points = list(self.grid_points)  # Drop drift check targets and adaptive points
+            self.calibration_canvas = None
         self.calibration_data = []
+        self.calibration_samples = []  # Retained gaze samples per accepted point
+        self.calibration_covariances = []  # Gaze covariance of those samples, for per-point weighting
         self.screen_points = []
         self.calib_index = -1
-        self.sample_buffer = deque(maxlen=self.CALIB_HOLD_FRAMES)
+        self.sample_buffer = PositionRing(self.CALIB_HOLD_FRAMES)  # Newest gaze samples for the current point
+        self.sample_std = np.zeros(2)
         self.stability_counter = 0
+        self.pause_until = float('-inf')  # Frames before this pipeline time are not sampled or tracked
+        self.calib_progress = 0.0
         self.open_ear_values = []  # For calibrating EAR threshold
         
         # Reset mapping
+        self.online_corrector = None
         self.rbf_interpolator_x = None
         self.rbf_interpolator_y = None
+        self.fast_rbf_map = None
         self.mapping_weights_x = None
         self.mapping_weights_y = None
+        self.invalidate_keyboard_precision_index()
         
         # Reset filters
         self.setup_advanced_filters()
 
-    def get_landmark_coords(self, landmarks, index, img_width, img_height):
-        """High-precision landmark coordinate extraction"""
-        lm = landmarks[index]
-        # Use sub-pixel precision
-        return lm.x * img_width, lm.y * img_height
+    def load_landmarks(self, landmarks, full=False):
+        """Bulk-convert MediaPipe landmarks into the reusable (478, 2) normalized buffer.
 
-    def get_iris_center_precise(self, landmarks, iris_indices, img_width, img_height):
-        """Ultra-precise iris center calculation"""
-        points = [self.get_landmark_coords(landmarks, idx, img_width, img_height) 
-                 for idx in iris_indices]
+        Only the rows the gaze pipeline reads are converted unless full=True.
+        Arrays (replayed or ROI-remapped landmarks) are used as-is.
+        """
+        if isinstance(landmarks, np.ndarray):
+            return landmarks[:, :2] if landmarks.shape[1] > 2 else landmarks
         
-        # Weighted center (some iris points are more reliable)
-        weights = [1.2, 1.0, 1.2, 1.0]  # Top and bottom points slightly more weight
+        if landmarks is self.landmark_source and (self.landmark_source_full or not full):
+            return self.landmark_buffer
         
-        x_coords = [p[0] * w for p, w in zip(points, weights)]
-        y_coords = [p[1] * w for p, w in zip(points, weights)]
+        if full:
+            self.landmark_buffer[:len(landmarks)] = [(lm.x, lm.y) for lm in landmarks]
+        else:
+            self.landmark_buffer[self.GAZE_LANDMARK_IDX] = [(landmarks[i].x, landmarks[i].y)
+                                                            for i in self.GAZE_LANDMARK_LIST]
+        self.landmark_source = landmarks
+        self.landmark_source_full = full
+        return self.landmark_buffer
+
+    def get_iris_center_precise(self, landmarks, iris_indices, img_width, img_height):
+        """Ultra-precise iris center calculation"""
+        coords = self.load_landmarks(landmarks)
+        points = coords[iris_indices] * np.array([img_width, img_height], dtype=np.float64)
         
-        total_weight = sum(weights)
-        return sum(x_coords) / total_weight, sum(y_coords) / total_weight
+        # Weighted center (top and bottom points slightly more weight)
+        center = (points * self.IRIS_WEIGHTS[:, None]).sum(axis=0) / self.IRIS_WEIGHT_TOTAL
+        return center[0], center[1]
 
     def calculate_ear(self, landmarks, eye_indices, img_width, img_height):
         """Calculate Eye Aspect Ratio using patented formula"""
-        p_hleft = np.array(self.get_landmark_coords(landmarks, eye_indices[0], img_width, img_height))
-        p_hright = np.array(self.get_landmark_coords(landmarks, eye_indices[1], img_width, img_height))
-        p_upper1 = np.array(self.get_landmark_coords(landmarks, eye_indices[2], img_width, img_height))
-        p_lower1 = np.array(self.get_landmark_coords(landmarks, eye_indices[3], img_width, img_height))
-        p_upper2 = np.array(self.get_landmark_coords(landmarks, eye_indices[4], img_width, img_height))
-        p_lower2 = np.array(self.get_landmark_coords(landmarks, eye_indices[5], img_width, img_height))
-        
-        v1 = np.linalg.norm(p_upper1 - p_lower1)
-        v2 = np.linalg.norm(p_upper2 - p_lower2)
-        h = np.linalg.norm(p_hleft - p_hright)
-        
-        return (v1 + v2) / (2.0 * h)
-
-    def detect_blink(self, landmarks, img_width, img_height):
-        """Detect if a blink is occurring"""
-        left_ear = self.calculate_ear(landmarks, self.LEFT_EYE_INDICES, img_width, img_height)
-        right_ear = self.calculate_ear(landmarks, self.RIGHT_EYE_INDICES, img_width, img_height)
-        avg_ear = (left_ear + right_ear) / 2.0
-        return avg_ear < self.BLINK_THRESHOLD
+        coords = self.load_landmarks(landmarks)
+        points = coords[eye_indices] * np.array([img_width, img_height], dtype=np.float64)
+        return float(self.batched_ear(points[None])[0])
+
+    def batched_ear(self, points):
+        """EAR for a stack of eyes; points has shape (eyes, 6, 2) in LEFT_EYE_INDICES order"""
+        vertical = points[:, 2::2] - points[:, 3::2]  # (upper1 - lower1), (upper2 - lower2)
+        horizontal = points[:, 0] - points[:, 1]
+        v = np.hypot(vertical[..., 0], vertical[..., 1])
+        h = np.hypot(horizontal[:, 0], horizontal[:, 1])
+        return (v[:, 0] + v[:, 1]) / (2.0 * h)
+
+    def gather_gaze_points(self, landmarks, img_width, img_height):
+        """Pixel coordinates of every gaze landmark in one gather (PACKED_GAZE_IDX layout)"""
+        coords = self.load_landmarks(landmarks)
+        np.take(coords, self.PACKED_GAZE_IDX, axis=0, out=self.packed_normalized)
+        self.pixel_scale[0] = img_width
+        self.pixel_scale[1] = img_height
+        return np.multiply(self.packed_normalized, self.pixel_scale, out=self.packed_points)
+
+    def calculate_both_ears(self, landmarks, img_width, img_height):
+        """Left and right EAR in one batched pass"""
+        points = self.gather_gaze_points(landmarks, img_width, img_height)
+        ears = self.batched_ear(points[self.PACKED_EAR].reshape(2, 6, 2))
+        return float(ears[0]), float(ears[1])
 
     def extract_precision_gaze_features(self, landmarks, img_width, img_height):
         """Extract high-precision gaze features with head pose compensation and EAR"""
         try:
-            # Get eye corners with sub-pixel precision
-            left_outer = self.get_landmark_coords(landmarks, self.LEFT_EYE_CORNERS[0], img_width, img_height)
-            left_inner = self.get_landmark_coords(landmarks, self.LEFT_EYE_CORNERS[1], img_width, img_height)
-            right_inner = self.get_landmark_coords(landmarks, self.RIGHT_EYE_CORNERS[0], img_width, img_height)
-            right_outer = self.get_landmark_coords(landmarks, self.RIGHT_EYE_CORNERS[1], img_width, img_height)
-            
-            # Get face reference points for head pose compensation
-            nose_tip = self.get_landmark_coords(landmarks, self.NOSE_TIP, img_width, img_height)
-            face_center = self.get_landmark_coords(landmarks, self.FACE_CENTER, img_width, img_height)
+            points = self.gather_gaze_points(landmarks, img_width, img_height)
             
-            # Calculate eye parameters with head pose compensation
-            left_center_x = (left_outer[0] + left_inner[0]) / 2.0
-            left_center_y = (left_outer[1] + left_inner[1]) / 2.0
-            left_width = math.hypot(left_inner[0] - left_outer[0], left_inner[1] - left_outer[1])
-            
-            right_center_x = (right_inner[0] + right_outer[0]) / 2.0
-            right_center_y = (right_inner[1] + right_outer[1]) / 2.0
-            right_width = math.hypot(right_outer[0] - right_inner[0], right_outer[1] - right_inner[1])
+            # Eye corners with sub-pixel precision: rows are left [outer, inner], right [inner, outer]
+            corners = points[self.PACKED_CORNERS].reshape(2, 2, 2)
+            centers = (corners[:, 0] + corners[:, 1]) / 2.0
+            corner_delta = corners[:, 1] - corners[:, 0]
+            widths = np.hypot(corner_delta[:, 0], corner_delta[:, 1])
             
             # Ensure minimum eye width for stability
-            left_width = max(25.0, left_width)
-            right_width = max(25.0, right_width)
-            
-            # Get precise iris centers
-            left_iris_x, left_iris_y = self.get_iris_center_precise(landmarks, self.LEFT_IRIS, img_width, img_height)
-            right_iris_x, right_iris_y = self.get_iris_center_precise(landmarks, self.RIGHT_IRIS, img_width, img_height)
+            widths = np.maximum(25.0, widths)
             
-            # Normalize with enhanced precision
-            left_norm_x = (left_iris_x - left_center_x) / left_width
-            left_norm_y = (left_iris_y - left_center_y) / left_width
-            right_norm_x = (right_iris_x - right_center_x) / right_width
-            right_norm_y = (right_iris_y - right_center_y) / right_width
+            # Get precise iris centers (weighted, both eyes at once)
+            iris_points = points[self.PACKED_IRIS].reshape(2, 4, 2)
+            iris_centers = (iris_points * self.IRIS_WEIGHTS[:, None]).sum(axis=1) / self.IRIS_WEIGHT_TOTAL
             
-            # Clamp to prevent extreme values
-            left_norm_x = np.clip(left_norm_x, -0.6, 0.6)
-            left_norm_y = np.clip(left_norm_y, -0.4, 0.4)
-            right_norm_x = np.clip(right_norm_x, -0.6, 0.6)
-            right_norm_y = np.clip(right_norm_y, -0.4, 0.4)
+            # Normalize with enhanced precision and clamp to prevent extreme values
+            norm = (iris_centers - centers) / widths[:, None]
+            norm = np.minimum(np.maximum(norm, self.GAZE_NORM_MIN), self.GAZE_NORM_MAX)
             
             # Enhanced averaging with eye dominance consideration
             eye_dominance = 0.55  # Slight left eye preference (adjustable)
-            gaze_x = left_norm_x * eye_dominance + right_norm_x * (1 - eye_dominance)
-            gaze_y = left_norm_y * eye_dominance + right_norm_y * (1 - eye_dominance)
+            gaze_x = norm[0, 0] * eye_dominance + norm[1, 0] * (1 - eye_dominance)
+            gaze_y = norm[0, 1] * eye_dominance + norm[1, 1] * (1 - eye_dominance)
             
-            # Head pose compensation
-            head_tilt_x = (nose_tip[0] - face_center[0]) / img_width
-            head_tilt_y = (nose_tip[1] - face_center[1]) / img_height
+            # Head pose compensation (nose tip relative to face center)
+            head = points[self.PACKED_HEAD]
+            head_tilt_x = (head[0, 0] - head[1, 0]) / img_width
+            head_tilt_y = (head[0, 1] - head[1, 1]) / img_height
             
             # Compensate gaze for head pose
             gaze_x -= head_tilt_x * 0.3
             gaze_y -= head_tilt_y * 0.2
             
             # Calculate average EAR for calibration
-            left_ear = self.calculate_ear(landmarks, self.LEFT_EYE_INDICES, img_width, img_height)
-            right_ear = self.calculate_ear(landmarks, self.RIGHT_EYE_INDICES, img_width, img_height)
-            avg_ear = (left_ear + right_ear) / 2.0
+            ears = self.batched_ear(points[self.PACKED_EAR].reshape(2, 6, 2))
+            avg_ear = (float(ears[0]) + float(ears[1])) / 2.0
             
             return gaze_x, gaze_y, {
-                'left_iris': (left_iris_x, left_iris_y),
-                'right_iris': (right_iris_x, right_iris_y),
-                'left_center': (left_center_x, left_center_y),
-                'right_center': (right_center_x, right_center_y),
+                'left_iris': (iris_centers[0, 0], iris_centers[0, 1]),
+                'right_iris': (iris_centers[1, 0], iris_centers[1, 1]),
+                'left_center': (centers[0, 0], centers[0, 1]),
+                'right_center': (centers[1, 0], centers[1, 1]),
                 'head_pose': (head_tilt_x, head_tilt_y)
             }, avg_ear
             
@@ -311,6 +529,7 @@ class PrecisionEyeTracker:
 
     def fit_precision_mapping(self):
         """Fit high-precision mapping using RBF interpolation"""
+        self.online_corrector = None  # Learned against the previous mapping
         try:
             if len(self.calibration_data) < 6:  # Need fewer points for RBF with reduced grid
                 print(f"[WARN] Need at least 6 calibration points, have {len(self.calibration_data)}")
@@ -335,6 +554,7 @@ class PrecisionEyeTracker:
                         kernel='thin_plate_spline'
                     )
                     
+                    self.export_fast_rbf_map(calib_array, screen_array)
                     print(f"[SUCCESS] RBF mapping created with {len(self.calibration_data)} points")
                     return True
                     
@@ -349,6 +569,43 @@ class PrecisionEyeTracker:
             print(f"[ERROR] Mapping failed: {e}")
             return False
 
+    def export_fast_rbf_map(self, calib_array, screen_array):
+        """Export the fitted TPS into a combined x/y evaluator for the per-frame path.
+
+        With FIT_ALL_SAMPLES the evaluator is a regression spline over every
+        retained calibration sample (knots at the per-point averages);
+        otherwise it reproduces the SciPy interpolator exactly.
+        """
+        self.fast_rbf_map = None
+        try:
+            samples = self.calibration_sample_arrays(screen_array)
+            if samples is not None:
+                probe = np.vstack([calib_array, calib_array.mean(axis=0)])
+                reference = np.column_stack([self.rbf_interpolator_x(probe), self.rbf_interpolator_y(probe)])
+                sample_map = ThinPlateSplineMap(calib_array, samples[1], smoothing=self.RBF_SMOOTHING,
+                                                samples=samples[0])
+                deviation = np.max(np.abs(sample_map.evaluate_batch(probe) - reference))
+                if deviation <= self.SAMPLE_FIT_MAX_DEVIATION_PX:
+                    self.fast_rbf_map = sample_map
+                    print(f"[MAPPING] Regression spline over {len(samples[0])} samples "
+                          f"({deviation:.1f}px from the per-point fit)")
+                    return
+                print(f"[WARN] Sample fit deviates by {deviation:.0f}px, using per-point averages")
+            
+            # Parity with SciPy is checked offline: python benchmark.py --check
+            self.fast_rbf_map = ThinPlateSplineMap(calib_array, screen_array, smoothing=self.RBF_SMOOTHING)
+        except Exception as e:
+            print(f"[WARN] Fast RBF export failed, using SciPy path: {e}")
+
+    def calibration_sample_arrays(self, screen_array):
+        """(samples, targets) stacked over all points, or None if samples were not kept for every point"""
+        if not self.FIT_ALL_SAMPLES or len(self.calibration_samples) != len(screen_array):
+            return None
+        counts = [len(points) for points in self.calibration_samples]
+        if sum(counts) <= len(screen_array):
+            return None
+        return np.vstack(self.calibration_samples), np.repeat(screen_array, counts, axis=0)
+
     def fit_polynomial_mapping(self):
         """Fallback polynomial mapping with local weighting"""
         try:
@@ -385,14 +642,17 @@ class PrecisionEyeTracker:
             print(f"[ERROR] Polynomial mapping failed: {e}")
             return False
 
-    def map_gaze_to_screen_precise(self, gaze_x, gaze_y):
-        """High-precision gaze to screen mapping"""
+    def map_gaze_to_screen_precise(self, gaze_x, gaze_y, corrected=True):
+        """High-precision gaze to screen mapping (corrected=False skips the online correction)"""
         if self.rbf_interpolator_x is not None and self.rbf_interpolator_y is not None:
             # Use RBF interpolation
             try:
-                query_point = np.array([[gaze_x, gaze_y]])
-                screen_x = float(self.rbf_interpolator_x(query_point)[0])
-                screen_y = float(self.rbf_interpolator_y(query_point)[0])
+                if self.fast_rbf_map is not None:
+                    screen_x, screen_y = self.fast_rbf_map.evaluate(gaze_x, gaze_y)
+                else:
+                    query_point = np.array([[gaze_x, gaze_y]])
+                    screen_x = float(self.rbf_interpolator_x(query_point)[0])
+                    screen_y = float(self.rbf_interpolator_y(query_point)[0])
                 
                 # Apply local precision boosting in keyboard area
                 if self.is_in_keyboard_area(screen_x, screen_y):
@@ -414,6 +674,11 @@ class PrecisionEyeTracker:
         else:
             return None, None
         
+        if corrected and self.online_corrector is not None and self.online_corrector.samples:
+            offset_x, offset_y = self.online_corrector.correct(gaze_x, gaze_y)
+            screen_x += offset_x
+            screen_y += offset_y
+        
         # Clamp to screen bounds
         screen_x = max(5, min(self.SCREEN_W - 5, screen_x))
         screen_y = max(5, min(self.SCREEN_H - 5, screen_y))
@@ -425,41 +690,61 @@ class PrecisionEyeTracker:
         return (self.keyboard_area['left'] <= x <= self.keyboard_area['right'] and
                 self.keyboard_area['top'] <= y <= self.keyboard_area['bottom'])
 
+    def invalidate_keyboard_precision_index(self):
+        """Drop the cached keyboard-area calibration subset"""
+        self.keyboard_calib_tree = None
+        self.keyboard_calib_array = None
+        self.keyboard_screen_array = None
+        self.keyboard_boost_k = 0
+
+    def build_keyboard_precision_index(self):
+        """Cache keyboard-area calibration points and a KD-tree over their gaze features"""
+        self.invalidate_keyboard_precision_index()
+        if not self.calibration_data:
+            return
+        
+        calib_array = np.asarray(self.calibration_data, dtype=np.float64)
+        screen_array = np.asarray(self.screen_points, dtype=np.float64)
+        in_keyboard = ((screen_array[:, 0] >= self.keyboard_area['left']) &
+                       (screen_array[:, 0] <= self.keyboard_area['right']) &
+                       (screen_array[:, 1] >= self.keyboard_area['top']) &
+                       (screen_array[:, 1] <= self.keyboard_area['bottom']))
+        
+        if np.count_nonzero(in_keyboard) >= 3:
+            self.keyboard_calib_array = calib_array[in_keyboard]
+            self.keyboard_screen_array = screen_array[in_keyboard]
+            if len(self.keyboard_calib_array) > self.KEYBOARD_BOOST_NEIGHBORS:
+                # Only worth a tree once the subset is larger than the neighbourhood
+                self.keyboard_calib_tree = cKDTree(self.keyboard_calib_array)
+            self.keyboard_boost_k = min(self.KEYBOARD_BOOST_NEIGHBORS, len(self.keyboard_screen_array))
+            print(f"[MAPPING] Keyboard precision index: {len(self.keyboard_screen_array)} points")
+
     def apply_keyboard_precision_boost(self, screen_x, screen_y, gaze_x, gaze_y):
         """Apply extra precision in keyboard area using local calibration points"""
-        if not self.USE_LOCAL_WEIGHTING:
+        if not self.USE_LOCAL_WEIGHTING or self.keyboard_calib_array is None:
             return screen_x, screen_y
             
         try:
-            # Find nearest calibration points in keyboard area
-            keyboard_calib_points = []
-            keyboard_screen_points = []
-            
-            for i, (calib_gaze, screen_point) in enumerate(zip(self.calibration_data, self.screen_points)):
-                if self.is_in_keyboard_area(screen_point[0], screen_point[1]):
-                    keyboard_calib_points.append(calib_gaze)
-                    keyboard_screen_points.append(screen_point)
-            
-            if len(keyboard_calib_points) >= 3:
-                # Use local weighted interpolation
-                calib_array = np.array(keyboard_calib_points)
-                screen_array = np.array(keyboard_screen_points)
-                
-                # Calculate distances to current gaze point
-                distances = cdist([[gaze_x, gaze_y]], calib_array)[0]
-                
-                # Use inverse distance weighting with higher precision
-                weights = 1.0 / (distances + 0.01)  # Small epsilon to avoid division by zero
-                weights = weights / np.sum(weights)
-                
-                # Apply local correction
-                local_x = np.sum(screen_array[:, 0] * weights)
-                local_y = np.sum(screen_array[:, 1] * weights)
-                
-                # Blend with original estimate (favor local in keyboard area)
-                blend_factor = 0.7
-                screen_x = screen_x * (1 - blend_factor) + local_x * blend_factor
-                screen_y = screen_y * (1 - blend_factor) + local_y * blend_factor
+            if self.keyboard_calib_tree is not None:
+                # Nearest keyboard-area calibration points to the current gaze
+                distances, indices = self.keyboard_calib_tree.query((gaze_x, gaze_y), k=self.keyboard_boost_k)
+                local_screen = self.keyboard_screen_array[indices]
+            else:
+                distances = np.hypot(self.keyboard_calib_array[:, 0] - gaze_x,
+                                     self.keyboard_calib_array[:, 1] - gaze_y)
+                local_screen = self.keyboard_screen_array
+            
+            # Use inverse distance weighting with higher precision
+            weights = 1.0 / (distances + 0.01)  # Small epsilon to avoid division by zero
+            weights = weights / np.sum(weights)
+            
+            # Apply local correction
+            local_x, local_y = weights @ local_screen
+            
+            # Blend with original estimate (favor local in keyboard area)
+            blend_factor = 0.7
+            screen_x = screen_x * (1 - blend_factor) + local_x * blend_factor
+            screen_y = screen_y * (1 - blend_factor) + local_y * blend_factor
                 
         except Exception as e:
             pass  # If local boost fails, use original estimate
@@ -471,32 +756,33 @@ class PrecisionEyeTracker:
         if raw_x is None or raw_y is None:
             return None, None
         
-        current_pos = np.array([raw_x, raw_y])
+        current_pos = self.smooth_current
+        current_pos[0] = raw_x
+        current_pos[1] = raw_y
         
         # STAGE 1: Outlier rejection with tighter threshold
         if len(self.position_buffer) >= 3:
-            recent_positions = np.array(list(self.position_buffer)[-3:])
-            median_pos = np.median(recent_positions, axis=0)
-            distance = np.linalg.norm(current_pos - median_pos)
+            median_pos = self.position_buffer.median3(self.smooth_median)
+            delta = np.subtract(current_pos, median_pos, out=self.smooth_delta)
+            distance = np.sqrt(delta.dot(delta))
             
             if distance > self.OUTLIER_THRESHOLD:
                 # Clamp outlier to max jump distance
-                direction = (current_pos - median_pos) / distance
-                current_pos = median_pos + direction * self.OUTLIER_THRESHOLD
+                np.true_divide(delta, distance, out=delta)
+                np.multiply(delta, self.OUTLIER_THRESHOLD, out=delta)
+                np.add(median_pos, delta, out=current_pos)
         
         # Add to buffer
         self.position_buffer.append(current_pos)
         
         if len(self.position_buffer) < 3:
-            self.last_raw_pos = current_pos
-            return current_pos[0], current_pos[1]
+            self.last_raw_pos = current_pos.copy()
+            return float(current_pos[0]), float(current_pos[1])
         
         # STAGE 2: Adaptive weighted averaging
-        buffer_array = np.array(list(self.position_buffer))
-        
         # Calculate movement variance to adjust smoothing
-        if len(buffer_array) >= 4:
-            recent_movement = np.std(buffer_array[-4:], axis=0)
+        if len(self.position_buffer) >= 4:
+            recent_movement = self.position_buffer.window_std(4, self.smooth_std)
             movement_intensity = np.mean(recent_movement)
             
             # Adapt smoothing based on movement - less smoothing when moving fast
@@ -506,113 +792,199 @@ class PrecisionEyeTracker:
             adaptive_alpha = self.PRECISION_ALPHA
         
         # Apply weighted moving average
-        weighted_pos = np.average(buffer_array, axis=0, weights=self.weights[:len(buffer_array)])
+        weighted_pos = self.position_buffer.weighted_mean(
+            self.weights, self.weight_sums[len(self.position_buffer)], self.smooth_weighted)
         
         # STAGE 3: Exponential smoothing with adaptation
+        smoothed_pos = self.smooth_pos
         if self.last_smooth_pos is not None:
-            smoothed_pos = adaptive_alpha * weighted_pos + (1 - adaptive_alpha) * self.last_smooth_pos
+            np.multiply(weighted_pos, adaptive_alpha, out=smoothed_pos)
+            np.multiply(self.last_smooth_pos, 1 - adaptive_alpha, out=self.smooth_blend)
+            np.add(smoothed_pos, self.smooth_blend, out=smoothed_pos)
         else:
-            smoothed_pos = weighted_pos
+            np.copyto(smoothed_pos, weighted_pos)
         
         # STAGE 4: Precision deadzone (smaller than ultra-stable version)
         if self.last_output_pos is not None:
-            distance_from_last = np.linalg.norm(smoothed_pos - self.last_output_pos)
+            delta = np.subtract(smoothed_pos, self.last_output_pos, out=self.smooth_delta)
+            distance_from_last = np.sqrt(delta.dot(delta))
             
             if distance_from_last < self.PRECISION_DEADZONE:
                 # In precision deadzone - minimal movement
-                smoothed_pos = self.last_output_pos * 0.7 + smoothed_pos * 0.3
+                np.multiply(self.last_output_pos, 0.7, out=self.smooth_blend)
+                np.multiply(smoothed_pos, 0.3, out=smoothed_pos)
+                np.add(self.smooth_blend, smoothed_pos, out=smoothed_pos)
             elif distance_from_last < self.MIN_MOVEMENT_THRESHOLD:
                 # Small movement - gentle smoothing
-                smoothed_pos = self.last_output_pos * 0.5 + smoothed_pos * 0.5
+                np.multiply(self.last_output_pos, 0.5, out=self.smooth_blend)
+                np.multiply(smoothed_pos, 0.5, out=smoothed_pos)
+                np.add(self.smooth_blend, smoothed_pos, out=smoothed_pos)
         
         # Update tracking
-        self.last_smooth_pos = smoothed_pos.copy()
-        self.last_output_pos = smoothed_pos.copy()
+        np.copyto(self.smooth_state[0], smoothed_pos)
+        np.copyto(self.smooth_state[1], smoothed_pos)
+        self.last_smooth_pos = self.smooth_state[0]
+        self.last_output_pos = self.smooth_state[1]
         
         return float(smoothed_pos[0]), float(smoothed_pos[1])
 
-    def handle_blink_clicking(self, cursor_x, cursor_y, landmarks, img_width, img_height):
-        """Handle blink-based clicking for typing"""
+    def smooth_cursor_position(self, raw_x, raw_y, timestamp=None):
+        """Run the active cursor filter and track its added latency"""
+        if raw_x is None or raw_y is None:
+            return None, None
+        
+        gaze_filter = self.gaze_filters[self.active_filter]
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        smooth_x, smooth_y = gaze_filter.update(raw_x, raw_y, timestamp)
+        if smooth_x is not None:
+            gaze_filter.latency.update(raw_x, raw_y, smooth_x, smooth_y)
+        return smooth_x, smooth_y
+
+    def cycle_cursor_filter(self):
+        """Switch to the next cursor filter, starting it from a clean state"""
+        previous = self.gaze_filters[self.active_filter]
+        index = self.FILTER_ORDER.index(self.active_filter)
+        self.active_filter = self.FILTER_ORDER[(index + 1) % len(self.FILTER_ORDER)]
+        self.setup_advanced_filters()
+        print(f"🎯 Cursor filter: {self.active_filter} "
+              f"(previous {previous.name} lagged {previous.latency.frames:.2f} frames)")
+
+    def update_blink_state(self, landmarks, img_width, img_height, timestamp):
+        """Run the blink detector and set or release the pre-blink cursor anchor.
+
+        The anchor is set on the first frame of a closure, which the EAR trend
+        flags before the closed threshold is crossed. It is the cursor from
+        BLINK_LOOKBACK before that frame. It is released BLINK_SETTLE after the
+        eyes reopen. Returns this frame's BlinkEvent, if any.
+        """
+        left_ear, right_ear = self.calculate_both_ears(landmarks, img_width, img_height)
+        event = self.blink_detector.update(left_ear, right_ear, timestamp)
+        if event is not None:
+            self.freeze_until = timestamp + self.BLINK_SETTLE
+        self.was_blink = self.blink_detector.closing
+        
+        closing = self.was_blink or timestamp < self.freeze_until
+        if closing and self.blink_anchor is None and self.recent_cursor:
+            onset = self.blink_detector.onset if self.blink_detector.onset is not None else timestamp
+            anchor = self.recent_cursor[0]
+            for entry in self.recent_cursor:
+                if entry[0] <= onset - self.BLINK_LOOKBACK:
+                    anchor = entry
+            self.blink_anchor = (anchor[1], anchor[2])
+            self.blink_anchor_since = timestamp
+        elif not closing and self.blink_anchor is not None:
+            if self.BLINK_FREEZE:
+                self.filter_time_offset += timestamp - self.blink_anchor_since
+            self.blink_anchor = None
+        return event
+
+    def handle_blink_clicking(self, cursor_x, cursor_y, event, gaze=None):
+        """Handle blink-based clicking for typing.
+
+        event is this frame's BlinkEvent from update_blink_state. gaze is
+        (gaze_x, gaze_y, screen_x, screen_y) for this frame. Open-eye frames
+        are kept so clicks can teach the online correction.
+        """
         try:
-            current_time = time.time()
-            is_blink = self.detect_blink(landmarks, img_width, img_height)
-            
-            if is_blink and not self.was_blink and (current_time - self.last_blink_time > self.BLINK_DEBOUNCE):
-                # Blink onset detected
-                print(f"[BLINK] Click at ({int(cursor_x)}, {int(cursor_y)})")
-                pyautogui.click(int(cursor_x), int(cursor_y))
-                self.last_blink_time = current_time
-                
-            self.was_blink = is_blink
+            current_time = self.frame_timestamp if self.frame_timestamp is not None else time.perf_counter()
+            
+            click = None
+            if self.CLICK_MODE == "dwell":
+                if self.blink_anchor is None:
+                    click = self.dwell_clicker.update(cursor_x, cursor_y, current_time)
+                if click is not None:
+                    print(f"[DWELL] Click at ({int(click[0])}, {int(click[1])})")
+            elif event is not None and (self.CLICK_MODE == "blink" or event.kind != "blink"):
+                # Fires on the reopen frame, at the cursor from before the eyes started closing
+                click = self.blink_anchor if self.blink_anchor is not None else (cursor_x, cursor_y)
+                print(f"[BLINK] Click at ({int(click[0])}, {int(click[1])}) "
+                      f"({event.kind}, closed {event.duration * 1000:.0f} ms)")
+            
+            if click is not None:
+                if self.interpolator is not None:
+                    self.interpolator.hold(*click)
+                self.cursor.click(*click)
+                self.learn_from_click(*click)
+            
+            if gaze is not None and self.blink_anchor is None:
+                self.gaze_history.append((current_time,) + tuple(gaze))
             
         except Exception as e:
             print(f"[WARN] Blink click error: {e}")
 
-    def draw_calibration_screen_25point(self):
-        """Draw 9-point calibration interface"""
-        canvas = np.ones((self.SCREEN_H, self.SCREEN_W, 3), dtype=np.uint8) * 250
-        
-        if 0 <= self.calib_index < len(self.calib_points):
-            target_x, target_y = self.calib_points[self.calib_index]
-            
-            # Draw precision target
-            cv2.circle(canvas, (target_x, target_y), 35, (0, 0, 0), -1)
-            cv2.circle(canvas, (target_x, target_y), 60, (80, 80, 80), 4)
-            cv2.circle(canvas, (target_x, target_y), 8, (255, 255, 255), -1)
-            cv2.circle(canvas, (target_x, target_y), 2, (0, 0, 0), -1)
-            
-            # Progress info
-            progress_text = f"PRECISION CALIBRATION: POINT {self.calib_index + 1} OF {len(self.calib_points)}"
-            cv2.putText(canvas, progress_text, (50, 80), self.FONT, 1.6, (0, 0, 0), 3)
-            
-            # Grid position info
-            grid_row = self.calib_index // self.CALIB_GRID_SIZE + 1
-            grid_col = self.calib_index % self.CALIB_GRID_SIZE + 1
-            grid_text = f"Grid Position: Row {grid_row}, Column {grid_col}"
-            cv2.putText(canvas, grid_text, (50, 130), self.FONT, 1.2, (60, 60, 60), 2)
-            
-            # Instructions
-            instructions = [
-                "LOOK AT THE CENTER DOT AND HOLD PERFECTLY STILL",
-                "This 9-point calibration ensures surgical precision for typing",
-                "Each point needs 100 stable samples - please be patient",
-                "Press SPACE to accept manually | Press N to skip problematic points"
-            ]
-            
-            for i, instruction in enumerate(instructions):
-                cv2.putText(canvas, instruction, (50, 180 + i * 40), self.FONT, 0.9, (80, 80, 80), 2)
-            
-            # Show all calibration points as dots
-            for i, (px, py) in enumerate(self.calib_points):
-                if i < self.calib_index:
-                    # Completed points - green
-                    cv2.circle(canvas, (px, py), 8, (0, 180, 0), -1)
-                elif i == self.calib_index:
-                    # Current point - already drawn above
-                    pass
-                else:
-                    # Future points - gray
-                    cv2.circle(canvas, (px, py), 4, (150, 150, 150), -1)
-                    
-        else:
-            # Idle state
-            title = "PRECISION EYE TRACKER - TYPING OPTIMIZED"
-            cv2.putText(canvas, title, (self.SCREEN_W//2 - 450, self.SCREEN_H//2 - 100), 
-                       self.FONT, 2.0, (0, 0, 0), 4)
-            
-            subtitle = "9-Point Calibration for Maximum Accuracy"
-            cv2.putText(canvas, subtitle, (self.SCREEN_W//2 - 350, self.SCREEN_H//2 - 50), 
-                       self.FONT, 1.4, (60, 60, 60), 3)
-            
-            instruction = "Press 'C' to start precision calibration"
-            cv2.putText(canvas, instruction, (self.SCREEN_W//2 - 280, self.SCREEN_H//2 + 20), 
-                       self.FONT, 1.2, (0, 0, 0), 2)
-            
-            blink_status = "Blink-click: ENABLED"
-            cv2.putText(canvas, blink_status, (self.SCREEN_W//2 - 300, self.SCREEN_H//2 + 80), 
-                       self.FONT, 1.0, (0, 100, 200), 2)
+    def learn_from_click(self, click_x, click_y):
+        """Teach the online correction where the user first looked when heading for this click.
+
+        The gaze just before the blink always maps onto the click, because the
+        user steers the cursor there with it. The landing fixation right after
+        the last saccade is where they looked at the target before
+        compensating, so its offset from the click is the mapping error. The
+        same offset feeds the passive drift estimate.
+        """
+        if not self.calibration_data:
+            return
+        history = self.gaze_history
+        landing = None
+        for i in range(len(history) - 1, 0, -1):
+            if math.hypot(history[i][3] - history[i - 1][3], history[i][4] - history[i - 1][4]) > self.SACCADE_PX:
+                landing = i + 1  # First frame after the jump may still be in flight
+                break
+        if landing is None or landing >= len(history):
+            return
+        start = history[landing][0]
+        window = [(entry[1], entry[2]) for entry in list(history)[landing:] if entry[0] - start <= self.LANDING_WINDOW]
+        if len(window) < 3:
+            return
         
-        cv2.imshow(self.CALIB_WINDOW, canvas)
+        gaze_x, gaze_y = np.median(window, axis=0)
+        base_x, base_y = self.map_gaze_to_screen_precise(gaze_x, gaze_y, corrected=False)
+        if base_x is None:
+            return
+        self.estimate_drift(math.hypot(click_x - base_x, click_y - base_y))
+        if not self.USE_ONLINE_CORRECTION:
+            return
+        if self.online_corrector is None:
+            calib_array = np.asarray(self.calibration_data, dtype=np.float64)
+            mins, maxs = calib_array.min(axis=0), calib_array.max(axis=0)
+            self.online_corrector = OnlineResidualCorrector((maxs + mins) / 2.0, (maxs - mins) / 2.0,
+                                                            capacity=self.ONLINE_SAMPLES,
+                                                            max_residual=self.ONLINE_MAX_RESIDUAL_PX)
+        if self.online_corrector.observe(gaze_x, gaze_y, click_x - base_x, click_y - base_y):
+            offset_x, offset_y = self.online_corrector.correct(gaze_x, gaze_y)
+            print(f"[ONLINE] Learned from click ({len(self.online_corrector.samples)} samples): "
+                  f"correction here {offset_x:+.0f}, {offset_y:+.0f} px")
+
+    def reset_drift_estimate(self):
+        self.drift_residuals = deque(maxlen=self.DRIFT_CLICKS)  # px, click vs uncorrected mapping at landing
+        self.drift_suspected = False
+
+    def estimate_drift(self, residual):
+        """Median click error of the stored mapping over the newest clicks.
+
+        Tracking runs straight from a loaded profile; the short drift check is
+        only suggested once this passive estimate goes over DRIFT_MAX_ERROR_PX.
+        """
+        self.drift_residuals.append(residual)
+        if self.profile is None or self.drift_suspected or len(self.drift_residuals) < self.DRIFT_MIN_CLICKS:
+            return
+        estimate = float(np.median(self.drift_residuals))
+        if estimate > self.DRIFT_MAX_ERROR_PX:
+            self.drift_suspected = True
+            print(f"[PROFILE] Clicks land {estimate:.0f}px from the stored calibration "
+                  f"(limit {self.DRIFT_MAX_ERROR_PX}px) - press 'D' for a {self.DRIFT_CHECK_POINTS}-point drift check")
+
+    def draw_calibration_screen_25point(self):
+        """Draw the calibration interface (cached canvas, shown only when it changed)"""
+        if self.calibration_canvas is None:
+            if self.drift_check is not None:
+                self.calibration_canvas = CalibrationCanvas(self.SCREEN_W, self.SCREEN_H, self.calib_points,
+                                                            None, self.FONT, title="DRIFT CHECK")
+            else:
+                self.calibration_canvas = CalibrationCanvas(self.SCREEN_W, self.SCREEN_H, self.calib_points,
+                                                            self.CALIB_GRID_SIZE, self.FONT)
+        if self.calibration_canvas.render(self.calib_index, self.calib_progress):
+            cv2.imshow(self.CALIB_WINDOW, self.calibration_canvas.image)
 
     def draw_enhanced_progress_bars(self, frame, sample_progress, stability_progress):
         """Enhanced progress visualization for precision calibration"""
@@ -649,19 +1021,12 @@ class PrecisionEyeTracker:
         """Process calibration point with precision requirements and EAR calibration"""
         self.sample_buffer.append((gaze_x, gaze_y))
         
-        # Ultra-strict stability checking
-        if len(self.sample_buffer) >= 15:
-            # Check stability over larger window for precision
-            recent_samples = list(self.sample_buffer)[-15:]
-            recent_array = np.array(recent_samples)
-            
-            # Calculate stability metrics
-            std_x = np.std(recent_array[:, 0])
-            std_y = np.std(recent_array[:, 1])
-            max_std = max(std_x, std_y)
+        # Ultra-strict stability checking over the rolling window
+        if len(self.sample_buffer) >= self.CALIB_STABLE_WINDOW:
+            self.sample_buffer.window_std(self.CALIB_STABLE_WINDOW, self.sample_std)
             
             # Very tight stability requirement
-            if max_std < (self.CALIB_STABLE_TOLERANCE / 100.0):
+            if self.sample_std.max() < (self.CALIB_STABLE_TOLERANCE / 100.0):
                 self.stability_counter += 1
                 self.open_ear_values.append(avg_ear)  # Collect open eye EAR during stable frames
             else:
@@ -671,8 +1036,10 @@ class PrecisionEyeTracker:
         # Progress indicators
         sample_progress = len(self.sample_buffer) / self.CALIB_HOLD_FRAMES
         stability_progress = min(1.0, self.stability_counter / self.CALIB_MIN_STABLE_FRAMES)
+        self.calib_progress = min(sample_progress, stability_progress)
         
-        self.draw_enhanced_progress_bars(frame, sample_progress, stability_progress)
+        if frame is not None:
+            self.draw_enhanced_progress_bars(frame, sample_progress, stability_progress)
         
         # Auto-advance with very strict requirements
         if (len(self.sample_buffer) >= self.CALIB_HOLD_FRAMES and 
@@ -682,54 +1049,68 @@ class PrecisionEyeTracker:
     def accept_precision_calibration_point(self):
         """Accept calibration point with precision averaging"""
         if len(self.sample_buffer) > 20:
-            samples_array = np.array(list(self.sample_buffer))
-            
-            # Use only the most stable samples (middle 50% after sorting by stability)
-            center_start = int(len(samples_array) * 0.25)
-            center_end = int(len(samples_array) * 0.75)
-            
-            # Sort by distance from median to find most stable samples
-            median_sample = np.median(samples_array, axis=0)
-            distances = [np.linalg.norm(sample - median_sample) for sample in samples_array]
-            sorted_indices = np.argsort(distances)
-            
-            # Use the most stable samples
-            stable_indices = sorted_indices[:int(len(sorted_indices) * 0.6)]
-            stable_samples = samples_array[stable_indices]
+            avg_x, avg_y, stable_samples, covariance = self.robust_calibration_average(self.sample_buffer.last())
             
-            # Precision weighted average (central samples have higher weight)
-            weights = np.ones(len(stable_samples))
-            center_idx = len(stable_samples) // 2
-            
-            for i in range(len(weights)):
-                distance_from_center = abs(i - center_idx)
-                weights[i] = 1.0 / (1.0 + distance_from_center * 0.05)
-            
-            weights /= weights.sum()
-            
-            avg_x = np.average(stable_samples[:, 0], weights=weights)
-            avg_y = np.average(stable_samples[:, 1], weights=weights)
-            
-            self.calibration_data.append((avg_x, avg_y))
-            self.screen_points.append(self.calib_points[self.calib_index])
+            if self.drift_check is not None:
+                self.drift_check.add(self.calib_index, (avg_x, avg_y))
+            else:
+                self.calibration_data.append((avg_x, avg_y))
+                self.calibration_samples.append(stable_samples)
+                self.calibration_covariances.append(covariance)
+                self.screen_points.append(self.calib_points[self.calib_index])
             
             print(f"[PRECISION] Point {self.calib_index + 1}/{len(self.calib_points)} - Precision: {np.std(stable_samples, axis=0)}")
             
             # Reset for next point
             self.sample_buffer.clear()
             self.stability_counter = 0
+            self.calib_progress = 0.0
             self.calib_index += 1
             
             if self.calib_index >= len(self.calib_points):
                 self.complete_precision_calibration()
             else:
-                time.sleep(0.4)  # Longer pause for precision
+                self.pause(self.CALIB_POINT_PAUSE)  # Longer pause for precision
+
+    def robust_calibration_average(self, samples):
+        """Trimmed, centre-weighted average of one point's gaze samples.
+
+        Keeps the CALIB_KEEP_FRACTION of samples nearest the per-axis median and
+        weights them by rank. Returns (avg_x, avg_y, kept samples, covariance).
+        """
+        median_sample = np.median(samples, axis=0)
+        offsets = samples - median_sample
+        distances = np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
+        stable_indices = np.argsort(distances)[:int(len(samples) * self.CALIB_KEEP_FRACTION)]
+        stable_samples = samples[stable_indices]
+        
+        # Precision weighted average (central samples have higher weight)
+        ranks = np.abs(np.arange(len(stable_samples)) - len(stable_samples) // 2)
+        weights = 1.0 / (1.0 + ranks * 0.05)
+        weights /= weights.sum()
+        
+        avg_x, avg_y = weights @ stable_samples
+        covariance = np.cov(stable_samples, rowvar=False, aweights=weights)
+        return avg_x, avg_y, stable_samples, covariance
+
+    def pause(self, seconds):
+        """Skip sampling and tracking for a while without blocking the capture loop"""
+        if self.realtime:
+            now = self.frame_timestamp if self.frame_timestamp is not None else time.perf_counter()
+            self.pause_until = max(self.pause_until, now + seconds)
 
     def complete_precision_calibration(self):
         """Complete precision calibration and set personalized EAR threshold"""
+        if self.drift_check is not None:
+            self.complete_drift_check()
+            return
+        if self.add_adaptive_points():
+            return
         success = self.fit_precision_mapping()
         
         if success:
+            self.build_keyboard_precision_index()
+
             print("🎯 PRECISION CALIBRATION COMPLETED! 🎯")
             print(f"📍 {len(self.calibration_data)} points calibrated for maximum accuracy")
             print("⌨️ Ready for precise on-screen keyboard typing!")
@@ -739,6 +1120,7 @@ class PrecisionEyeTracker:
             if self.open_ear_values:
                 avg_open_ear = np.mean(self.open_ear_values)
                 self.BLINK_THRESHOLD = max(0.15, min(0.3, avg_open_ear * 0.75))
+                self.blink_detector.seed(avg_open_ear)
                 print(f"[EAR CALIB] Average open EAR: {avg_open_ear:.4f}, set blink threshold to {self.BLINK_THRESHOLD:.4f}")
             else:
                 print("[WARN] No EAR values collected, using default threshold")
@@ -747,112 +1129,488 @@ class PrecisionEyeTracker:
             
             # Reset smoothing for clean tracking start
             self.setup_advanced_filters()
+            self.save_profile()
             
         else:
             print("[ERROR] Precision calibration failed - please try again")
             self.reset_calibration()
         
-        time.sleep(0.5)
+        self.pause(self.CALIB_DONE_PAUSE)
+
+    def add_adaptive_points(self):
+        """After the grid, queue extra points in the cells whose corners fit worst.
+
+        Returns True if points were added and calibration continues.
+        """
+        if (self.CALIB_ADAPTIVE_POINTS <= 0 or len(self.calib_points) != len(self.grid_points)
+                or len(self.calibration_data) < 6 or self.CALIB_GRID_SIZE < 2):
+            return False
+        try:
+            errors = leave_one_out_errors(self.calibration_data, self.screen_points, self.RBF_SMOOTHING)
+        except Exception as e:
+            print(f"[WARN] Adaptive placement skipped: {e}")
+            return False
+        error_at = dict(zip(self.screen_points, errors))
+        
+        # Score each grid cell by the leave-one-out error of its calibrated corners
+        size = self.CALIB_GRID_SIZE
+        cells = []
+        for row in range(size - 1):
+            for col in range(size - 1):
+                corners = [self.grid_points[r * size + c] for r in (row, row + 1) for c in (col, col + 1)]
+                scores = [error_at[corner] for corner in corners if corner in error_at]
+                if scores:
+                    center = tuple(int(v) for v in np.mean(corners, axis=0))
+                    cells.append((float(np.mean(scores)), center))
+        cells.sort(reverse=True)
+        added = [center for _, center in cells[:self.CALIB_ADAPTIVE_POINTS]]
+        if not added:
+            return False
+        
+        self.calib_points = self.calib_points + added
+        self.calibration_canvas = None
+        print(f"[CALIBRATION] Leave-one-out error {errors.mean():.0f}px mean, {errors.max():.0f}px max - "
+              f"adding {len(added)} points where it is highest")
+        return True
+
+    def use_profile(self, user):
+        """Save calibrations under this user's profile and warm-start from it if one exists.
+
+        Returns True when a stored profile was loaded.
+        """
+        self.profile_path = profile_path(user, self.camera_id, (self.SCREEN_W, self.SCREEN_H))
+        if not os.path.exists(self.profile_path):
+            print(f"[PROFILE] No profile at {self.profile_path} - press 'C' to calibrate and create one")
+            return False
+        try:
+            profile = CalibrationProfile.load(self.profile_path)
+        except Exception as e:
+            print(f"[WARN] Ignoring profile {self.profile_path}: {e}")
+            return False
+        return self.apply_profile(profile)
+
+    def apply_profile(self, profile):
+        """Restore a stored calibration and fit its mapping, skipping the calibration sequence"""
+        load_start = time.perf_counter()
+        self.reset_calibration()
+        self.calibration_data = [tuple(point) for point in profile.calibration_data]
+        self.calibration_samples = list(profile.samples)
+        self.screen_points = [tuple(int(v) for v in point) for point in profile.screen_points]
+        if not self.fit_precision_mapping():
+            print("[WARN] Stored profile could not be fitted - full calibration needed")
+            self.reset_calibration()
+            return False
+        self.build_keyboard_precision_index()
+        self.BLINK_THRESHOLD = profile.blink_threshold
+        self.blink_detector.seed(self.BLINK_THRESHOLD / 0.75)
+        self.profile = profile
+        
+        # Stored weights only differ if the mapping code or settings changed since saving
+        current = self.mapping_weights()
+        for name, stored in profile.weights.items():
+            if name in current and (current[name].shape != stored.shape or
+                                    not np.allclose(current[name], stored, rtol=1e-6, atol=1e-6)):
+                print(f"[WARN] Refitted {name} differs from the stored profile - recalibrate if tracking is off")
+        
+        print(f"[PROFILE] Loaded {len(self.calibration_data)}-point calibration "
+              f"({profile.age_days():.1f} days old) in {(time.perf_counter() - load_start) * 1000:.1f} ms, "
+              f"blink threshold {self.BLINK_THRESHOLD:.4f}")
+        return True
+
+    def mapping_weights(self):
+        """Fitted mapping weights, as stored in a profile"""
+        weights = {}
+        if self.fast_rbf_map is not None:
+            weights['tps_coeffs'] = self.fast_rbf_map.coeffs
+        if self.mapping_weights_x is not None:
+            weights['poly_x'] = self.mapping_weights_x
+            weights['poly_y'] = self.mapping_weights_y
+        return weights
+
+    def save_profile(self):
+        """Store the current calibration at profile_path (no-op when profiles are off)"""
+        if self.profile_path is None or not self.calibration_data:
+            return
+        self.profile = CalibrationProfile(self.calibration_data, self.screen_points, self.BLINK_THRESHOLD,
+                                          (self.SCREEN_W, self.SCREEN_H), self.camera_id, self.RBF_SMOOTHING,
+                                          weights=self.mapping_weights(), samples=self.calibration_samples)
+        try:
+            self.profile.save(self.profile_path)
+            print(f"[PROFILE] Saved calibration to {self.profile_path}")
+        except Exception as e:
+            print(f"[WARN] Could not save profile: {e}")
+
+    def start_drift_check(self):
+        """Re-measure 1-2 of the profile's points; the profile is only corrected if they drifted"""
+        if self.profile is None or not self.is_mapping_ready():
+            print("[PROFILE] No calibration profile to check")
+            return
+        if 0 <= self.calib_index < len(self.calib_points):
+            return
+        keyboard_center = ((self.keyboard_area['left'] + self.keyboard_area['right']) / 2.0,
+                           (self.keyboard_area['top'] + self.keyboard_area['bottom']) / 2.0)
+        self.drift_check = DriftCheck(self.profile, self.calib_points, self.DRIFT_MAX_ERROR_PX,
+                                      keyboard_center, count=self.DRIFT_CHECK_POINTS)
+        self.calib_points = self.drift_check.targets
+        self.calibration_canvas = None
+        self.sample_buffer.clear()
+        self.stability_counter = 0
+        self.calib_progress = 0.0
+        self.calib_index = 0
+        print(f"[PROFILE] Drift check: look at each of the {len(self.calib_points)} targets")
+
+    def complete_drift_check(self):
+        """Keep the profile, or shift its gaze samples by the measured drift and refit"""
+        check = self.drift_check
+        self.calib_points = check.grid_points
+        self.drift_check = None
+        self.reset_drift_estimate()
+        self.calibration_canvas = None
+        self.calib_index = -1
+        
+        errors, offset = check.evaluate(self.map_gaze_to_screen_precise)
+        if not errors:
+            print("[PROFILE] Drift check skipped - keeping the stored calibration")
+            return
+        error = float(np.mean(errors))
+        if error <= check.max_error_px:
+            print(f"[PROFILE] Drift check passed: mean error {error:.0f}px (limit {check.max_error_px}px)")
+            return
+        
+        previous = self.calibration_data, self.calibration_samples
+        self.calibration_data = [(x + offset[0], y + offset[1]) for x, y in previous[0]]
+        self.calibration_samples = [points + offset for points in previous[1]]
+        if not self.fit_precision_mapping():
+            self.calibration_data, self.calibration_samples = previous
+            self.fit_precision_mapping()
+            print("[WARN] Drift correction failed - keeping the stored calibration")
+            return
+        self.build_keyboard_precision_index()
+        self.setup_advanced_filters()
+        corrected, _ = check.evaluate(self.map_gaze_to_screen_precise)
+        print(f"[PROFILE] Drift corrected: mean error {error:.0f}px -> {np.mean(corrected):.0f}px "
+              f"(gaze offset {offset[0]:+.4f}, {offset[1]:+.4f})")
+        self.save_profile()
 
     def run_precision_tracking(self):
         """Main precision tracking loop"""
-        self.draw_calibration_screen_25point()
-        frame_count = 0
+        if self.gaze_enabled:
+            self.draw_calibration_screen_25point()
+        self.grabber.start()
+        self.requested_resolution = (self.CAM_W, self.CAM_H)
+        frame_index = 0
         
         while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                time.sleep(0.01)
+            wait_start = time.perf_counter()
+            frame, captured_at, _ = self.grabber.read_latest()
+            if frame is None:
+                # Camera stalled - keep the UI responsive
+                if not self.handle_precision_keyboard(cv2.waitKey(1) & 0xFF):
+                    break
                 continue
-                
-            frame_count += 1
-            frame = cv2.flip(frame, 1)
-            frame_height, frame_width = frame.shape[:2]
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            try:
-                results = self.face_mesh.process(rgb_frame)
-            except Exception:
-                results = None
-            
-            # Process at full frame rate for precision
-            if results and results.multi_face_landmarks:
-                landmarks = results.multi_face_landmarks[0].landmark
-                gaze_x, gaze_y, eye_info, avg_ear = self.extract_precision_gaze_features(landmarks, frame_width, frame_height)
-                
-                if gaze_x is not None and gaze_y is not None and eye_info is not None:
-                    # Draw precision eye tracking overlay
-                    self.draw_precision_overlay(frame, eye_info)
-                    
-                    # Handle calibration
-                    if 0 <= self.calib_index < len(self.calib_points):
-                        self.process_precision_calibration(frame, gaze_x, gaze_y, avg_ear)
-                        
-                    # Handle precision tracking
-                    elif (self.rbf_interpolator_x is not None or self.mapping_weights_x is not None):
-                        self.process_precision_tracking(frame, gaze_x, gaze_y, landmarks, frame_width, frame_height)
-                        
-                    else:
-                        cv2.putText(frame, "READY FOR 9-POINT PRECISION CALIBRATION - Press 'C'", 
-                                   (10, 30), self.FONT, 0.7, (0, 255, 255), 2)
-                else:
-                    cv2.putText(frame, "Eye tracking failed - adjust lighting/position", 
-                               (10, 30), self.FONT, 0.7, (0, 0, 255), 2)
+            loop_start = time.perf_counter()
+            self.timings.add("wait", loop_start - wait_start)
+            self.timings.add("frame_age", loop_start - captured_at)
+            
+            settings = self.governor.settings if self.governor is not None else None
+            if settings is not None and (settings.width, settings.height) != self.requested_resolution:
+                self.requested_resolution = (settings.width, settings.height)
+                self.grabber.request_resolution(settings.width, settings.height)
+            
+            # Governor may skip inference and reuse the last landmarks
+            if (settings is not None and settings.inference_every > 1 and self.last_landmarks is not None
+                    and frame_index % settings.inference_every):
+                self.timings.add("inference_skipped", 0.0)
+                frame_height, frame_width = frame.shape[:2]
+                cursor = self.process_landmarks(frame if self.show_preview else None, self.last_landmarks,
+                                                frame_width, frame_height, captured_at, captured_at)
             else:
-                cv2.putText(frame, "Face not detected - center face in camera view", 
+                cursor = self.process_frame(frame, captured_at, captured_at)
+            
+            if settings is None or frame_index % settings.preview_every == 0:
+                if not self.update_preview(frame):
+                    break
+            
+            if self.governor is not None:
+                calibrating = 0 <= self.calib_index < len(self.calib_points)
+                self.governor.observe(time.perf_counter() - loop_start, cursor=cursor, hold=calibrating)
+            frame_index += 1
+        
+        self.cleanup()
+
+    def process_frame(self, frame, captured_at, timestamp):
+        """Run one BGR camera frame through inference and the gaze pipeline.
+
+        Returns the cursor position produced for this frame, or None.
+        """
+        self.trace.begin(captured_at)
+        frame_height, frame_width = frame.shape[:2]
+        overlay = frame if self.show_preview else None  # Nothing is drawn without a preview
+        if self.roi is not None:
+            landmarks = self.roi.infer(frame, full=self.recorder is not None)
+            self.trace.mark("inference")
+            self.last_landmarks = landmarks
+            if landmarks is not None:
+                return self.process_landmarks(overlay, landmarks, frame_width, frame_height, captured_at, timestamp)
+            return self.face_not_detected(overlay, timestamp, frame_width, frame_height)
+        
+        convert_start = time.perf_counter()
+        if self.rgb_frame is None or self.rgb_frame.shape != frame.shape:
+            self.rgb_frame = np.empty_like(frame)
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+        inference_start = time.perf_counter()
+        self.timings.add("convert", inference_start - convert_start)
+        
+        try:
+            results = self.face_mesh.process(rgb_frame)
+        except Exception:
+            results = None
+        inference_done = time.perf_counter()
+        self.timings.add("inference", inference_done - inference_start)
+        self.trace.mark("inference", inference_done)
+        
+        # Process at full frame rate for precision
+        self.last_landmarks = None
+        if results and results.multi_face_landmarks:
+            landmarks = results.multi_face_landmarks[0].landmark
+            self.last_landmarks = landmarks
+            return self.process_landmarks(overlay, landmarks, frame_width, frame_height, captured_at, timestamp)
+        return self.face_not_detected(overlay, timestamp, frame_width, frame_height)
+
+    def face_not_detected(self, frame, timestamp, frame_width, frame_height):
+        """Record the miss and tell the user"""
+        self.publish_landmarks(None, frame, frame_width, frame_height, timestamp)
+        if self.recorder is not None:
+            self.record_frame(None, timestamp, frame_width, frame_height)
+        if frame is not None:
+            cv2.putText(frame, "Face not detected - center face in camera view", 
+                       (10, 30), self.FONT, 0.7, (0, 0, 255), 2)
+        return None
+
+    def publish_landmarks(self, landmarks, frame, frame_width, frame_height, timestamp):
+        """Hand this frame's normalized landmarks (None when no face) to every consumer.
+
+        Only the GAZE_LANDMARK_LIST rows (eyes, irises, nose tip, face center)
+        are guaranteed current unless the full mesh was converted.
+        """
+        for consumer in self.landmark_consumers:
+            consume_start = time.perf_counter()
+            try:
+                consumer(landmarks, frame, frame_width, frame_height, timestamp)
+            except Exception as e:
+                print(f"[WARN] Landmark consumer error: {e}")
+            self.timings.add("consumers", time.perf_counter() - consume_start)
+
+    def process_landmarks(self, frame, landmarks, frame_width, frame_height, captured_at, timestamp):
+        """Features -> calibration or mapping/smoothing/click for one set of landmarks.
+
+        landmarks may be a MediaPipe landmark list or a normalized (478, 2) array;
+        frame may be None when no image is available (landmark replay).
+        """
+        self.frame_captured_at = captured_at
+        self.frame_timestamp = timestamp
+        self.trace.begin(captured_at)  # No-op when process_frame already started this frame
+        
+        if self.landmark_consumers:
+            self.publish_landmarks(self.load_landmarks(landmarks), frame, frame_width, frame_height, timestamp)
+        if not self.gaze_enabled:
+            if self.recorder is not None:
+                self.record_frame(landmarks, timestamp, frame_width, frame_height)  # Landmarks only, no gaze features
+            return None
+        
+        features_start = time.perf_counter()
+        gaze_x, gaze_y, eye_info, avg_ear = self.extract_precision_gaze_features(landmarks, frame_width, frame_height)
+        self.timings.add("features", time.perf_counter() - features_start)
+        
+        if self.recorder is not None:
+            self.record_frame(landmarks, timestamp, frame_width, frame_height, gaze_x, gaze_y, avg_ear)
+        
+        if gaze_x is None or gaze_y is None or eye_info is None:
+            if frame is not None:
+                cv2.putText(frame, "Eye tracking failed - adjust lighting/position", 
                            (10, 30), self.FONT, 0.7, (0, 0, 255), 2)
+            return None
+        
+        # Draw precision eye tracking overlay
+        if frame is not None:
+            self.draw_precision_overlay(frame, eye_info)
+        
+        # Settling pause after a calibration point or the end of calibration
+        if timestamp < self.pause_until:
+            return None
+        
+        # Handle calibration
+        if 0 <= self.calib_index < len(self.calib_points):
+            self.process_precision_calibration(frame, gaze_x, gaze_y, avg_ear)
             
-            # Show accuracy metrics
-            if hasattr(self, 'last_output_pos') and self.last_output_pos is not None:
-                accuracy_text = f"Precision Mode: {len(self.calibration_data)} cal points"
-                cv2.putText(frame, accuracy_text, (frame_width - 400, 30), self.FONT, 0.6, (0, 255, 0), 2)
-                
-                blink_text = f"Blink: ENABLED (Threshold: {self.BLINK_THRESHOLD:.2f})"
-                cv2.putText(frame, blink_text, (frame_width - 300, 60), self.FONT, 0.6, (255, 255, 0), 2)
+        # Handle precision tracking
+        elif self.is_mapping_ready():
+            return self.process_precision_tracking(frame, gaze_x, gaze_y, landmarks, frame_width, frame_height)
             
-            cv2.imshow(self.PREVIEW_WINDOW, frame)
+        elif frame is not None:
+            cv2.putText(frame, f"READY FOR {len(self.calib_points)}-POINT PRECISION CALIBRATION - Press 'C'", 
+                       (10, 30), self.FONT, 0.7, (0, 255, 255), 2)
+        return None
+
+    def start_recording(self, path):
+        """Record every frame's landmarks and gaze features to a .blm file"""
+        self.recorder = LandmarkRecorder(path)
+        self.recording_started = None
+        print(f"[RECORD] Recording landmarks to {path}")
+
+    def record_frame(self, landmarks, timestamp, frame_width, frame_height, gaze_x=None, gaze_y=None, avg_ear=None):
+        """Append the current frame to the session recording"""
+        if self.recording_started is None:
+            self.recording_started = timestamp
+        gaze = (gaze_x, gaze_y) if gaze_x is not None and gaze_y is not None else None
+        target = self.frame_target
+        if target is None and 0 <= self.calib_index < len(self.calib_points):
+            target = self.calib_points[self.calib_index]
+        try:
+            self.recorder.append(landmarks, timestamp - self.recording_started, avg_ear, gaze, target,
+                                 frame_size=(frame_width, frame_height))
+        except Exception as e:
+            print(f"[WARN] Recording stopped: {e}")
+            self.recorder.close()
+            self.recorder = None
+
+    def is_mapping_ready(self):
+        """True once a gaze-to-screen mapping has been fitted"""
+        return self.rbf_interpolator_x is not None or self.mapping_weights_x is not None
+
+    def update_preview(self, frame):
+        """Draw status onto the preview, show both windows and handle keys.
+
+        Returns False when the user asked to quit.
+        """
+        if self.headless:
+            return True
+        
+        # Render stage runs at most PREVIEW_MAX_FPS, independent of the tracking rate
+        preview_start = time.perf_counter()
+        if preview_start - self.last_render_at < 1.0 / self.PREVIEW_MAX_FPS:
+            return True
+        self.last_render_at = preview_start
+        
+        if self.show_preview:
+            self.draw_preview(frame)
+        if self.gaze_enabled:
             self.draw_calibration_screen_25point()
-            
-            # Handle keyboard input
-            key = cv2.waitKey(1) & 0xFF
-            if not self.handle_precision_keyboard(key):
-                break
         
-        self.cleanup()
+        # Handle keyboard input
+        key = cv2.waitKey(1) & 0xFF
+        self.timings.add("preview", time.perf_counter() - preview_start)
+        return self.handle_precision_keyboard(key)
+
+    def draw_preview(self, frame):
+        """Status text, HUD and the camera preview window"""
+        frame_width = frame.shape[1]
+        
+        # Show accuracy metrics
+        if hasattr(self, 'last_output_pos') and self.last_output_pos is not None:
+            accuracy_text = f"Precision Mode: {len(self.calibration_data)} cal points"
+            cv2.putText(frame, accuracy_text, (frame_width - 400, 30), self.FONT, 0.6, (0, 255, 0), 2)
+            
+            left_eye, right_eye = self.blink_detector.eyes
+            blink_text = f"Click: {self.CLICK_MODE} (EAR closed < {left_eye.close:.2f} / {right_eye.close:.2f})"
+            cv2.putText(frame, blink_text, (frame_width - 300, 60), self.FONT, 0.6, (255, 255, 0), 2)
+        
+        if self.hud is not None:
+            self.hud.draw(frame)
+        
+        if self.governor is not None and self.governor.level > 0:
+            cv2.putText(frame, f"Power level {self.governor.level}: {self.governor.settings.describe()}", 
+                       (10, frame.shape[0] - 50), self.FONT, 0.5, (0, 165, 255), 1)
+        
+        cv2.imshow(self.PREVIEW_WINDOW, frame)
 
     def process_precision_tracking(self, frame, gaze_x, gaze_y, landmarks, img_width, img_height):
         """Process precision tracking with blink-click support"""
+        mapping_start = time.perf_counter()
         raw_x, raw_y = self.map_gaze_to_screen_precise(gaze_x, gaze_y)
         
-        if raw_x is not None and raw_y is not None:
-            # Apply precision smoothing
-            smooth_x, smooth_y = self.apply_precision_smoothing(raw_x, raw_y)
-            
-            if smooth_x is not None and smooth_y is not None:
-                try:
-                    # Move cursor
-                    pyautogui.moveTo(int(smooth_x), int(smooth_y))
-                    
-                    # Handle blink clicking for typing
-                    self.handle_blink_clicking(smooth_x, smooth_y, landmarks, img_width, img_height)
-                    
-                    # Status display
-                    cv2.putText(frame, f"PRECISION TRACKING: ({int(smooth_x)}, {int(smooth_y)})", 
-                               (10, 30), self.FONT, 0.8, (0, 255, 0), 2)
-                    
-                    if self.is_in_keyboard_area(smooth_x, smooth_y):
-                        cv2.putText(frame, "KEYBOARD AREA - ENHANCED PRECISION", 
-                                   (10, 60), self.FONT, 0.7, (0, 255, 255), 2)
-                    
-                    if self.was_blink:
-                        cv2.putText(frame, "BLINK DETECTED", 
-                                   (10, 90), self.FONT, 0.7, (255, 255, 0), 2)
-                    
-                    cv2.putText(frame, "Controls: C=recalibrate | ESC=quit", 
-                               (10, frame.shape[0] - 20), self.FONT, 0.6, (200, 200, 200), 2)
-                               
-                except Exception as e:
-                    print(f"[WARN] Tracking error: {e}")
+        mapped_at = time.perf_counter()
+        
+        if raw_x is None or raw_y is None:
+            return None
+        
+        now = self.frame_timestamp if self.frame_timestamp is not None else time.perf_counter()
+        try:
+            blink_event = self.update_blink_state(landmarks, img_width, img_height, now)
+        except Exception as e:
+            print(f"[WARN] Blink detection error: {e}")
+            blink_event = None
+        
+        if self.BLINK_FREEZE and self.blink_anchor is not None:
+            # Iris landmarks collapse while the lids close: hold the pre-blink cursor,
+            # and keep the collapsed gaze out of the filters
+            smooth_x, smooth_y = self.blink_anchor
+        else:
+            # Apply the active cursor filter (precision chain by default)
+            smooth_x, smooth_y = self.smooth_cursor_position(raw_x, raw_y, now - self.filter_time_offset)
+            if smooth_x is None or smooth_y is None:
+                return None
+            if self.blink_anchor is None:
+                self.recent_cursor.append((now, smooth_x, smooth_y))
+        smoothed_at = time.perf_counter()
+        
+        try:
+            # Move cursor (the interpolator keeps it moving until the next frame)
+            if self.interpolator is not None:
+                velocity = (0.0, 0.0) if self.blink_anchor is not None else self.gaze_filters[self.active_filter].velocity
+                self.interpolator.update(smooth_x, smooth_y, velocity)
+            else:
+                self.cursor.move_to(smooth_x, smooth_y)
+            cursor_at = time.perf_counter()
+            self.trace.mark("mapping", mapped_at)
+            self.trace.mark("smoothing", smoothed_at)
+            self.trace.mark("dispatch", cursor_at)
+            self.timings.add("mapping", mapped_at - mapping_start)
+            self.timings.add("smoothing", smoothed_at - mapped_at)
+            self.timings.add("cursor", cursor_at - smoothed_at)
+            if self.frame_captured_at is not None:
+                self.timings.add("glass_to_cursor", cursor_at - self.frame_captured_at)
+            
+            # Handle blink clicking for typing
+            self.handle_blink_clicking(smooth_x, smooth_y, blink_event, (gaze_x, gaze_y, raw_x, raw_y))
+            
+            if frame is not None:
+                self.draw_tracking_status(frame, smooth_x, smooth_y)
+                       
+        except Exception as e:
+            print(f"[WARN] Tracking error: {e}")
+        
+        return smooth_x, smooth_y
+
+    def draw_tracking_status(self, frame, smooth_x, smooth_y):
+        """Status display for tracking mode"""
+        cv2.putText(frame, f"PRECISION TRACKING: ({int(smooth_x)}, {int(smooth_y)})", 
+                   (10, 30), self.FONT, 0.8, (0, 255, 0), 2)
+        
+        if self.is_in_keyboard_area(smooth_x, smooth_y):
+            cv2.putText(frame, "KEYBOARD AREA - ENHANCED PRECISION", 
+                       (10, 60), self.FONT, 0.7, (0, 255, 255), 2)
+        
+        if self.drift_suspected:
+            cv2.putText(frame, "CALIBRATION DRIFTED - press D for a quick re-check", 
+                       (10, 150), self.FONT, 0.6, (0, 165, 255), 2)
+        
+        if self.was_blink:
+            cv2.putText(frame, "BLINK DETECTED", 
+                       (10, 90), self.FONT, 0.7, (255, 255, 0), 2)
+        elif self.CLICK_MODE == "dwell" and self.frame_timestamp is not None:
+            dwell = self.dwell_clicker.progress(self.frame_timestamp)
+            if dwell > 0:
+                cv2.putText(frame, f"DWELL {dwell * 100:.0f}%", 
+                           (10, 90), self.FONT, 0.7, (255, 255, 0), 2)
+        
+        active = self.gaze_filters[self.active_filter]
+        cv2.putText(frame, f"Filter: {active.name} (lag {active.latency.frames:.1f} frames)", 
+                   (10, 120), self.FONT, 0.6, (200, 200, 255), 2)
+        
+        cv2.putText(frame, "Controls: C=recalibrate | D=drift check | F=filter | ESC=quit", 
+                   (10, frame.shape[0] - 20), self.FONT, 0.6, (200, 200, 200), 2)
 
     def draw_precision_overlay(self, frame, eye_info):
         """Draw precision tracking visualization"""
@@ -877,16 +1635,22 @@ class PrecisionEyeTracker:
         cv2.line(frame, (int(combined_x), int(combined_y) - 15), 
                 (int(combined_x), int(combined_y) + 15), (255, 255, 255), 1)
 
+    def start_calibration(self):
+        """Discard the current mapping and begin the calibration sequence"""
+        print(f"🎯 Starting {len(self.grid_points)}-point PRECISION calibration...")
+        print("📝 This will take several minutes but ensures typing accuracy")
+        self.reset_calibration()
+        self.calib_index = 0
+
     def handle_precision_keyboard(self, key):
         """Handle keyboard input for precision tracker"""
+        if key != 255 and any(handler(key) for handler in self.key_handlers):
+            return True
         if key == 27:  # ESC
             return False
             
         elif key in (ord('c'), ord('C')):
-            print("🎯 Starting 9-point PRECISION calibration...")
-            print("📝 This will take several minutes but ensures typing accuracy")
-            self.reset_calibration()
-            self.calib_index = 0
+            self.start_calibration()
             
         elif key == 32:  # SPACE
             if 0 <= self.calib_index < len(self.calib_points):
@@ -897,6 +1661,7 @@ class PrecisionEyeTracker:
                 print(f"⏭️ Skipping calibration point {self.calib_index + 1}")
                 self.sample_buffer.clear()
                 self.stability_counter = 0
+                self.calib_progress = 0.0
                 self.calib_index += 1
                 
                 if self.calib_index >= len(self.calib_points):
@@ -910,24 +1675,155 @@ class PrecisionEyeTracker:
             self.PRECISION_ALPHA = min(0.7, self.PRECISION_ALPHA + 0.05)
             print(f"🎯 Decreased smoothing: {self.PRECISION_ALPHA:.2f}")
         
+        elif key in (ord('d'), ord('D')):
+            self.start_drift_check()
+        
+        elif key in (ord('f'), ord('F')):
+            self.cycle_cursor_filter()
+        
+        elif key in (ord('t'), ord('T')):
+            self.print_timings()
+        
         return True
 
+    def enable_instrumentation(self, hud=True, metrics_target=None, interval=1.0):
+        """Start tracing per-frame stage timestamps; optionally show the HUD and export metrics"""
+        self.trace = TraceRing(self.TRACE_STAGES)
+        self.hud = LatencyHud(self.trace) if hud and self.show_preview else None
+        if metrics_target:
+            try:
+                self.metrics_exporter = MetricsExporter(self.trace, metrics_target, "eye",
+                                                        interval=interval, timings=self.timings)
+                self.metrics_exporter.start()
+            except Exception as e:
+                print(f"[WARN] Metrics export disabled: {e}")
+                self.metrics_exporter = None
+
+    def print_timings(self):
+        """Print per-stage latency counters"""
+        print("[TIMING] Per-stage latency:")
+        print(self.timings.summary())
+        if self.grabber is not None:
+            print(f"[TIMING] Frames captured: {self.grabber.frames_captured}, "
+                  f"dropped as stale: {self.grabber.frames_dropped}")
+        if self.governor is not None:
+            print(f"[TIMING] Governor level {self.governor.level} ({self.governor.settings.describe()}), "
+                  f"{len(self.governor.decisions)} recent decisions")
+        if isinstance(self.cursor, OutputDispatcher):
+            print(f"[TIMING] Output: {self.cursor.dispatched} events dispatched, "
+                  f"{self.cursor.coalesced} moves coalesced, {self.cursor.failures} failures")
+        if self.interpolator is not None:
+            print(f"[TIMING] Cursor interpolation at {self.interpolator.rate:.0f} Hz: "
+                  f"{self.interpolator.ticks} ticks, {self.interpolator.moves} moves, "
+                  f"{self.interpolator.cpu_share() * 100:.2f}% of one core")
+        detector = self.blink_detector
+        print(f"[TIMING] Blink detector: {detector.events} events, {detector.rejected_short} too short, "
+              f"{detector.rejected_long} too long, {detector.aborted} aborted closures")
+        if self.roi is not None:
+            print(f"[TIMING] ROI inference: {self.roi.roi_frames} crop frames, "
+                  f"{self.roi.full_frames} full-frame detections, {self.roi.losses} losses")
+
     def cleanup(self):
         """Clean up resources"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+        if self.interpolator is not None:
+            self.interpolator.stop()
+        if isinstance(self.cursor, OutputDispatcher):
+            self.cursor.stop()
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.print_timings()
         if self.cap:
             self.cap.release() 
         cv2.destroyAllWindows()
         print("🎯 Precision eye tracker shut down")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precision eye tracker")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Run offline from a recorded video or a landmark .npz instead of the webcam")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record per-frame landmarks, EAR and gaze features to a .blm file (live or replay)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Trace per-frame stage timestamps and show a rolling FPS/latency HUD")
+    parser.add_argument("--metrics", metavar="TARGET",
+                        help="Export Prometheus-format metrics to a file, or unix:/path for a socket (implies --trace)")
+    parser.add_argument("--grid", type=int, default=3, choices=range(3, 8), metavar="N",
+                        help="Calibration grid size, N x N points (default 3, up to 7)")
+    parser.add_argument("--adaptive", type=int, default=0, metavar="K",
+                        help="Add K extra calibration points where the grid fits worst")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="Calibration profile to load and save (default: your login name)")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="Always run the full calibration and don't save a profile")
+    parser.add_argument("--no-preview", action="store_true",
+                        help="Low-latency mode: no camera preview window or overlays (calibration window stays)")
+    parser.add_argument("--output-backend", default="auto", choices=OUTPUT_BACKENDS,
+                        help="Cursor/click output: native XTest or uinput on Linux, or pyautogui (default auto)")
+    parser.add_argument("--cursor-hz", type=int, default=120, metavar="HZ",
+                        help="Cursor updates per second, extrapolated between camera frames (0 = once per frame)")
+    parser.add_argument("--click", default="blink", choices=["blink", "wink", "dwell"],
+                        help="Click on blinks and winks, on winks only, or by holding the cursor still (default blink)")
+    parser.add_argument("--no-roi", action="store_true",
+                        help="Run face mesh on the full frame every time instead of a crop around the face")
+    parser.add_argument("--start", type=float, default=0.0,
+                        help="Replay: seconds into a .blm recording to start from")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Replay: start calibration on the first frame (recording begins with the grid)")
+    parser.add_argument("--screen", default="1920x1080",
+                        help="Replay: screen size used for calibration targets (default 1920x1080)")
+    parser.add_argument("--max-frames", type=int, help="Replay: stop after this many frames")
+    parser.add_argument("--report", metavar="JSON", help="Replay: write throughput/latency/accuracy report")
+    parser.add_argument("--show", action="store_true", help="Replay: show the preview windows")
+    return parser.parse_args()
+
+
+def run_replay_mode(args):
+    """Offline replay with a null cursor, unthrottled"""
+    screen_w, screen_h = (int(v) for v in args.screen.lower().split("x"))
+    source = open_replay_source(args.replay, start=args.start)
+    print(f"[REPLAY] {source.kind} source {args.replay}: {source.frame_count} frames at {source.fps:.1f} FPS")
+    
+    tracker = PrecisionEyeTracker(camera=False, headless=not args.show, screen_size=(screen_w, screen_h),
+                                  cursor=NullCursor(), roi=not args.no_roi, grid_size=args.grid)
+    tracker.CALIB_ADAPTIVE_POINTS = args.adaptive
+    if args.record:
+        tracker.start_recording(args.record)
+    if args.trace or args.metrics:
+        tracker.enable_instrumentation(metrics_target=args.metrics)
+    run_replay(tracker, source, calibrate=args.calibrate, max_frames=args.max_frames,
+               report_path=args.report)
+    if tracker.trace.enabled:
+        stats = tracker.trace.summary()
+        if stats['end_to_end']:
+            e2e = stats['end_to_end']
+            print(f"[TRACE] Capture to dispatch over the last {e2e['count']} frames: "
+                  f"p50 {e2e['p50']:.3f} ms, p95 {e2e['p95']:.3f} ms, p99 {e2e['p99']:.3f} ms")
+    if tracker.recorder is not None:
+        tracker.recorder.close()
+    if tracker.metrics_exporter is not None:
+        tracker.metrics_exporter.stop()
+
+
 # Main execution
 if __name__ == "__main__":
+    args = parse_args()
+    if args.replay:
+        run_replay_mode(args)
+        sys.exit(0)
+    
     try:
         print("=" * 80)
         print("    🎯 PRECISION EYE TRACKER - TYPING OPTIMIZED 🎯")
         print("=" * 80)
         print("FEATURES:")
-        print("• 9-point calibration grid (3x3) for essential accuracy")
+        print(f"• {args.grid ** 2}-point calibration grid ({args.grid}x{args.grid}) for essential accuracy")
         print("• RBF interpolation for local precision")
         print("• Keyboard area precision boosting")
         print("• Blink-click functionality for typing with personalized EAR threshold")
@@ -940,13 +1836,25 @@ if __name__ == "__main__":
         print("TYPING CONTROLS:")
         print("• Look at letter and blink to type it")
         print("• Press 'C' to recalibrate for better accuracy")
+        print("• Press 'D' to re-check a saved calibration profile for drift (suggested when clicks land off)")
         print()
         print("PRECISION TUNING (during tracking):")
         print("• Press 1/2: Adjust smoothing")
+        print("• Press F: Cycle cursor filter (precision / One Euro / Kalman)")
+        print("• Press T: Print per-stage latency (capture → cursor)")
         print("=" * 80)
         print()
         
-        tracker = PrecisionEyeTracker()
+        tracker = PrecisionEyeTracker(roi=not args.no_roi, preview=not args.no_preview, grid_size=args.grid,
+                                      output_backend=args.output_backend, cursor_hz=args.cursor_hz,
+                                      click_mode=args.click)
+        tracker.CALIB_ADAPTIVE_POINTS = args.adaptive
+        if not args.no_profile:
+            tracker.use_profile(args.profile or default_user())
+        if args.record:
+            tracker.start_recording(args.record)
+        if args.trace or args.metrics:
+            tracker.enable_instrumentation(metrics_target=args.metrics)
         tracker.run_precision_tracking()
         
     except KeyboardInterrupt:
@@ -0,0 +1,703 @@
+import math
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import pyautogui
+except Exception:  # No display available (headless replay / CI)
+    pyautogui = None
+
+if pyautogui is not None:
+    # Disable pyautogui failsafe
+    pyautogui.FAILSAFE = False
+    pyautogui.PAUSE = 0
+
+# Native Linux backends (optional): python-xlib ships with pyautogui on Linux, evdev does not
+try:
+    from Xlib import X, display as xdisplay
+    from Xlib.ext import xtest
+except Exception:
+    xdisplay = None
+
+try:
+    from evdev import UInput, AbsInfo, ecodes
+except Exception:
+    UInput = None
+
+WHEEL_DELTA = 120  # High-resolution scroll units per wheel notch (Windows WHEEL_DELTA, Linux *_HI_RES)
+
+
+class NotchAccumulator:
+    """Collects high-resolution wheel units into whole notches for outputs that only have notches"""
+
+    def __init__(self):
+        self.remainder = 0
+
+    def take(self, units):
+        """Add units; returns the whole notches now due (signed), keeping the rest"""
+        self.remainder += int(units)
+        notches = int(self.remainder / WHEEL_DELTA)  # Truncates towards zero in both directions
+        self.remainder -= notches * WHEEL_DELTA
+        return notches
+
+
+class PyAutoGuiCursor:
+    """OS cursor output through pyautogui"""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        if pyautogui is None:
+            raise RuntimeError("pyautogui is not available (no display?)")
+        self.notches = (NotchAccumulator(), NotchAccumulator())  # (vertical, horizontal)
+
+    def screen_size(self):
+        return pyautogui.size()
+
+    def move_to(self, x, y):
+        pyautogui.moveTo(int(x), int(y))
+
+    def click(self, x, y):
+        pyautogui.click(int(x), int(y))
+
+    def scroll(self, amount):
+        pyautogui.scroll(int(amount))
+
+    def hscroll(self, amount):
+        """Horizontal scroll (positive = right), shift+wheel on Windows"""
+        if sys.platform == 'win32':
+            pyautogui.keyDown('shift')
+            pyautogui.scroll(-int(amount))
+            pyautogui.keyUp('shift')
+        else:
+            pyautogui.hscroll(int(amount))
+
+    def scroll_hi_res(self, units):
+        """Vertical scroll in 1/120 notches: Windows takes them as-is, elsewhere whole notches are sent"""
+        if sys.platform == 'win32':
+            pyautogui.scroll(int(units))
+            return
+        notches = self.notches[0].take(units)
+        if notches:
+            self.scroll(notches)
+
+    def hscroll_hi_res(self, units):
+        if sys.platform == 'win32':
+            self.hscroll(units)
+            return
+        notches = self.notches[1].take(units)
+        if notches:
+            self.hscroll(notches)
+
+    def close(self):
+        pass
+
+
+class XTestCursor:
+    """X11 output through a persistent XTest connection.
+
+    Events are written to the X connection and flushed without waiting
+    for a round trip. Scroll amounts are wheel clicks like pyautogui's
+    (buttons 4/5 vertical, 6/7 horizontal), sent in one batch. Core X
+    has no high-resolution wheel, so high-resolution scrolls are sent as
+    whole clicks once enough units have collected.
+    """
+
+    name = "xtest"
+
+    def __init__(self, display_name=None):
+        if xdisplay is None:
+            raise RuntimeError("python-xlib is not available")
+        self.display = xdisplay.Display(display_name)
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("X server has no XTEST extension")
+        screen = self.display.screen()
+        self.size = (screen.width_in_pixels, screen.height_in_pixels)
+        self.notches = (NotchAccumulator(), NotchAccumulator())  # (vertical, horizontal)
+
+    def screen_size(self):
+        return self.size
+
+    def move_to(self, x, y):
+        xtest.fake_input(self.display, X.MotionNotify, x=int(x), y=int(y))
+        self.display.flush()
+
+    def click(self, x, y):
+        xtest.fake_input(self.display, X.MotionNotify, x=int(x), y=int(y))
+        xtest.fake_input(self.display, X.ButtonPress, 1)
+        xtest.fake_input(self.display, X.ButtonRelease, 1)
+        self.display.flush()
+
+    def _wheel(self, button, clicks):
+        for _ in range(clicks):
+            xtest.fake_input(self.display, X.ButtonPress, button)
+            xtest.fake_input(self.display, X.ButtonRelease, button)
+        self.display.flush()
+
+    def scroll(self, amount):
+        self._wheel(4 if amount > 0 else 5, abs(int(amount)))
+
+    def hscroll(self, amount):
+        """Horizontal scroll (positive = right)"""
+        self._wheel(7 if amount > 0 else 6, abs(int(amount)))
+
+    def scroll_hi_res(self, units):
+        notches = self.notches[0].take(units)
+        if notches:
+            self.scroll(notches)
+
+    def hscroll_hi_res(self, units):
+        notches = self.notches[1].take(units)
+        if notches:
+            self.hscroll(notches)
+
+    def close(self):
+        self.display.close()
+
+
+class UInputCursor:
+    """Linux output through a virtual uinput pointer (works without X, e.g. Wayland).
+
+    Needs write access to /dev/uinput. Motion is absolute over the given
+    screen size; scrolls are sent as one wheel event plus the matching
+    high-resolution event (120 units per click) where the kernel has them.
+    High-resolution scrolls send the units as they are and a wheel event
+    each time a whole click has collected, as real hi-res mice do.
+    """
+
+    name = "uinput"
+
+    def __init__(self, screen_size):
+        if UInput is None:
+            raise RuntimeError("evdev is not available")
+        self.size = (int(screen_size[0]), int(screen_size[1]))
+        self.wheel_hi_res = getattr(ecodes, "REL_WHEEL_HI_RES", None)
+        self.hwheel_hi_res = getattr(ecodes, "REL_HWHEEL_HI_RES", None)
+        wheels = [ecodes.REL_WHEEL, ecodes.REL_HWHEEL]
+        wheels += [code for code in (self.wheel_hi_res, self.hwheel_hi_res) if code is not None]
+        capabilities = {
+            ecodes.EV_KEY: [ecodes.BTN_LEFT, ecodes.BTN_RIGHT],
+            ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(0, 0, self.size[0] - 1, 0, 0, 0)),
+                            (ecodes.ABS_Y, AbsInfo(0, 0, self.size[1] - 1, 0, 0, 0))],
+            ecodes.EV_REL: wheels,
+        }
+        self.device = UInput(capabilities, name="blinkos-pointer")
+        self.notches = (NotchAccumulator(), NotchAccumulator())  # (vertical, horizontal)
+
+    def screen_size(self):
+        return self.size
+
+    def move_to(self, x, y):
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_X, int(x))
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_Y, int(y))
+        self.device.syn()
+
+    def click(self, x, y):
+        self.move_to(x, y)
+        self.device.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)
+        self.device.syn()
+        self.device.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 0)
+        self.device.syn()
+
+    def _wheel(self, code, hi_res_code, amount):
+        self.device.write(ecodes.EV_REL, code, int(amount))
+        if hi_res_code is not None:
+            self.device.write(ecodes.EV_REL, hi_res_code, int(amount) * 120)
+        self.device.syn()
+
+    def scroll(self, amount):
+        self._wheel(ecodes.REL_WHEEL, self.wheel_hi_res, amount)
+
+    def hscroll(self, amount):
+        """Horizontal scroll (positive = right)"""
+        self._wheel(ecodes.REL_HWHEEL, self.hwheel_hi_res, amount)
+
+    def _wheel_hi_res(self, code, hi_res_code, accumulator, units):
+        notches = accumulator.take(units)
+        if notches:
+            self.device.write(ecodes.EV_REL, code, notches)
+        if hi_res_code is not None:
+            self.device.write(ecodes.EV_REL, hi_res_code, int(units))
+        if notches or hi_res_code is not None:
+            self.device.syn()
+
+    def scroll_hi_res(self, units):
+        self._wheel_hi_res(ecodes.REL_WHEEL, self.wheel_hi_res, self.notches[0], units)
+
+    def hscroll_hi_res(self, units):
+        self._wheel_hi_res(ecodes.REL_HWHEEL, self.hwheel_hi_res, self.notches[1], units)
+
+    def close(self):
+        self.device.close()
+
+
+OUTPUT_BACKENDS = ["auto", "xtest", "uinput", "pyautogui"]
+
+
+def create_cursor(backend="auto", screen_size=None):
+    """Cursor backend by name.
+
+    "auto" tries XTest, then uinput on Linux and falls back to pyautogui.
+    A backend that was asked for by name raises if it can't be opened.
+    """
+    if backend == "auto":
+        candidates = ["xtest", "uinput", "pyautogui"] if sys.platform.startswith("linux") else ["pyautogui"]
+    else:
+        candidates = [backend]
+    errors = []
+    for name in candidates:
+        try:
+            if name == "xtest":
+                cursor = XTestCursor()
+            elif name == "uinput":
+                if screen_size is None:
+                    if pyautogui is None:
+                        raise RuntimeError("screen size unknown")
+                    screen_size = pyautogui.size()
+                cursor = UInputCursor(screen_size)
+            elif name == "pyautogui":
+                cursor = PyAutoGuiCursor()
+            else:
+                raise ValueError(f"unknown output backend {name!r}")
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            continue
+        if errors:
+            print(f"[OUTPUT] Skipped {'; '.join(errors)}")
+        print(f"[OUTPUT] Using {name} backend")
+        return cursor
+    raise RuntimeError("No output backend available (" + "; ".join(errors) + ")")
+
+
+class NullCursor:
+    """Cursor sink that only counts (and optionally records) events"""
+
+    name = "null"
+
+    def __init__(self, record=False, screen=(1920, 1080)):
+        self.record = record
+        self.screen = screen
+        self.moves = 0
+        self.clicks = 0
+        self.scrolls = 0
+        self.last_position = None
+        self.last_click = None
+        self.events = []
+
+    def screen_size(self):
+        return self.screen
+
+    def close(self):
+        pass
+
+    def move_to(self, x, y):
+        self.moves += 1
+        self.last_position = (x, y)
+        if self.record:
+            self.events.append(("move", x, y))
+
+    def click(self, x, y):
+        self.clicks += 1
+        self.last_click = (x, y)
+        if self.record:
+            self.events.append(("click", x, y))
+
+    def scroll(self, amount):
+        self.scrolls += 1
+        if self.record:
+            self.events.append(("scroll", amount))
+
+    def hscroll(self, amount):
+        self.scrolls += 1
+        if self.record:
+            self.events.append(("hscroll", amount))
+
+    def scroll_hi_res(self, units):
+        self.scrolls += 1
+        if self.record:
+            self.events.append(("scroll_hi_res", units))
+
+    def hscroll_hi_res(self, units):
+        self.scrolls += 1
+        if self.record:
+            self.events.append(("hscroll_hi_res", units))
+
+
+class OutputDispatcher:
+    """Runs cursor/click/scroll output on its own thread so OS stalls never hold up a frame.
+
+    Exposes the same calls as the cursor backends and returns immediately.
+    Events are dispatched in the order they were issued, except that
+    consecutive moves collapse into the newest one (only the latest
+    position matters). Queue wait and backend call time are recorded
+    separately as "dispatch_wait" and "dispatch_call" in timings.
+    """
+
+    def __init__(self, backend, timings=None):
+        self.backend = backend
+        self.name = f"{backend.name} (async)"
+        self.timings = timings
+        self.queue = deque()  # (kind, args, queued_at)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.busy = False
+
+        # Counters
+        self.dispatched = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def screen_size(self):
+        return self.backend.screen_size()
+
+    def start(self):
+        """Start the dispatch thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._dispatch_loop, name="output-dispatch", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """Dispatch what is still queued (up to timeout), then stop the thread"""
+        self.flush(timeout)
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+        try:
+            self.backend.close()
+        except Exception:
+            pass
+
+    def flush(self, timeout=1.0):
+        """Wait until everything queued so far has been dispatched; False on timeout"""
+        deadline = time.perf_counter() + timeout
+        with self.cond:
+            while self.running and (self.queue or self.busy):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+    def _put(self, kind, args):
+        with self.cond:
+            if kind == "move" and self.queue and self.queue[-1][0] == "move":
+                self.queue[-1] = (kind, args, self.queue[-1][2])  # Keep the older queue time
+                self.coalesced += 1
+            else:
+                self.queue.append((kind, args, time.perf_counter()))
+            self.cond.notify()
+
+    def move_to(self, x, y):
+        self._put("move", (x, y))
+
+    def click(self, x, y):
+        self._put("click", (x, y))
+
+    def scroll(self, amount):
+        self._put("scroll", (amount,))
+
+    def hscroll(self, amount):
+        self._put("hscroll", (amount,))
+
+    def scroll_hi_res(self, units):
+        self._put("scroll_hi_res", (units,))
+
+    def hscroll_hi_res(self, units):
+        self._put("hscroll_hi_res", (units,))
+
+    def _dispatch_loop(self):
+        calls = {"move": self.backend.move_to, "click": self.backend.click,
+                 "scroll": self.backend.scroll, "hscroll": self.backend.hscroll,
+                 "scroll_hi_res": self.backend.scroll_hi_res, "hscroll_hi_res": self.backend.hscroll_hi_res}
+        while True:
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()  # Wake flush()
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.queue:
+                    return
+                kind, args, queued_at = self.queue.popleft()
+                self.busy = True
+            start = time.perf_counter()
+            try:
+                calls[kind](*args)
+                self.dispatched += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"[WARN] Output {kind} failed: {e}")
+            if self.timings is not None:
+                done = time.perf_counter()
+                self.timings.add("dispatch_wait", start - queued_at)
+                self.timings.add("dispatch_call", done - start)
+
+
+class CursorInterpolator:
+    """Moves the cursor at display rate between camera frames.
+
+    update() sends each frame's smoothed position straight away, as before,
+    and starts a new segment from it. A timer thread then extrapolates
+    along the cursor filter's velocity estimate until the next frame
+    arrives. Extrapolation is bounded: at most one frame interval (and
+    max_ahead seconds) past the last frame and at most max_step_px away
+    from it. It is off below min_speed, so fixations stay still.
+    Positions are only sent when they change by a whole pixel.
+    Per-tick wall time goes to timings as "interpolate". The thread's CPU
+    time is kept in cpu_seconds.
+    """
+
+    def __init__(self, cursor, rate=120.0, max_ahead=0.05, max_step_px=60.0, min_speed=30.0,
+                 stale_after=0.25, timings=None):
+        self.cursor = cursor
+        self.rate = float(rate)
+        self.max_ahead = max_ahead      # s past the last frame the cursor may be extrapolated
+        self.max_step_px = max_step_px  # Largest extrapolated offset from the last frame
+        self.min_speed = min_speed      # px/s below which the cursor holds still
+        self.stale_after = stale_after  # s without a frame (face lost) before the timer stops moving
+        self.timings = timings
+        self.screen = cursor.screen_size()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.running = False
+
+        self.segment = None    # (x, y, vx, vy, started_at)
+        self.interval = None   # EMA of seconds between frames
+        self.last_sent = None  # Last whole-pixel position sent
+
+        # Counters
+        self.ticks = 0
+        self.moves = 0
+        self.cpu_seconds = 0.0
+        self.started_at = None
+
+    def start(self):
+        """Start the timer thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._tick_loop, name="cursor-interpolator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def update(self, x, y, velocity=(0.0, 0.0), now=None):
+        """New smoothed position from a frame, with the filter's velocity in px/s"""
+        now = time.perf_counter() if now is None else now
+        vx, vy = velocity
+        if vx * vx + vy * vy < self.min_speed * self.min_speed:
+            vx = vy = 0.0
+        with self.lock:
+            if self.segment is not None:
+                dt = now - self.segment[4]
+                if dt < self.stale_after:
+                    self.interval = dt if self.interval is None else self.interval + 0.2 * (dt - self.interval)
+            self.segment = (float(x), float(y), vx, vy, now)
+            self._send(x, y)
+
+    def hold(self, x, y, now=None):
+        """Park the cursor at (x, y) until the next update, e.g. for a click"""
+        self.update(x, y, (0.0, 0.0), now)
+
+    def position(self, now):
+        """Extrapolated cursor position at time now, or None when there is nothing to move"""
+        segment = self.segment
+        if segment is None:
+            return None
+        x, y, vx, vy, started_at = segment
+        elapsed = now - started_at
+        if elapsed > self.stale_after or (vx == 0.0 and vy == 0.0):
+            return None
+        horizon = self.max_ahead if self.interval is None else min(self.max_ahead, self.interval)
+        elapsed = min(elapsed, horizon)
+        dx, dy = vx * elapsed, vy * elapsed
+        step = math.hypot(dx, dy)
+        if step > self.max_step_px:
+            dx *= self.max_step_px / step
+            dy *= self.max_step_px / step
+        return x + dx, y + dy
+
+    def tick(self, now=None):
+        """One timer step: send the extrapolated position if it moved"""
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            self.ticks += 1
+            pos = self.position(now)
+            if pos is not None:
+                self._send(*pos)
+
+    def _send(self, x, y):
+        x = min(max(int(round(x)), 0), self.screen[0] - 1)
+        y = min(max(int(round(y)), 0), self.screen[1] - 1)
+        if (x, y) == self.last_sent:
+            return
+        self.last_sent = (x, y)
+        self.moves += 1
+        try:
+            self.cursor.move_to(x, y)
+        except Exception as e:
+            print(f"[WARN] Interpolated move failed: {e}")
+
+    def _tick_loop(self):
+        period = 1.0 / self.rate
+        next_tick = time.perf_counter()
+        while self.running:
+            next_tick += period
+            now = time.perf_counter()
+            if next_tick < now:
+                next_tick = now  # Fell behind (suspend, overload): don't burst to catch up
+            elif self.wake.wait(next_tick - now):
+                break
+            cpu_start = time.thread_time()
+            start = time.perf_counter()
+            self.tick(start)
+            self.cpu_seconds += time.thread_time() - cpu_start
+            if self.timings is not None:
+                self.timings.add("interpolate", time.perf_counter() - start)
+
+    def cpu_share(self):
+        """Fraction of one core the timer thread has used since start"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return self.cpu_seconds / elapsed if elapsed > 0 else 0.0
+
+
+class ScrollEngine:
+    """Continuous scrolling from a velocity, integrated on a fixed-rate timer thread.
+
+    set_velocity() takes a target speed in wheel units per second
+    (WHEEL_DELTA = one notch; positive is up / right), usually once per
+    camera frame. Every tick adds velocity * dt to a fractional remainder
+    per axis. Whole units are sent as one high-resolution scroll once at
+    least min_step have collected, so slow scrolls send fewer events. An
+    axis that stops or reverses drops its remainder. A velocity older than
+    stale_after (face lost, camera stalled) stops the scroll and drops the
+    remainder. Per-tick wall time goes to timings as
+    "scroll_tick". advance() runs the same ticks on a caller-supplied clock,
+    for replays that don't start the thread.
+    """
+
+    def __init__(self, cursor, rate=60.0, min_step=30, stale_after=0.25, timings=None):
+        self.cursor = cursor
+        self.rate = float(rate)
+        self.min_step = min_step        # Smallest high-resolution delta sent (units)
+        self.stale_after = stale_after  # s without a velocity update before scrolling stops
+        self.timings = timings
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.running = False
+
+        self.velocity = (0.0, 0.0)      # (horizontal, vertical) units/s
+        self.velocity_at = None         # When the velocity was last set
+        self.remainder = [0.0, 0.0]     # Fractional units not yet sent
+        self.last_tick = None
+
+        # Counters
+        self.ticks = 0
+        self.events = 0
+        self.units_sent = 0
+        self.active_seconds = 0.0       # Time spent with a non-zero velocity
+
+    def start(self):
+        """Start the timer thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._tick_loop, name="scroll-engine", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def set_velocity(self, vx, vy, now=None):
+        """New target speed in units/s (vx positive = right, vy positive = up)"""
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            for axis, velocity in enumerate((vx, vy)):
+                if velocity * self.velocity[axis] <= 0.0:
+                    self.remainder[axis] = 0.0  # Stopped or reversed: don't carry the old direction over
+            self.velocity = (float(vx), float(vy))
+            self.velocity_at = now
+
+    def tick(self, now=None):
+        """One timer step: integrate since the last tick and send whole units"""
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            self.ticks += 1
+            last, self.last_tick = self.last_tick, now
+            if last is None or self.velocity_at is None:
+                return
+            if now - self.velocity_at > self.stale_after:
+                self.velocity = (0.0, 0.0)
+                self.remainder = [0.0, 0.0]
+                return
+            vx, vy = self.velocity
+            if vx == 0.0 and vy == 0.0:
+                return
+            dt = min(now - last, 2.0 / self.rate)  # Late tick (suspend, overload): don't jump
+            self.active_seconds += dt
+            for axis, velocity in enumerate((vx, vy)):
+                self.remainder[axis] += velocity * dt
+                units = int(self.remainder[axis])
+                if abs(units) >= self.min_step:
+                    self.remainder[axis] -= units
+                    self._send(axis, units)
+
+    def advance(self, until):
+        """Run the ticks a running thread would have made up to time until"""
+        period = 1.0 / self.rate
+        if self.last_tick is None:
+            self.tick(until)
+            return
+        while self.last_tick + period <= until:
+            self.tick(self.last_tick + period)
+
+    def _send(self, axis, units):
+        self.events += 1
+        self.units_sent += abs(units)
+        try:
+            if axis == 0:
+                self.cursor.hscroll_hi_res(units)
+            else:
+                self.cursor.scroll_hi_res(units)
+        except Exception as e:
+            print(f"[WARN] Scroll failed: {e}")
+
+    def _tick_loop(self):
+        period = 1.0 / self.rate
+        next_tick = time.perf_counter()
+        while self.running:
+            next_tick += period
+            now = time.perf_counter()
+            if next_tick < now:
+                next_tick = now  # Fell behind (suspend, overload): don't burst to catch up
+            elif self.wake.wait(next_tick - now):
+                break
+            start = time.perf_counter()
+            self.tick(start)
+            if self.timings is not None:
+                self.timings.add("scroll_tick", time.perf_counter() - start)
@@ -0,0 +1,126 @@
+import getpass
+import os
+import re
+import time
+
+import numpy as np
+
+PROFILE_VERSION = 1
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".blinkos", "profiles")
+
+
+def default_user():
+    """Login name, used when no --profile name is given"""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "default"
+
+
+def profile_path(user, camera, screen_size, directory=PROFILE_DIR):
+    """One profile file per user, camera and screen resolution"""
+    name = f"{user}-{camera}-{int(screen_size[0])}x{int(screen_size[1])}"
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", name) + ".npz")
+
+
+class CalibrationProfile:
+    """A finished calibration stored as a small versioned .npz.
+
+    The per-point gaze averages (and the retained samples behind each, when
+    kept) with their screen targets are the source of truth; the fitted
+    TPS/polynomial weights are stored alongside so a load can tell whether
+    the current mapping code still reproduces them.
+    """
+
+    def __init__(self, calibration_data, screen_points, blink_threshold, screen_size, camera,
+                 rbf_smoothing, weights=None, created_at=None, version=PROFILE_VERSION, samples=None):
+        self.calibration_data = np.asarray(calibration_data, dtype=np.float64).reshape(-1, 2)
+        self.screen_points = np.asarray(screen_points, dtype=np.float64).reshape(-1, 2)
+        self.blink_threshold = float(blink_threshold)
+        self.screen_size = (int(screen_size[0]), int(screen_size[1]))
+        self.camera = str(camera)
+        self.rbf_smoothing = float(rbf_smoothing)
+        self.weights = dict(weights or {})  # name -> array (tps_coeffs, poly_x, poly_y)
+        self.samples = [np.asarray(points, dtype=np.float64).reshape(-1, 2) for points in (samples or [])]
+        self.created_at = time.time() if created_at is None else float(created_at)
+        self.version = int(version)
+
+    def save(self, path):
+        """Write atomically, creating the profile directory if needed"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {f"weights_{name}": np.asarray(value) for name, value in self.weights.items()}
+        if self.samples:
+            arrays['samples'] = np.vstack(self.samples)
+            arrays['sample_counts'] = np.array([len(points) for points in self.samples])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=self.version, calibration_data=self.calibration_data,
+                     screen_points=self.screen_points, blink_threshold=self.blink_threshold,
+                     screen_size=np.array(self.screen_size), camera=self.camera,
+                     rbf_smoothing=self.rbf_smoothing, created_at=self.created_at, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a profile; raises ValueError for unsupported versions or missing fields"""
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"]) if "version" in data else 0
+            if version != PROFILE_VERSION:
+                raise ValueError(f"profile version {version}, expected {PROFILE_VERSION}")
+            try:
+                weights = {key[len("weights_"):]: data[key] for key in data.files if key.startswith("weights_")}
+                samples = None
+                if "samples" in data.files:
+                    samples = np.split(data["samples"], np.cumsum(data["sample_counts"])[:-1])
+                return cls(data["calibration_data"], data["screen_points"], data["blink_threshold"],
+                           data["screen_size"], data["camera"].item(), data["rbf_smoothing"],
+                           weights=weights, created_at=data["created_at"], version=version, samples=samples)
+            except KeyError as e:
+                raise ValueError(f"profile is missing {e}") from None
+
+    def age_days(self):
+        return (time.time() - self.created_at) / 86400.0
+
+
+class DriftCheck:
+    """Re-measures 1-2 of a loaded profile's own calibration points.
+
+    Targets are the stored points nearest the screen centre and the keyboard
+    area, so each measured gaze can be compared with the gaze recorded for
+    the same target at calibration time: their mean difference is the
+    head-pose drift to apply to the stored calibration.
+    """
+
+    def __init__(self, profile, grid_points, max_error_px, keyboard_center, count=2):
+        screen_w, screen_h = profile.screen_size
+        picks = []
+        for anchor in [(screen_w / 2.0, screen_h / 2.0), keyboard_center][:count]:
+            distances = np.hypot(*(profile.screen_points - anchor).T)
+            for i in np.argsort(distances):
+                if i not in picks:
+                    picks.append(int(i))
+                    break
+        self.grid_points = grid_points  # Calibration grid to restore afterwards
+        self.max_error_px = max_error_px
+        self.targets = [tuple(int(v) for v in profile.screen_points[i]) for i in picks]
+        self.expected = profile.calibration_data[picks]
+        self.measured = {}  # target position -> measured gaze
+
+    def add(self, position, gaze):
+        self.measured[position] = np.asarray(gaze, dtype=np.float64)
+
+    def evaluate(self, mapper):
+        """Per-target cursor error (px) under mapper, and the mean gaze offset"""
+        if not self.measured:
+            return [], np.zeros(2)
+        positions = sorted(self.measured)
+        errors = []
+        for position in positions:
+            screen_x, screen_y = mapper(*self.measured[position])
+            if screen_x is None:
+                errors.append(float('inf'))
+                continue
+            target_x, target_y = self.targets[position]
+            errors.append(float(np.hypot(screen_x - target_x, screen_y - target_y)))
+        offset = np.mean([self.measured[p] - self.expected[p] for p in positions], axis=0)
+        return errors, offset
@@ -0,0 +1,155 @@
+import os
+import struct
+import time
+
+import numpy as np
+
+# File layout: fixed 64-byte header followed by fixed-size records, so frame i
+# lives at HEADER_SIZE + i * record_size (O(1) seek, no separate index needed).
+MAGIC = b"BLNKLM01"
+VERSION = 1
+HEADER_SIZE = 64
+HEADER_FORMAT = "<8sIIIIIIQd"  # magic, version, header size, record size, landmarks, width, height, frames, created
+
+FLAG_FACE = 1       # Landmarks present
+FLAG_GAZE = 2       # Gaze features valid
+
+
+def record_dtype(num_landmarks=478):
+    """Packed per-frame record"""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('ear', '<f4'),
+        ('gaze', '<f4', (2,)),
+        ('target', '<f4', (2,)),      # Ground-truth screen point (calibration target), NaN if unknown
+        ('flags', '<u4'),
+        ('landmarks', '<f4', (num_landmarks, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """Append-only writer for per-frame face mesh landmarks and gaze features.
+
+    One preallocated record is filled and appended per frame; the frame count
+    in the header is refreshed every flush_every frames and on close, and
+    readers also trust the file size, so a crashed session stays replayable.
+    """
+
+    def __init__(self, path, frame_size=(0, 0), num_landmarks=478, flush_every=300):
+        self.path = path
+        self.num_landmarks = num_landmarks
+        self.frame_size = tuple(int(v) for v in frame_size)
+        self.flush_every = flush_every
+        self.dtype = record_dtype(num_landmarks)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.frames = 0
+        self.created = time.time()
+        self.file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, self.dtype.itemsize,
+                             self.num_landmarks, self.frame_size[0], self.frame_size[1],
+                             self.frames, self.created)
+        self.file.seek(0)
+        self.file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self.file.seek(0, os.SEEK_END)
+
+    def append(self, landmarks, timestamp, ear=None, gaze=None, target=None, frame_size=None):
+        """Append one frame; landmarks is a MediaPipe landmark list, an (N, 2|3) array or None"""
+        if frame_size is not None and tuple(frame_size) != self.frame_size:
+            self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+            self._write_header()
+
+        rec = self.record[0]
+        rec['timestamp'] = timestamp
+        rec['ear'] = np.nan if ear is None else ear
+        flags = 0
+        if gaze is None:
+            rec['gaze'] = np.nan
+        else:
+            rec['gaze'] = gaze
+            flags |= FLAG_GAZE
+        rec['target'] = np.nan if target is None else target
+
+        coords = rec['landmarks']
+        if landmarks is None:
+            coords[:] = np.nan
+        elif isinstance(landmarks, np.ndarray):
+            coords[:len(landmarks), :landmarks.shape[1]] = landmarks
+            if landmarks.shape[1] < 3:
+                coords[:, 2] = 0.0
+            flags |= FLAG_FACE
+        else:
+            coords[:len(landmarks)] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+            flags |= FLAG_FACE
+        rec['flags'] = flags
+
+        self.file.write(self.record.data)
+        self.frames += 1
+        if self.frames % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self._write_header()
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        print(f"[RECORD] Wrote {self.frames} frames to {self.path}")
+
+
+class LandmarkRecording:
+    """Memory-mapped reader: frames are paged in on access, never loaded whole"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < struct.calcsize(HEADER_FORMAT) or header[:8] != MAGIC:
+            raise ValueError(f"{path} is not a BlinkOS landmark recording")
+        (_, self.version, header_size, record_size, self.num_landmarks,
+         width, height, header_frames, self.created) = struct.unpack_from(HEADER_FORMAT, header)
+        if self.version > VERSION:
+            raise ValueError(f"{path} uses recording format v{self.version}, newer than supported v{VERSION}")
+
+        self.dtype = record_dtype(self.num_landmarks)
+        if record_size != self.dtype.itemsize:
+            raise ValueError(f"{path} has {record_size}-byte records, expected {self.dtype.itemsize}")
+        self.frame_size = (width, height)
+
+        # Complete records on disk are authoritative: the header count lags by up
+        # to flush_every - 1 frames after a crash, and a header claiming more
+        # frames than the file holds (truncated copy) is capped to what exists
+        on_disk = (os.path.getsize(path) - header_size) // record_size
+        self.frame_count = int(on_disk)
+        if self.frame_count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=header_size,
+                                     shape=(self.frame_count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+        self.timestamps = self.records['timestamp']
+        self.landmarks = self.records['landmarks']
+        self.gaze = self.records['gaze']
+        self.ear = self.records['ear']
+        self.targets = self.records['target']
+        self.flags = self.records['flags']
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def index_at(self, timestamp):
+        """First frame at or after timestamp (binary search over the mapped timestamps)"""
+        return int(np.searchsorted(self.timestamps, timestamp))
+
+    def close(self):
+        """Drop the mapping (it is released once no views remain)"""
+        self.records = self.timestamps = self.landmarks = None
+        self.gaze = self.ear = self.targets = self.flags = None
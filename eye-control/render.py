@@ -0,0 +1,144 @@
+import cv2
+import numpy as np
+
+CALIBRATION_INSTRUCTIONS = [
+    "LOOK AT THE CENTER DOT AND HOLD PERFECTLY STILL",
+    "This {points}-point calibration ensures surgical precision for typing",
+    "Each point needs 100 stable samples - please be patient",
+    "Press SPACE to accept manually | Press N to skip problematic points"
+]
+
+
+class CalibrationCanvas:
+    """Full-screen calibration window content with cached backgrounds.
+
+    The idle screen and the static part of the calibration screen (background
+    and instructions) are rendered once. render() only repaints the rectangles
+    whose content changed - the header and the old/new target when the point
+    advances, the target when its progress ring moves - and reports whether
+    anything changed, so the caller can skip imshow for unchanged frames.
+    """
+
+    HEADER_HEIGHT = 150          # Point counter and grid position text
+    TARGET_RADIUS = 66           # Target rings plus line width
+    PROGRESS_STEPS = 20          # Progress ring resolution
+
+    def __init__(self, screen_w, screen_h, calib_points, grid_size, font=cv2.FONT_HERSHEY_SIMPLEX,
+                 title="PRECISION CALIBRATION"):
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.calib_points = list(calib_points)
+        self.grid_size = grid_size   # None for points that are not a grid (drift check)
+        self.font = font
+        self.title = title
+
+        self.idle = np.full((screen_h, screen_w, 3), 250, dtype=np.uint8)
+        self.draw_idle(self.idle)
+        self.base = np.full((screen_h, screen_w, 3), 250, dtype=np.uint8)
+        for i, instruction in enumerate(CALIBRATION_INSTRUCTIONS):
+            cv2.putText(self.base, instruction.format(points=len(self.calib_points)), (50, 180 + i * 40),
+                        self.font, 0.9, (80, 80, 80), 2)
+        self.canvas = self.base.copy()
+
+        self.image = self.idle   # What the window should show
+        self.state = None        # (calibrating, index, progress step) currently on screen
+        self.index = -1
+        self.step = 0
+        self.repaints = 0
+
+    def draw_idle(self, canvas):
+        title = "PRECISION EYE TRACKER - TYPING OPTIMIZED"
+        cv2.putText(canvas, title, (self.screen_w//2 - 450, self.screen_h//2 - 100),
+                   self.font, 2.0, (0, 0, 0), 4)
+
+        subtitle = f"{len(self.calib_points)}-Point Calibration for Maximum Accuracy"
+        cv2.putText(canvas, subtitle, (self.screen_w//2 - 350, self.screen_h//2 - 50),
+                   self.font, 1.4, (60, 60, 60), 3)
+
+        instruction = "Press 'C' to start precision calibration"
+        cv2.putText(canvas, instruction, (self.screen_w//2 - 280, self.screen_h//2 + 20),
+                   self.font, 1.2, (0, 0, 0), 2)
+
+        blink_status = "Blink-click: ENABLED"
+        cv2.putText(canvas, blink_status, (self.screen_w//2 - 300, self.screen_h//2 + 80),
+                   self.font, 1.0, (0, 100, 200), 2)
+
+    def target_rect(self, index):
+        x, y = self.calib_points[index]
+        r = self.TARGET_RADIUS
+        return (x - r, y - r, x + r + 1, y + r + 1)
+
+    def render(self, calib_index, progress=0.0):
+        """Bring the canvas up to date; returns True if the window needs a new imshow"""
+        if not 0 <= calib_index < len(self.calib_points):
+            if self.state is not None and not self.state[0]:
+                return False
+            self.state = (False, -1, 0)
+            self.image = self.idle
+            return True
+
+        step = int(min(1.0, max(0.0, progress)) * self.PROGRESS_STEPS)
+        previous = self.state
+        self.index, self.step = calib_index, step
+        self.state = (True, calib_index, step)
+        self.image = self.canvas
+
+        if previous is None or not previous[0] or calib_index < previous[1]:
+            self.paint((0, 0, self.screen_w, self.screen_h))
+        elif calib_index != previous[1]:
+            self.paint((0, 0, self.screen_w, self.HEADER_HEIGHT))
+            for index in range(previous[1], calib_index + 1):
+                self.paint(self.target_rect(index))
+        elif step != previous[2]:
+            self.paint(self.target_rect(calib_index))
+        else:
+            return False
+        return True
+
+    def paint(self, rect):
+        """Restore a rectangle from the static background and redraw what overlaps it"""
+        x0, y0, x1, y1 = rect
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.screen_w, x1), min(self.screen_h, y1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        view = self.canvas[y0:y1, x0:x1]
+        view[:] = self.base[y0:y1, x0:x1]
+        self.draw_elements(view, x0, y0)
+        self.repaints += 1
+
+    def draw_elements(self, img, ox, oy):
+        """Current target, header and point dots, drawn into img offset by (ox, oy).
+        OpenCV clips to img, so drawing everything into a small view is cheap."""
+        index = self.index
+
+        # Draw precision target with its sample progress ring
+        target_x, target_y = self.calib_points[index]
+        center = (target_x - ox, target_y - oy)
+        cv2.circle(img, center, 35, (0, 0, 0), -1)
+        cv2.circle(img, center, 60, (80, 80, 80), 4)
+        if self.step:
+            sweep = 360.0 * self.step / self.PROGRESS_STEPS
+            cv2.ellipse(img, center, (60, 60), -90, 0, sweep, (0, 180, 0), 4)
+        cv2.circle(img, center, 8, (255, 255, 255), -1)
+        cv2.circle(img, center, 2, (0, 0, 0), -1)
+
+        # Progress info
+        progress_text = f"{self.title}: POINT {index + 1} OF {len(self.calib_points)}"
+        cv2.putText(img, progress_text, (50 - ox, 80 - oy), self.font, 1.6, (0, 0, 0), 3)
+
+        # Grid position info
+        if self.grid_size and index < self.grid_size ** 2:  # Adaptive extra points are off the grid
+            grid_row = index // self.grid_size + 1
+            grid_col = index % self.grid_size + 1
+            grid_text = f"Grid Position: Row {grid_row}, Column {grid_col}"
+            cv2.putText(img, grid_text, (50 - ox, 130 - oy), self.font, 1.2, (60, 60, 60), 2)
+
+        # Show all calibration points as dots
+        for i, (px, py) in enumerate(self.calib_points):
+            if i < index:
+                # Completed points - green
+                cv2.circle(img, (px - ox, py - oy), 8, (0, 180, 0), -1)
+            elif i > index:
+                # Future points - gray
+                cv2.circle(img, (px - ox, py - oy), 4, (150, 150, 150), -1)
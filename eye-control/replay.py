@@ -0,0 +1,241 @@
+import json
+import math
+import time
+
+import cv2
+import numpy as np
+
+from recording import LandmarkRecording, FLAG_FACE
+
+
+class VideoReplaySource:
+    """Frames decoded from a recorded webcam video, delivered as fast as they decode"""
+
+    kind = "video"
+
+    def __init__(self, path, mirror=True):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video {path}")
+        self.mirror = mirror  # Live capture is mirrored, so raw recordings need the same flip
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.index = 0
+
+    def read(self):
+        """Next (frame, timestamp, target), or (None, None, None) at the end"""
+        ret, frame = self.cap.read()
+        if not ret:
+            return None, None, None
+        if self.mirror:
+            frame = cv2.flip(frame, 1)
+        timestamp = self.index / self.fps
+        self.index += 1
+        return frame, timestamp, None
+
+    def close(self):
+        self.cap.release()
+
+
+class LandmarkReplaySource:
+    """Pre-extracted face mesh landmarks from a compact .npz file.
+
+    landmarks   (F, 478, 2|3) float32 normalized image coordinates (mirrored view)
+    frame_size  (2,) width and height of the camera frames they came from
+    timestamps  (F,) seconds, optional (30 fps assumed)
+    targets     (F, 2) ground-truth screen position per frame, NaN if unknown, optional
+    """
+
+    kind = "landmarks"
+
+    def __init__(self, path):
+        self.path = path
+        data = np.load(path)
+        self.landmarks = np.ascontiguousarray(data['landmarks'][..., :2], dtype=np.float32)
+        self.frame_count = len(self.landmarks)
+        self.frame_size = tuple(int(v) for v in data['frame_size']) if 'frame_size' in data else (1280, 720)
+        if 'timestamps' in data:
+            self.timestamps = np.asarray(data['timestamps'], dtype=np.float64)
+        else:
+            self.timestamps = np.arange(self.frame_count) / 30.0
+        self.targets = np.asarray(data['targets'], dtype=np.float64) if 'targets' in data else None
+        self.fps = (self.frame_count - 1) / (self.timestamps[-1] - self.timestamps[0]) if self.frame_count > 1 else 30.0
+        self.index = 0
+
+    def read(self):
+        """Next (landmarks, timestamp, target), or (None, None, None) at the end"""
+        if self.index >= self.frame_count:
+            return None, None, None
+        i = self.index
+        self.index += 1
+        target = None
+        if self.targets is not None and not np.isnan(self.targets[i]).any():
+            target = self.targets[i]
+        return self.landmarks[i], float(self.timestamps[i]), target
+
+    def close(self):
+        pass
+
+
+class RecordingReplaySource:
+    """Landmarks streamed from a memory-mapped .blm session recording (see recording.py).
+
+    Frames without a face are skipped; start seeks by timestamp without
+    reading anything before it.
+    """
+
+    kind = "landmarks"
+
+    def __init__(self, path, start=0.0):
+        self.path = path
+        self.recording = LandmarkRecording(path)
+        self.frame_count = len(self.recording)
+        self.frame_size = self.recording.frame_size
+        timestamps = self.recording.timestamps
+        span = float(timestamps[-1] - timestamps[0]) if self.frame_count > 1 else 0.0
+        self.fps = (self.frame_count - 1) / span if span > 0 else 30.0
+        self.index = self.recording.index_at(timestamps[0] + start) if start and self.frame_count else 0
+
+    def read(self):
+        """Next (landmarks, timestamp, target), or (None, None, None) at the end"""
+        rec = self.recording
+        while self.index < self.frame_count:
+            i = self.index
+            self.index += 1
+            if not rec.flags[i] & FLAG_FACE:
+                continue
+            target = rec.targets[i]
+            target = None if np.isnan(target).any() else target.astype(np.float64)
+            return rec.landmarks[i, :, :2], float(rec.timestamps[i]), target
+        return None, None, None
+
+    def close(self):
+        self.recording.close()
+
+
+def open_replay_source(path, start=0.0):
+    """Pick the replay source from the file extension"""
+    if path.endswith('.npz'):
+        return LandmarkReplaySource(path)
+    if path.endswith('.blm'):
+        return RecordingReplaySource(path, start=start)
+    return VideoReplaySource(path)
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else float('nan')
+
+
+def run_replay(tracker, source, calibrate=False, max_frames=None, report_path=None):
+    """Drive the full feature -> mapping -> smoothing -> click path from a recording.
+
+    Runs unthrottled and returns a report with throughput, per-stage timings
+    and (when the source has ground-truth targets) cursor accuracy.
+    """
+    tracker.timings.reset()
+    if calibrate:
+        tracker.start_calibration()
+    elif not tracker.is_mapping_ready():
+        print("[REPLAY] No calibration loaded - only feature extraction will be exercised")
+
+    errors = []
+    click_errors = []  # Click position vs the frame's target
+    blink_jumps = []   # Cursor displacement during blinks from the last open-eye position
+    click_shifts = []  # Click position vs the cursor just before the blink that made it
+    open_cursor = None
+    blink_cursor = None
+    clicks = getattr(tracker.cursor, 'clicks', None)
+    frames = 0
+    tracked = 0
+    width, height = source.frame_size
+    start = time.perf_counter()
+
+    while max_frames is None or frames < max_frames:
+        item, timestamp, target = source.read()
+        if item is None:
+            break
+        captured_at = time.perf_counter()
+        tracker.frame_target = target
+
+        if source.kind == "video":
+            cursor = tracker.process_frame(item, captured_at, timestamp)
+            if not tracker.update_preview(item):
+                break
+        else:
+            cursor = tracker.process_landmarks(None, item, width, height, captured_at, timestamp)
+
+        frames += 1
+        if cursor is not None:
+            tracked += 1
+            if target is not None:
+                errors.append(math.hypot(cursor[0] - target[0], cursor[1] - target[1]))
+            if tracker.was_blink and open_cursor is not None:
+                blink_cursor = blink_cursor or open_cursor
+                blink_jumps.append(math.hypot(cursor[0] - open_cursor[0], cursor[1] - open_cursor[1]))
+            elif not tracker.was_blink:
+                open_cursor = cursor
+        if clicks is not None and tracker.cursor.clicks > clicks:
+            clicks = tracker.cursor.clicks
+            click = getattr(tracker.cursor, 'last_click', None)
+            if click is not None and target is not None:
+                click_errors.append(math.hypot(click[0] - target[0], click[1] - target[1]))
+            if click is not None and blink_cursor is not None:
+                click_shifts.append(math.hypot(click[0] - blink_cursor[0], click[1] - blink_cursor[1]))
+            blink_cursor = None
+
+    elapsed = time.perf_counter() - start
+    source.close()
+
+    report = {
+        'source': source.path,
+        'kind': source.kind,
+        'frames': frames,
+        'tracked_frames': tracked,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'calibrated': tracker.is_mapping_ready(),
+        'stages_ms': {stage: {'mean': tracker.timings.mean_ms(stage),
+                              'max': tracker.timings.max[stage] * 1000.0,
+                              'count': tracker.timings.count[stage]}
+                      for stage in tracker.timings.stages if tracker.timings.count[stage]},
+        'cursor_moves': getattr(tracker.cursor, 'moves', None),
+        'clicks': getattr(tracker.cursor, 'clicks', None),
+    }
+    if errors:
+        report['accuracy_px'] = {'frames': len(errors), 'mean': float(np.mean(errors)),
+                                 'p50': percentile(errors, 50), 'p95': percentile(errors, 95)}
+    if click_errors:
+        report['click_accuracy_px'] = {'clicks': len(click_errors), 'mean': float(np.mean(click_errors)),
+                                       'p50': percentile(click_errors, 50), 'p95': percentile(click_errors, 95)}
+    if click_shifts:
+        report['click_shift_px'] = {'clicks': len(click_shifts), 'p50': percentile(click_shifts, 50),
+                                    'p95': percentile(click_shifts, 95), 'max': float(np.max(click_shifts))}
+    if blink_jumps:
+        report['blink_jump_px'] = {'frames': len(blink_jumps), 'p95': percentile(blink_jumps, 95),
+                                   'max': float(np.max(blink_jumps))}
+
+    print(f"[REPLAY] {frames} frames in {elapsed:.2f}s ({report['fps']:.1f} FPS), {tracked} tracked")
+    print(tracker.timings.summary())
+    if errors:
+        acc = report['accuracy_px']
+        print(f"[REPLAY] Cursor error: mean {acc['mean']:.1f}px, p50 {acc['p50']:.1f}px, p95 {acc['p95']:.1f}px")
+    if click_errors:
+        acc = report['click_accuracy_px']
+        print(f"[REPLAY] Click error over {acc['clicks']} clicks: mean {acc['mean']:.1f}px, "
+              f"p50 {acc['p50']:.1f}px, p95 {acc['p95']:.1f}px")
+    if click_shifts:
+        shift = report['click_shift_px']
+        print(f"[REPLAY] Clicks vs the cursor before their blink: p50 {shift['p50']:.1f}px, "
+              f"p95 {shift['p95']:.1f}px, max {shift['max']:.1f}px")
+    if blink_jumps:
+        jump = report['blink_jump_px']
+        print(f"[REPLAY] Cursor movement during blinks: p95 {jump['p95']:.1f}px, max {jump['max']:.1f}px")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[REPLAY] Report written to {report_path}")
+    return report
@@ -0,0 +1,142 @@
+import time
+
+import cv2
+import numpy as np
+
+# Forehead, chin and both cheeks: with the eye landmarks these bound the face
+FACE_BOX_LANDMARKS = [10, 152, 234, 454]
+
+
+class FaceRoiTracker:
+    """Runs face mesh on a padded square crop around the previous frame's face.
+
+    The crop is resized to a fixed input_size square, so colour conversion
+    and inference cost no longer scale with the capture resolution, and the
+    landmarks are mapped back to normalized full-frame coordinates. A frame
+    where the crop loses the face is retried on the full frame with a
+    separate single-image detector, which then seeds the next crop.
+
+    infer() returns a reused (478, 3) float32 array; only the rows listed in
+    rows (plus the box rows) are refreshed unless full=True.
+    """
+
+    def __init__(self, roi_mesh, full_mesh, rows, padding=0.6, input_size=256, min_side=96,
+                 num_landmarks=478, timings=None):
+        self.roi_mesh = roi_mesh      # Streaming model fed with the crops
+        self.full_mesh = full_mesh    # Single-image model for (re)acquisition on the full frame
+        self.padding = padding        # Crop side = face extent * (1 + 2 * padding)
+        self.input_size = input_size
+        self.min_side = min_side
+        self.timings = timings
+
+        self.rows = sorted(set(rows) | set(FACE_BOX_LANDMARKS))
+        self.row_idx = np.array(self.rows)
+        self.raw = np.zeros((num_landmarks, 3), dtype=np.float32)
+        self.landmarks = np.zeros((num_landmarks, 3), dtype=np.float32)
+        self.scale = np.ones(3, dtype=np.float32)
+        self.offset = np.zeros(3, dtype=np.float32)
+
+        self.crop_bgr = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+        self.crop_rgb = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+        self.full_rgb = None
+
+        # Counters
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.losses = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the face box; the next frame goes through full-frame detection"""
+        self.box = None  # (x0, y0, side) in full-frame pixels
+        self.frame_size = None
+
+    def _add_timing(self, stage, seconds):
+        if self.timings is not None:
+            self.timings.add(stage, seconds)
+
+    def _run(self, mesh, rgb):
+        start = time.perf_counter()
+        try:
+            results = mesh.process(rgb)
+        except Exception:
+            results = None
+        self._add_timing("inference", time.perf_counter() - start)
+        if results and results.multi_face_landmarks:
+            return results.multi_face_landmarks[0].landmark
+        return None
+
+    def _infer_crop(self, frame):
+        start = time.perf_counter()
+        x0, y0, side = self.box
+        cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.input_size, self.input_size),
+                   dst=self.crop_bgr, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self.crop_bgr, cv2.COLOR_BGR2RGB, dst=self.crop_rgb)
+        self._add_timing("convert", time.perf_counter() - start)
+        return self._run(self.roi_mesh, self.crop_rgb)
+
+    def _infer_full(self, frame):
+        start = time.perf_counter()
+        if self.full_rgb is None or self.full_rgb.shape != frame.shape:
+            self.full_rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.full_rgb)
+        self._add_timing("convert", time.perf_counter() - start)
+        return self._run(self.full_mesh, self.full_rgb)
+
+    def infer(self, frame, full=False):
+        """Landmarks for this BGR frame in full-frame normalized coordinates, or None"""
+        frame_h, frame_w = frame.shape[:2]
+        if (frame_w, frame_h) != self.frame_size:
+            self.frame_size = (frame_w, frame_h)
+            self.box = None  # Box is in the old resolution's pixels
+        landmarks = None
+        box = self.box
+        if box is not None:
+            landmarks = self._infer_crop(frame)
+            if landmarks is None:
+                self.losses += 1
+                self.box = box = None
+            else:
+                self.roi_frames += 1
+        if landmarks is None:
+            landmarks = self._infer_full(frame)
+            if landmarks is None:
+                return None
+            self.full_frames += 1
+
+        start = time.perf_counter()
+        raw = self.raw
+        if full:
+            raw[:len(landmarks)] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+        else:
+            raw[self.row_idx] = [(landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in self.rows]
+
+        # Crop-normalized -> full-frame normalized (z is scaled by width, like x)
+        if box is not None:
+            x0, y0, side = box
+            self.scale[0] = self.scale[2] = side / frame_w
+            self.scale[1] = side / frame_h
+            self.offset[0] = x0 / frame_w
+            self.offset[1] = y0 / frame_h
+            np.multiply(raw, self.scale, out=self.landmarks)
+            np.add(self.landmarks, self.offset, out=self.landmarks)
+        else:
+            self.landmarks[:] = raw
+
+        self.update_box(frame_w, frame_h)
+        self._add_timing("roi_remap", time.perf_counter() - start)
+        return self.landmarks
+
+    def update_box(self, frame_w, frame_h):
+        """Padded square around the current face for the next frame"""
+        points = self.landmarks[self.row_idx]
+        min_x, max_x = points[:, 0].min() * frame_w, points[:, 0].max() * frame_w
+        min_y, max_y = points[:, 1].min() * frame_h, points[:, 1].max() * frame_h
+        extent = max(max_x - min_x, max_y - min_y)
+        side = int(extent * (1.0 + 2.0 * self.padding))
+        side = max(self.min_side, min(side, frame_w, frame_h))
+        x0 = int(round((min_x + max_x) / 2.0 - side / 2.0))
+        y0 = int(round((min_y + max_y) / 2.0 - side / 2.0))
+        x0 = max(0, min(frame_w - side, x0))
+        y0 = max(0, min(frame_h - side, y0))
+        self.box = (x0, y0, side)
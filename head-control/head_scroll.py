@@ -0,0 +1,252 @@
+import collections
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Shared pipeline utilities live next to the eye tracker. Appended, not
+# inserted, so eye-control's main.py never shadows a caller's own main.
+EYE_CONTROL = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eye-control"))
+if EYE_CONTROL not in map(os.path.normpath, sys.path):
+    sys.path.append(EYE_CONTROL)
+
+from instrumentation import NULL_TRACE
+from output import ScrollEngine, WHEEL_DELTA
+
+NOSE_TIP = 1  # FaceMesh landmark index of the nose tip
+
+# ========================
+# Configurable parameters
+# ========================
+BASE_SCROLL_THRESHOLD = 12   # smaller = more sensitive
+BASE_HSCROLL_THRESHOLD = 12
+SMOOTHING_FRAMES = 5    # moving average frames for nose position
+SCROLL_HZ = 60          # scroll engine ticks per second
+SCROLL_MIN_STEP = 30    # smallest scroll sent, in 1/120 wheel notches
+MIN_SPEED = 1.0         # wheel notches/s just past the threshold
+MAX_SPEED = 25.0        # wheel notches/s at FULL_SPEED_PX past the threshold
+FULL_SPEED_PX = 60      # head displacement past the threshold for full speed
+SPEED_EXPONENT = 2.0    # acceleration curve shape (1 = linear, higher = finer control near neutral)
+
+
+class FixedThresholds:
+    """Constant vertical/horizontal scroll thresholds (headless runs, replay, benchmarks)"""
+
+    def __init__(self, scroll_threshold=BASE_SCROLL_THRESHOLD, hscroll_threshold=BASE_HSCROLL_THRESHOLD):
+        self.scroll_threshold = scroll_threshold
+        self.hscroll_threshold = hscroll_threshold
+
+    def __call__(self):
+        return self.scroll_threshold, self.hscroll_threshold
+
+
+class ScrollCurve:
+    """Head displacement past the threshold -> scroll speed in wheel units/s.
+
+    Speed starts at min_speed just past the threshold and rises as
+    t ** exponent to max_speed at full_speed_px beyond it (t is the
+    fraction of that distance covered, capped at 1). Exponents above 1
+    give fine control near neutral and fast scrolling further out.
+    """
+
+    def __init__(self, full_speed_px=FULL_SPEED_PX, min_speed=MIN_SPEED * WHEEL_DELTA, max_speed=MAX_SPEED * WHEEL_DELTA,
+                 exponent=SPEED_EXPONENT):
+        self.full_speed_px = full_speed_px
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.exponent = exponent
+
+    def speed(self, displacement, threshold):
+        """Signed speed for a signed displacement (px); 0 inside the threshold"""
+        beyond = abs(displacement) - threshold
+        if beyond <= 0:
+            return 0.0
+        t = min(1.0, beyond / self.full_speed_px)
+        speed = self.min_speed + (self.max_speed - self.min_speed) * t ** self.exponent
+        return math.copysign(speed, displacement)
+
+
+class TrackbarThresholds:
+    """Thresholds read from two OpenCV trackbars on a window (lower = more sensitive)"""
+
+    def __init__(self, window, scroll_threshold=BASE_SCROLL_THRESHOLD, hscroll_threshold=BASE_HSCROLL_THRESHOLD,
+                 maximum=50):
+        self.window = window
+        cv2.namedWindow(window)
+        cv2.createTrackbar("VScroll Thresh", window, scroll_threshold, maximum, lambda value: None)
+        cv2.createTrackbar("HScroll Thresh", window, hscroll_threshold, maximum, lambda value: None)
+
+    def __call__(self):
+        # A threshold of 0 would scroll on every frame and divide by zero
+        return (max(1, cv2.getTrackbarPos("VScroll Thresh", self.window)),
+                max(1, cv2.getTrackbarPos("HScroll Thresh", self.window)))
+
+
+class HeadScrollController:
+    """Scrolls by how far the nose tip has moved from a calibrated neutral position.
+
+    Fed one frame of landmarks and its timestamp at a time through update().
+    Each frame's displacement from neutral goes through the scroll curve to
+    a velocity for the scroll engine. The engine scrolls continuously
+    between frames. The controller owns no camera, window or OS input:
+    scrolls go to output (any cursor backend or the OutputDispatcher)
+    through the engine, and thresholds come from a callable. The same
+    controller therefore runs in the live UI, inside the unified runtime,
+    or headless over a replayed landmark stream as fast as it can be fed.
+    Without a running engine thread, the caller drives it with
+    engine.advance().
+    """
+
+    def __init__(self, output, thresholds=None, smoothing_frames=SMOOTHING_FRAMES, curve=None, engine=None,
+                 trace=NULL_TRACE):
+        self.output = output
+        self.thresholds = thresholds or FixedThresholds()  # () -> (vertical, horizontal) px
+        self.curve = curve or ScrollCurve()
+        self.engine = engine or ScrollEngine(output, rate=SCROLL_HZ, min_step=SCROLL_MIN_STEP)
+        self.trace = trace
+        self.nose_x_history = collections.deque(maxlen=smoothing_frames)
+        self.nose_y_history = collections.deque(maxlen=smoothing_frames)
+        self.neutral = None   # (x, y) px, None until calibrated
+        self.position = None  # Last smoothed nose position (px)
+
+        # Counters
+        self.frames = 0
+        self.reset()
+
+    @property
+    def calibrated(self):
+        return self.neutral is not None
+
+    def reset(self):
+        """Forget the smoothing history and stop scrolling (keeps the neutral position)"""
+        self.nose_x_history.clear()
+        self.nose_y_history.clear()
+        self.position = None
+        self.engine.set_velocity(0.0, 0.0)
+
+    def calibrate(self):
+        """Use the current smoothed nose position as neutral; False if no face was seen yet"""
+        if self.position is None:
+            return False
+        self.neutral = self.position
+        print(f"Calibrated at: {self.neutral[0]}, {self.neutral[1]}")
+        return True
+
+    def update(self, landmarks, frame_width, frame_height, timestamp, frame=None):
+        """One frame: MediaPipe landmarks or a normalized (478, 2) array, None without a face"""
+        if landmarks is None:
+            self.engine.set_velocity(0.0, 0.0, timestamp)
+            return
+        if isinstance(landmarks, np.ndarray):
+            nose_x, nose_y = landmarks[NOSE_TIP, :2]
+        else:
+            nose_x, nose_y = landmarks[NOSE_TIP].x, landmarks[NOSE_TIP].y
+        self.update_nose(int(nose_x * frame_width), int(nose_y * frame_height), timestamp, frame)
+
+    def update_nose(self, nose_x, nose_y, timestamp, frame=None):
+        """Smooth one nose tip position (px) and scroll by its offset from neutral"""
+        self.frames += 1
+
+        # Apply smoothing
+        self.nose_x_history.append(nose_x)
+        self.nose_y_history.append(nose_y)
+        smooth_x = int(sum(self.nose_x_history) / len(self.nose_x_history))
+        smooth_y = int(sum(self.nose_y_history) / len(self.nose_y_history))
+        self.position = (smooth_x, smooth_y)
+        self.trace.mark("smoothing")
+
+        if frame is not None:
+            self.draw(frame)
+        if self.neutral is None:
+            return
+
+        dx = smooth_x - self.neutral[0]
+        dy = smooth_y - self.neutral[1]
+        scroll_threshold, hscroll_threshold = self.thresholds()
+
+        # Head up scrolls up, head right scrolls right
+        vx = self.curve.speed(dx, hscroll_threshold)
+        vy = self.curve.speed(-dy, scroll_threshold)
+        self.trace.mark("mapping")
+        self.engine.set_velocity(vx, vy, timestamp)
+        self.trace.mark("dispatch")
+
+    def draw(self, frame):
+        """Nose tip and, once calibrated, the neutral position cross-hair"""
+        cv2.circle(frame, self.position, 6, (255,0,0), -1)
+        if self.neutral is not None:
+            h, w = frame.shape[:2]
+            neutral_x, neutral_y = self.neutral
+            cv2.circle(frame, (neutral_x, neutral_y), 6, (0,255,255), 2)
+            cv2.line(frame, (neutral_x, 0), (neutral_x, h), (0,255,255), 1)
+            cv2.line(frame, (0, neutral_y), (w, neutral_y), (0,255,255), 1)
+
+    def draw_status(self, frame, y=30, key='c'):
+        """Calibration hint or status line"""
+        if self.neutral is None:
+            cv2.putText(frame, f"Press '{key}' to calibrate neutral head", (10,y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,255), 2)
+        else:
+            cv2.putText(frame, "Calibrated! Move your head to scroll vertically/horizontally", (10,y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
+
+    def stats(self):
+        engine = self.engine
+        return {'frames': self.frames, 'scroll_events': engine.events, 'scroll_units': engine.units_sent,
+                'scrolling_seconds': engine.active_seconds}
+
+
+def create_controller(output, thresholds=None, trace=NULL_TRACE, timings=None):
+    """Controller with the configured curve and scroll engine; the engine thread is not started"""
+    engine = ScrollEngine(output, rate=SCROLL_HZ, min_step=SCROLL_MIN_STEP, timings=timings)
+    return HeadScrollController(output, thresholds=thresholds, curve=ScrollCurve(), engine=engine, trace=trace)
+
+
+def replay_head(controller, source, max_frames=None, calibrate_after=None):
+    """Feed a landmark replay source through the controller unthrottled; returns a report.
+
+    The neutral position is taken once the smoothing window is full, or at
+    calibrate_after seconds into the stream, unless the controller is
+    already calibrated. The engine must not be started: it is ticked on
+    the stream's timestamps instead of the wall clock.
+    """
+    width, height = source.frame_size
+    latencies = []
+    first = last = None
+    start = time.perf_counter()
+    while max_frames is None or len(latencies) < max_frames:
+        landmarks, timestamp, _ = source.read()
+        if landmarks is None:
+            break
+        first = timestamp if first is None else first
+        last = timestamp
+        controller.engine.advance(timestamp)  # Engine ticks since the last frame, at its own rate
+        update_start = time.perf_counter_ns()
+        controller.update(landmarks, width, height, timestamp)
+        latencies.append(time.perf_counter_ns() - update_start)
+        if not controller.calibrated:
+            ready = (timestamp - first >= calibrate_after if calibrate_after is not None
+                     else len(controller.nose_x_history) == controller.nose_x_history.maxlen)
+            if ready:
+                controller.calibrate()
+    elapsed = time.perf_counter() - start
+    source.close()
+
+    latencies_ms = np.array(latencies, dtype=np.float64) / 1e6
+    span = (last - first) if latencies else 0.0
+    report = {
+        'source': source.path,
+        'frames': len(latencies),
+        'seconds': elapsed,
+        'fps': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'stream_seconds': span,
+        'update_ms': {'p50': float(np.percentile(latencies_ms, 50)), 'p95': float(np.percentile(latencies_ms, 95)),
+                      'max': float(latencies_ms.max())} if latencies else None,
+    }
+    report.update(controller.stats())
+    scrolling = report['scrolling_seconds']
+    report['scroll_events_per_second'] = report['scroll_events'] / scrolling if scrolling > 0 else 0.0
+    return report
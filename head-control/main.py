@@ -1,180 +1,188 @@
 import cv2
-import mediapipe as mp
-import pyautogui
-import collections
+import argparse
+import json
+import os
 import sys
 import time
 
-# ========================
-# Configurable parameters
-# ========================
-BASE_SCROLL_THRESHOLD = 12   # smaller = more sensitive
-BASE_HSCROLL_THRESHOLD = 12
-SMOOTHING_FRAMES = 5    # moving average frames for nose position
-ACTION_COOLDOWN = 0.05  # seconds between actions (for both vertical and horizontal)
-
-# ========================
-# Mediapipe init
-# ========================
-mp_face = mp.solutions.face_mesh
-mp_draw = mp.solutions.drawing_utils
-face_mesh = mp_face.FaceMesh(refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
-
-# ========================
-# Video capture init
-# ========================
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("ERROR: Could not open webcam. Make sure it is connected and not used by another program.")
-    sys.exit()
-
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-# ========================
-# Calibration and smoothing
-# ========================
-neutral_x, neutral_y = 0, 0
-calibrated = False
-
-nose_x_history = collections.deque(maxlen=SMOOTHING_FRAMES)
-nose_y_history = collections.deque(maxlen=SMOOTHING_FRAMES)
-
-last_action_time = {'vertical': 0, 'horizontal': 0}
-
-# ========================
-# Helper functions
-# ========================
-def get_nose_pos(landmarks, w, h):
-    """Returns nose tip position (landmark 1)"""
-    nose = landmarks[1]
-    return int(nose.x * w), int(nose.y * h)
-
-def nothing(x):
-    pass
-
-def horizontal_scroll(amount):
-    """Cross-platform horizontal scroll"""
-    if sys.platform == 'win32':
-        pyautogui.keyDown('shift')
-        pyautogui.scroll(-amount)
-        pyautogui.keyUp('shift')
-    else:
-        pyautogui.hscroll(amount)
-
-# Create window and trackbars for sensitivity (threshold adjustment)
-cv2.namedWindow("Head Control UX")
-cv2.createTrackbar("VScroll Thresh", "Head Control UX", BASE_SCROLL_THRESHOLD, 50, nothing)
-cv2.createTrackbar("HScroll Thresh", "Head Control UX", BASE_HSCROLL_THRESHOLD, 50, nothing)
-
-print("INFO: Press 'c' to calibrate your neutral head position. ESC to quit.")
-print("INFO: Use trackbars to adjust thresholds (lower = more sensitive).")
-
-# ========================
-# Main loop
-# ========================
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("WARNING: Failed to read frame from webcam. Retrying...")
-        continue  # skip this iteration
-
-    frame = cv2.flip(frame, 1)  # mirror
-    h, w, _ = frame.shape
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    try:
-        results = face_mesh.process(rgb)
-    except Exception as e:
-        print(f"WARNING: Mediapipe error: {e}")
-        continue  # skip this frame
-
-    # Get current thresholds from trackbars (sensitivity options)
-    SCROLL_THRESHOLD = cv2.getTrackbarPos("VScroll Thresh", "Head Control UX")
-    HSCROLL_THRESHOLD = cv2.getTrackbarPos("HScroll Thresh", "Head Control UX")
-
-    if results.multi_face_landmarks:
-        face_landmarks = results.multi_face_landmarks[0]
-
-        # Draw face mesh
+# Shared pipeline utilities live next to the eye tracker
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "eye-control"))
+from instrumentation import TraceRing, NULL_TRACE, LatencyHud, MetricsExporter, StageTimings
+from output import OutputDispatcher, NullCursor, OUTPUT_BACKENDS, WHEEL_DELTA, create_cursor
+# Scroll thresholds, curve, tick rate and step size are configured in head_scroll.py
+from head_scroll import TrackbarThresholds, create_controller, replay_head
+
+WINDOW = "Head Control UX"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Head movement scrolling")
+    parser.add_argument("--trace", action="store_true",
+                        help="Trace per-frame stage timestamps and show a rolling FPS/latency HUD")
+    parser.add_argument("--metrics", metavar="TARGET",
+                        help="Export Prometheus-format metrics to a file, or unix:/path for a socket (implies --trace)")
+    parser.add_argument("--output-backend", default="auto", choices=OUTPUT_BACKENDS,
+                        help="Scroll output: native XTest or uinput on Linux, or pyautogui (default auto)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Run headless and unthrottled over a landmark .npz or .blm recording (no scrolling)")
+    parser.add_argument("--neutral-after", type=float, metavar="SECONDS",
+                        help="Replay: take the neutral head position this far in (default: once smoothing is full)")
+    parser.add_argument("--max-frames", type=int, help="Replay: stop after this many frames")
+    parser.add_argument("--report", metavar="JSON", help="Replay: write throughput/latency/scroll report")
+    return parser.parse_args()
+
+
+def open_camera(index=0, width=640, height=480):
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        print("ERROR: Could not open webcam. Make sure it is connected and not used by another program.")
+        sys.exit()
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return cap
+
+
+def run(controller, capture, face_mesh, draw_mesh=None, hud=None, window=WINDOW):
+    """Live loop: frames from capture, landmarks from face_mesh, preview in window until ESC"""
+    trace = controller.trace
+    print("INFO: Press 'c' to calibrate your neutral head position. ESC to quit.")
+    print("INFO: Use trackbars to adjust thresholds (lower = more sensitive).")
+
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            print("WARNING: Failed to read frame from webcam. Retrying...")
+            continue  # skip this iteration
+        trace.begin(time.perf_counter())
+
+        frame = cv2.flip(frame, 1)  # mirror
+        h, w, _ = frame.shape
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        try:
+            results = face_mesh.process(rgb)
+        except Exception as e:
+            print(f"WARNING: Mediapipe error: {e}")
+            continue  # skip this frame
+        trace.mark("inference")
+
+        landmarks = None
+        if results.multi_face_landmarks:
+            face_landmarks = results.multi_face_landmarks[0]
+            if draw_mesh is not None:
+                draw_mesh(frame, face_landmarks)
+            trace.mark("overlay")
+            landmarks = face_landmarks.landmark
+        controller.update(landmarks, w, h, time.perf_counter(), frame)
+
+        # UI Text
+        controller.draw_status(frame)
+
+        if hud is not None:
+            hud.draw(frame)
+
+        cv2.imshow(window, frame)
+        key = cv2.waitKey(1) & 0xFF
+
+        if key == 27:  # ESC
+            break
+        elif key == ord('c'):
+            if landmarks is not None:
+                # Use smoothed position for calibration
+                controller.calibrate()
+
+
+def run_replay_mode(args):
+    """Headless replay into a null output, as fast as the controller runs"""
+    from replay import open_replay_source
+    source = open_replay_source(args.replay)
+    if source.kind != "landmarks":
+        print("ERROR: --replay needs a landmark .npz or .blm recording")
+        return 1
+    output = NullCursor(record=True)
+    report = replay_head(create_controller(output), source, max_frames=args.max_frames,
+                         calibrate_after=args.neutral_after)
+    print(f"[REPLAY] {report['frames']} frames in {report['seconds']:.3f}s ({report['fps']:.0f} FPS)")
+    if report['update_ms']:
+        print(f"[REPLAY] Update: p50 {report['update_ms']['p50']:.4f} ms, p95 {report['update_ms']['p95']:.4f} ms")
+    print(f"[REPLAY] {report['scroll_events']} scroll events over {report['scrolling_seconds']:.1f}s of scrolling "
+          f"({report['scroll_events_per_second']:.1f}/s), {report['scroll_units'] / WHEEL_DELTA:.0f} notches")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[REPLAY] Report written to {args.report}")
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.replay:
+        return run_replay_mode(args)
+    import mediapipe as mp
+
+    # ========================
+    # Mediapipe init
+    # ========================
+    mp_face = mp.solutions.face_mesh
+    mp_draw = mp.solutions.drawing_utils
+    face_mesh = mp_face.FaceMesh(refine_landmarks=True, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+    def draw_mesh(frame, face_landmarks):
         mp_draw.draw_landmarks(
             frame, face_landmarks, mp_face.FACEMESH_TESSELATION,
             mp_draw.DrawingSpec(color=(0,255,0), thickness=1, circle_radius=1),
             mp_draw.DrawingSpec(color=(0,0,255), thickness=1)
         )
 
-        # Get nose tip
-        nose_x, nose_y = get_nose_pos(face_landmarks.landmark, w, h)
-
-        # Apply smoothing
-        nose_x_history.append(nose_x)
-        nose_y_history.append(nose_y)
-        smooth_x = int(sum(nose_x_history)/len(nose_x_history))
-        smooth_y = int(sum(nose_y_history)/len(nose_y_history))
-
-        # Draw nose tip
-        cv2.circle(frame, (smooth_x, smooth_y), 6, (255,0,0), -1)
-
-        if calibrated:
-            dx = smooth_x - neutral_x
-            dy = smooth_y - neutral_y
-
-            current_time = time.time()
-
-            # Vertical scroll up/down with cooldown and proportional amount
-            if abs(dy) > SCROLL_THRESHOLD and current_time - last_action_time['vertical'] > ACTION_COOLDOWN:
-                # Proportional scroll for smoother control
-                scroll_factor = abs(dy) / SCROLL_THRESHOLD
-                scroll_amount = int(50 * scroll_factor)  # Base amount scaled by how far head is moved
-                if dy < -SCROLL_THRESHOLD:
-                    pyautogui.scroll(scroll_amount)
-                elif dy > SCROLL_THRESHOLD:
-                    pyautogui.scroll(-scroll_amount)
-                last_action_time['vertical'] = current_time
-
-            # Horizontal scroll left/right with cooldown and proportional amount
-            if abs(dx) > HSCROLL_THRESHOLD and current_time - last_action_time['horizontal'] > ACTION_COOLDOWN:
-                # Proportional hscroll for smoother control
-                hscroll_factor = abs(dx) / HSCROLL_THRESHOLD
-                hscroll_amount = int(50 * hscroll_factor)  # Base amount scaled by how far head is moved
-                if dx < -HSCROLL_THRESHOLD:
-                    horizontal_scroll(-hscroll_amount)  # Left: negative
-                elif dx > HSCROLL_THRESHOLD:
-                    horizontal_scroll(hscroll_amount)  # Right: positive
-                last_action_time['horizontal'] = current_time
-
-            # Draw neutral position visual
-            cv2.circle(frame, (neutral_x, neutral_y), 6, (0,255,255), 2)
-            cv2.line(frame, (neutral_x, 0), (neutral_x, h), (0,255,255), 1)
-            cv2.line(frame, (0, neutral_y), (w, neutral_y), (0,255,255), 1)
-
-    # UI Text
-    if not calibrated:
-        cv2.putText(frame, "Press 'c' to calibrate neutral head", (10,30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,255), 2)
-    else:
-        cv2.putText(frame, "Calibrated! Move your head to scroll vertically/horizontally", (10,30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2)
-
-    cv2.imshow("Head Control UX", frame)
-    key = cv2.waitKey(1) & 0xFF
-
-    if key == 27:  # ESC
-        break
-    elif key == ord('c'):
-        if results.multi_face_landmarks:
-            # Use smoothed position for calibration
-            neutral_x = smooth_x
-            neutral_y = smooth_y
-            calibrated = True
-            print(f"Calibrated at: {neutral_x}, {neutral_y}")
-
-# ========================
-# Cleanup
-# ========================
-cap.release()
-cv2.destroyAllWindows()
-
+    # ========================
+    # Video capture init
+    # ========================
+    cap = open_camera()
+
+    # ========================
+    # Output (scrolls run on a worker thread, in order)
+    # ========================
+    timings = StageTimings([])
+    output = OutputDispatcher(create_cursor(args.output_backend), timings=timings).start()
+
+    # ========================
+    # Instrumentation (no-op unless --trace / --metrics)
+    # ========================
+    trace = NULL_TRACE
+    hud = None
+    metrics_exporter = None
+    if args.trace or args.metrics:
+        trace = TraceRing(["capture", "inference", "overlay", "smoothing", "mapping", "dispatch"])
+        hud = LatencyHud(trace)
+        if args.metrics:
+            try:
+                metrics_exporter = MetricsExporter(trace, args.metrics, "head", timings=timings)
+                metrics_exporter.start()
+            except Exception as e:
+                print(f"WARNING: Metrics export disabled: {e}")
+                metrics_exporter = None
+
+    # Window with trackbars for sensitivity (threshold adjustment)
+    thresholds = TrackbarThresholds(WINDOW)
+    controller = create_controller(output, thresholds, trace, timings)
+    controller.engine.start()
+    try:
+        run(controller, cap, face_mesh, draw_mesh, hud)
+    finally:
+        # ========================
+        # Cleanup
+        # ========================
+        controller.engine.stop()
+        output.stop()
+        if metrics_exporter is not None:
+            metrics_exporter.stop()
+        cap.release()
+        cv2.destroyAllWindows()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
 
 
 # import cv2
@@ -0,0 +1,92 @@
+import numpy as np
+
+from head_scroll import NOSE_TIP, FixedThresholds, HeadScrollController
+from output import NullCursor, ScrollEngine
+
+FRAME_W, FRAME_H = 640, 480
+NEUTRAL = (320, 240)
+FPS = 30.0
+
+
+def make_controller():
+    """Controller on a recording null cursor, calibrated at NEUTRAL; returns (controller, output, next timestamp)"""
+    output = NullCursor(record=True)
+    engine = ScrollEngine(output, rate=60, min_step=30, stale_after=0.25)
+    controller = HeadScrollController(output, thresholds=FixedThresholds(12, 12), smoothing_frames=1,
+                                      engine=engine)
+    timestamp = feed(controller, NEUTRAL, 0.0, frames=1)
+    assert controller.calibrate()
+    return controller, output, timestamp
+
+
+def landmarks_at(nose_x, nose_y):
+    landmarks = np.zeros((478, 2))
+    landmarks[NOSE_TIP] = (nose_x / FRAME_W, nose_y / FRAME_H)
+    return landmarks
+
+
+def feed(controller, nose, timestamp, frames):
+    """Feed frames with the nose at nose (px, or None for no face), ticking the engine on the stream clock"""
+    for _ in range(frames):
+        controller.engine.advance(timestamp)
+        controller.update(None if nose is None else landmarks_at(*nose), FRAME_W, FRAME_H, timestamp)
+        timestamp += 1.0 / FPS
+    return timestamp
+
+
+def scrolls(output):
+    return [event for event in output.events if event[0] in ("scroll_hi_res", "hscroll_hi_res")]
+
+
+def test_no_scroll_inside_threshold():
+    controller, output, timestamp = make_controller()
+    feed(controller, (NEUTRAL[0] + 10, NEUTRAL[1] - 10), timestamp, frames=60)
+    assert scrolls(output) == []
+
+
+def test_scroll_direction_follows_head():
+    for offset, axis, sign in (((0, -40), "scroll_hi_res", 1), ((0, 40), "scroll_hi_res", -1),
+                               ((40, 0), "hscroll_hi_res", 1), ((-40, 0), "hscroll_hi_res", -1)):
+        controller, output, timestamp = make_controller()
+        feed(controller, (NEUTRAL[0] + offset[0], NEUTRAL[1] + offset[1]), timestamp, frames=30)
+        events = scrolls(output)
+        assert events, offset
+        assert all(kind == axis and units * sign >= 30 for kind, units in events), (offset, events)
+
+
+def test_face_lost_stops_scrolling():
+    controller, output, timestamp = make_controller()
+    timestamp = feed(controller, (NEUTRAL[0], NEUTRAL[1] - 60), timestamp, frames=15)
+    timestamp = feed(controller, None, timestamp, frames=1)
+    sent = len(scrolls(output))
+    assert sent > 0
+    timestamp = feed(controller, None, timestamp, frames=30)
+    controller.engine.advance(timestamp + 1.0)
+    assert len(scrolls(output)) == sent
+    assert controller.engine.velocity == (0.0, 0.0)
+
+
+def test_stale_velocity_stops_scrolling():
+    controller, output, timestamp = make_controller()
+    timestamp = feed(controller, (NEUTRAL[0], NEUTRAL[1] - 60), timestamp, frames=15)
+    last_update = timestamp - 1.0 / FPS
+    # No more frames (camera stalled): the engine keeps ticking until the velocity goes stale
+    controller.engine.advance(last_update + controller.engine.stale_after + 0.05)
+    sent = len(scrolls(output))
+    controller.engine.advance(last_update + 2.0)
+    assert len(scrolls(output)) == sent
+    assert controller.engine.velocity == (0.0, 0.0)
+
+
+def test_reversal_drops_the_old_direction():
+    output = NullCursor(record=True)
+    engine = ScrollEngine(output, rate=60, min_step=30)
+    engine.set_velocity(0.0, 200.0, 0.0)
+    engine.advance(0.0)
+    engine.advance(0.2)  # 40 units: one step of 33 sent, a few left over
+    assert engine.remainder[1] > 0.0
+    engine.set_velocity(0.0, -200.0, 0.2)
+    assert engine.remainder[1] == 0.0
+    sent = len(output.events)
+    engine.advance(0.2 + 10 / 60)  # Ten ticks of -3.3 units from zero, not from the old remainder
+    assert [units for _, units in output.events[sent:]] == [-33]
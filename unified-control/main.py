@@ -0,0 +1,116 @@
+import argparse
+import importlib.util
+import os
+import sys
+
+import cv2
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+EYE_CONTROL = os.path.join(ROOT, "eye-control")
+sys.path.insert(0, os.path.join(ROOT, "head-control"))
+sys.path.insert(0, EYE_CONTROL)
+
+
+def load_script(name, path):
+    """Import a script by file path; eye-control and head-control both have a main.py"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+PrecisionEyeTracker = load_script("eye_tracker", os.path.join(EYE_CONTROL, "main.py")).PrecisionEyeTracker
+from output import OUTPUT_BACKENDS
+from profiles import default_user
+from head_scroll import create_controller
+
+
+def attach_head_control(tracker, calibrate_key='h'):
+    """Feed the tracker's landmarks to a head scroll controller and route its calibration key.
+
+    Scrolls share the tracker's output thread; the controller's time shows
+    up as "consumers" in the tracker's timings. The returned controller's
+    scroll engine is running; stop it when tracking ends.
+    """
+    head = create_controller(tracker.cursor, timings=tracker.timings)
+    head.engine.start()
+
+    def consume(landmarks, frame, frame_width, frame_height, timestamp):
+        head.update(landmarks, frame_width, frame_height, timestamp, frame)
+        if frame is not None:
+            head.draw_status(frame, y=frame_height - 20, key=calibrate_key)
+
+    def handle_key(key):
+        if key != ord(calibrate_key):
+            return False
+        if not head.calibrate():
+            print("[HEAD] No face yet - look at the camera and press again")
+        return True
+
+    tracker.landmark_consumers.append(consume)
+    tracker.key_handlers.append(handle_key)
+    return head
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Eye cursor and head scrolling from one camera and one face mesh")
+    parser.add_argument("--no-eye", action="store_true", help="Head scrolling only: no gaze cursor or clicks")
+    parser.add_argument("--no-head", action="store_true", help="Gaze cursor only: no head scrolling")
+    parser.add_argument("--grid", type=int, default=3, choices=range(3, 8), metavar="N",
+                        help="Calibration grid size, N x N points (default 3, up to 7)")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="Calibration profile to load and save (default: your login name)")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="Always run the full calibration and don't save a profile")
+    parser.add_argument("--no-preview", action="store_true",
+                        help="No camera preview window or overlays (ignored with --no-eye, which needs it for keys)")
+    parser.add_argument("--output-backend", default="auto", choices=OUTPUT_BACKENDS,
+                        help="Cursor/click/scroll output: native XTest or uinput on Linux, or pyautogui (default auto)")
+    parser.add_argument("--cursor-hz", type=int, default=120, metavar="HZ",
+                        help="Cursor updates per second, extrapolated between camera frames (0 = once per frame)")
+    parser.add_argument("--click", default="blink", choices=["blink", "wink", "dwell"],
+                        help="Click on blinks and winks, on winks only, or by holding the cursor still (default blink)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record per-frame landmarks (and EAR and gaze features unless --no-eye) to a .blm file")
+    parser.add_argument("--trace", action="store_true",
+                        help="Trace per-frame stage timestamps and show a rolling FPS/latency HUD")
+    parser.add_argument("--metrics", metavar="TARGET",
+                        help="Export Prometheus-format metrics to a file, or unix:/path for a socket (implies --trace)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.no_eye and args.no_head:
+        print("ERROR: --no-eye and --no-head leave nothing to run")
+        return 2
+
+    tracker = PrecisionEyeTracker(preview=args.no_eye or not args.no_preview, grid_size=args.grid,
+                                  output_backend=args.output_backend, cursor_hz=args.cursor_hz,
+                                  click_mode=args.click, gaze=not args.no_eye)
+    if args.trace or args.metrics:
+        tracker.enable_instrumentation(metrics_target=args.metrics)
+    head = None
+    if not args.no_head:
+        head = attach_head_control(tracker)
+        print("INFO: Press 'h' to set your neutral head position for scrolling. ESC to quit.")
+    if not args.no_eye and not args.no_profile:
+        tracker.use_profile(args.profile or default_user())
+    if args.record:
+        tracker.start_recording(args.record)
+
+    try:
+        tracker.run_precision_tracking()
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted by user")
+        tracker.cleanup()
+    finally:
+        if head is not None:
+            head.engine.stop()
+        cv2.destroyAllWindows()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())